@@ -28,14 +28,20 @@ class RequestUtils:
 class MysqlUtils:
 
     def __init__(self):
+        self.db = self.connect()
+
+    def connect(self) -> pymysql.connections.Connection:
+        """
+        创建新连接，供需要并发访问数据库的调用方使用
+        """
         mysql_config = config_loader.get_config()['mysql']
-        self.db = pymysql.connect(host=mysql_config['host'],
-                                  port=mysql_config['port'],
-                                  database=mysql_config['database'],
-                                  user=mysql_config['username'],
-                                  password=mysql_config['password'],
-                                  max_allowed_packet=1024*1024*1024,
-                                  cursorclass=pymysql.cursors.DictCursor)
+        return pymysql.connect(host=mysql_config['host'],
+                               port=mysql_config['port'],
+                               database=mysql_config['database'],
+                               user=mysql_config['username'],
+                               password=mysql_config['password'],
+                               max_allowed_packet=1024*1024*1024,
+                               cursorclass=pymysql.cursors.DictCursor)
 
     def execute(self, sql: str, args: list = None, expect_rows: int = 1) -> bool:
         with self.db.cursor() as cursor:
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+import torch
+
+from sh.AnnIndex import IvfIndex
+from sh.ModelPredictors import ModelPredictor
+from sh.ModelScorers import TranseScorer
+
+ENT_TOT = 200000
+REL_TOT = 50
+DIM = 100
+K = 10
+QUERIES = 100
+NPROBES = [1, 4, 8, 16, 32]
+
+
+def make_scorer(ent_tot: int, rel_tot: int, dim: int) -> TranseScorer:
+    """
+    Clustered entity embeddings, closer to trained embeddings than uniform noise.
+    """
+    centers = torch.randn((ent_tot // 100, dim))
+    ent = centers[torch.randint(len(centers), (ent_tot,))] + 0.3 * torch.randn((ent_tot, dim))
+    rel = 0.1 * torch.randn((rel_tot, dim))
+    return TranseScorer({'ent_embeddings.weight': ent, 'rel_embeddings.weight': rel}, p_norm=1, norm_flag=True)
+
+
+def bench(scorer: TranseScorer, index: IvfIndex, name: str, h: torch.LongTensor, r: torch.LongTensor) -> None:
+    start = time.perf_counter()
+    exact = ModelPredictor._top_k(scorer.score_tail(h, r), K)
+    exact_ms = (time.perf_counter() - start) / len(h) * 1000
+    q = scorer.tail_query(h, r)
+    for nprobe in NPROBES:
+        start = time.perf_counter()
+        res = index.search(q.numpy(), K, lambda i, ids: scorer.score_candidates(q[i], torch.from_numpy(ids)).numpy(), nprobe)
+        ann_ms = (time.perf_counter() - start) / len(h) * 1000
+        recall = np.mean([len(set(a) & set(e)) / K for a, e in zip(res, exact)])
+        print('%-8s nprobe %3d  recall@%d %.3f  ann %7.3f ms/query  exact %7.3f ms/query' % (name, nprobe, K, recall, ann_ms, exact_ms))
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    torch.manual_seed(0)
+    scorer = make_scorer(ENT_TOT, REL_TOT, DIM)
+    h = torch.randint(ENT_TOT, (QUERIES,))
+    r = torch.randint(REL_TOT, (QUERIES,))
+    for name, pq_m in [('ivf', 0), ('ivf-pq', 20)]:
+        start = time.perf_counter()
+        index = IvfIndex(scorer.ann_vectors().numpy(), pq_m=pq_m)
+        print('%s built in %.1f s, %.1f MB' % (name, time.perf_counter() - start, index.nbytes() / 2 ** 20))
+        bench(scorer, index, name, h, r)
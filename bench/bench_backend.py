@@ -0,0 +1,77 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from openke.data import save_param_file
+
+ENT_TOT = 200000
+REL_TOT = 50
+DIM = 100
+K = 10
+QUERIES = 100
+MODELS = ['transe', 'transh', 'transd']
+BACKENDS = ['torch', 'numpy']
+
+
+def write_model(dirpath: str, model_name: str) -> tuple:
+    """
+    :return: paths of the parameter file, entity2id and relation2id of a random model
+    """
+    rng = np.random.RandomState(0)
+    params = {
+        'ent_embeddings.weight': rng.randn(ENT_TOT, DIM).astype(np.float32),
+        'rel_embeddings.weight': 0.1 * rng.randn(REL_TOT, DIM).astype(np.float32),
+    }
+    if model_name == 'transh':
+        params['norm_vector.weight'] = rng.randn(REL_TOT, DIM).astype(np.float32)
+    if model_name == 'transd':
+        params['ent_transfer.weight'] = rng.randn(ENT_TOT, DIM).astype(np.float32)
+        params['rel_transfer.weight'] = rng.randn(REL_TOT, DIM).astype(np.float32)
+    paths = tuple('%s/%s.%s' % (dirpath, model_name, suffix) for suffix in ['param', 'entity2id.txt', 'relation2id.txt'])
+    save_param_file(paths[0], params)
+    for path, prefix, tot in [(paths[1], 'e', ENT_TOT), (paths[2], 'r', REL_TOT)]:
+        with open(path, 'w') as f:
+            f.write('%d\n' % tot)
+            f.writelines('%s%d\t%d\n' % (prefix, i, i) for i in range(tot))
+    return paths
+
+
+def run(model_name: str, backend: str, paths: tuple, scores_path: str) -> None:
+    """
+    Runs in a fresh process: import, load, then score, so the startup time and memory of each backend are separate.
+    """
+    start = time.perf_counter()
+    from sh.ModelPredictors import ModelPredictor
+    model = ModelPredictor(model_name, paths[0], paths[1], paths[2], False, backend=backend,
+                           projection_cache_bytes=0)
+    startup = time.perf_counter() - start
+    rng = np.random.RandomState(1)
+    h, r = rng.randint(ENT_TOT, size=QUERIES), rng.randint(REL_TOT, size=QUERIES)
+    start = time.perf_counter()
+    scores = model._to_numpy(model.scorer.score_tail(model._to_ids(h), model._to_ids(r)))
+    ModelPredictor._top_k(scores, K)
+    ms = (time.perf_counter() - start) / QUERIES * 1000
+    np.save(scores_path, scores)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print('%-7s %-6s startup %6.3f s  %7.3f ms/query  max rss %7.1f MB  torch imported %s' % (
+        model_name, backend, startup, ms, rss, 'torch' in sys.modules))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1], sys.argv[2], tuple(sys.argv[3:6]), sys.argv[6])
+        sys.exit(0)
+    with tempfile.TemporaryDirectory() as dirpath:
+        for model_name in MODELS:
+            paths = write_model(dirpath, model_name)
+            scores = []
+            for backend in BACKENDS:
+                scores_path = '%s/%s.%s.npy' % (dirpath, model_name, backend)
+                subprocess.check_call([sys.executable, __file__, model_name, backend] + list(paths) + [scores_path],
+                                      env=dict(os.environ, PYTHONPATH=os.getcwd()))
+                scores.append(np.load(scores_path))
+            print('%-7s max abs score difference %.2e' % (model_name, np.abs(scores[0] - scores[1]).max()))
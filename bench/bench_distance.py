@@ -0,0 +1,48 @@
+import time
+import numpy as np
+import torch
+
+from openke.module.Distance import pairwise_distance
+from sh import NumpyScorers
+
+ENT_TOT = 200000
+DIM = 100
+QUERIES = 100
+# max number of elements of the difference tensor of the reference
+BLOCK_SIZE = 1 << 24
+
+
+def reference(q: torch.Tensor, m: torch.Tensor, p_norm: int) -> torch.Tensor:
+    """
+    Distances from the (queries, rows, dim) difference tensor, materialized a bounded tile at a time.
+    """
+    q_rows = max(1, min(q.shape[0], BLOCK_SIZE // (1024 * DIM)))
+    m_rows = max(1, BLOCK_SIZE // (q_rows * DIM))
+    scores = q.new_empty((q.shape[0], m.shape[0]))
+    for i in range(0, q.shape[0], q_rows):
+        for j in range(0, m.shape[0], m_rows):
+            scores[i:i + q_rows, j:j + m_rows] = torch.norm(
+                q[i:i + q_rows].unsqueeze(1) - m[j:j + m_rows].unsqueeze(0), p_norm, -1)
+    return scores
+
+
+def timed(f) -> tuple:
+    start = time.perf_counter()
+    res = f()
+    return res, (time.perf_counter() - start) / QUERIES * 1000
+
+
+if __name__ == '__main__':
+    rng = np.random.RandomState(0)
+    m = rng.randn(ENT_TOT, DIM).astype(np.float32)
+    m /= np.linalg.norm(m, axis=-1, keepdims=True)
+    q = m[rng.randint(ENT_TOT, size=QUERIES)] + 0.1 * rng.randn(QUERIES, DIM).astype(np.float32)
+    tq, tm = torch.from_numpy(q), torch.from_numpy(m)
+    for p_norm in [1, 2]:
+        expected, ms = timed(lambda: reference(tq, tm, p_norm).numpy())
+        print('p_norm %d  difference tensor  %8.3f ms/query' % (p_norm, ms))
+        for name, f in [('torch', lambda: pairwise_distance(tq, tm, p_norm).numpy()),
+                        ('numpy', lambda: NumpyScorers.pairwise_distance(q, m, p_norm))]:
+            scores, ms = timed(f)
+            print('p_norm %d  %-17s  %8.3f ms/query  max abs error %.2e' % (
+                p_norm, name, ms, np.abs(scores - expected).max()))
@@ -0,0 +1,50 @@
+import time
+import numpy as np
+import torch
+
+from sh.ModelPredictors import ModelPredictor
+from sh.ModelScorers import TranseScorer, TranshScorer
+
+ENT_TOT = 200000
+REL_TOT = 50
+DIM = 100
+K = 10
+QUERIES = 100
+QUANTIZATIONS = ['float32', 'float16', 'int8']
+
+
+def make_params(ent_tot: int, rel_tot: int, dim: int) -> dict:
+    """
+    Clustered entity embeddings, closer to trained embeddings than uniform noise.
+    """
+    centers = torch.randn((ent_tot // 100, dim))
+    return {
+        'ent_embeddings.weight': centers[torch.randint(len(centers), (ent_tot,))] + 0.3 * torch.randn((ent_tot, dim)),
+        'rel_embeddings.weight': 0.1 * torch.randn((rel_tot, dim)),
+        'norm_vector.weight': torch.randn((rel_tot, dim)),
+    }
+
+
+def bench(scorer_class, params: dict, h: torch.LongTensor, r: torch.LongTensor) -> None:
+    exact = None
+    for quantization in QUANTIZATIONS:
+        scorer = scorer_class(params, p_norm=1, norm_flag=True, quantization=quantization)
+        start = time.perf_counter()
+        res = ModelPredictor._top_k(scorer.score_tail(h, r), K)
+        ms = (time.perf_counter() - start) / len(h) * 1000
+        if exact is None:
+            exact = res
+        overlap = np.mean([len(set(a) & set(e)) / K for a, e in zip(res, exact)])
+        size = sum(scorer.array_nbytes(t) for t in scorer.arrays())
+        print('%-14s %-8s overlap@%d %.3f  %7.3f ms/query  %6.1f MB' % (
+            scorer_class.__name__, quantization, K, overlap, ms, size / 2 ** 20))
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    torch.manual_seed(0)
+    params = make_params(ENT_TOT, REL_TOT, DIM)
+    h = torch.randint(ENT_TOT, (QUERIES,))
+    r = torch.randint(REL_TOT, (QUERIES,))
+    for scorer_class in [TranseScorer, TranshScorer]:
+        bench(scorer_class, params, h, r)
@@ -0,0 +1,34 @@
+import time
+import numpy as np
+import torch
+
+from sh.ModelPredictors import ModelPredictor
+
+ENT_TOTS = [10000, 100000, 1000000, 2000000]
+K = 10
+REPEAT = 20
+
+
+def timeit(fn, repeat: int = REPEAT) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(ent_tot: int, k: int = K) -> None:
+    scores = torch.rand((1, ent_tot))
+    full = timeit(lambda: scores.numpy().reshape(-1).argsort()[:k])
+    partial = timeit(lambda: ModelPredictor._top_k(scores, k))
+    # ties are broken by id, same as a stable full sort
+    assert list(scores.numpy().reshape(-1).argsort(kind='stable')[:k]) == list(ModelPredictor._top_k(scores, k)[0])
+    print('%10d  argsort %9.3f ms  top_k %9.3f ms  speedup %6.1fx' % (ent_tot, full, partial, full / partial))
+
+
+if __name__ == '__main__':
+    np.random.seed(0)
+    torch.manual_seed(0)
+    print('ent_tot     k=%d' % K)
+    for ent_tot in ENT_TOTS:
+        bench(ent_tot)
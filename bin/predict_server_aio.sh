@@ -0,0 +1,2 @@
+#!/usr/bin/env bash
+PYTHONPATH=. python sh/AsyncEmbeddingServer.py
\ No newline at end of file
@@ -0,0 +1,2 @@
+#!/usr/bin/env bash
+PYTHONPATH=. python sh/PreforkEmbeddingServer.py
\ No newline at end of file
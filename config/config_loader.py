@@ -7,10 +7,14 @@ curr_dir = os.path.split(os.path.abspath(__file__))[0]
 class ConfigLoader:
 
     def __init__(self):
-        with open('%s/config.json' % curr_dir, 'r', encoding='utf-8') as f:
-            cfg = json.load(f)
-        env_activate = cfg['env']
-        with open('%s/config-%s.json' % (curr_dir, env_activate), encoding='utf-8') as f:
+        # EMBEDDING_CONFIG 指定配置文件路径（如测试使用 config-example.json），否则读取 config.json 中 env 对应的配置
+        path = os.environ.get('EMBEDDING_CONFIG')
+        if path is None:
+            with open('%s/config.json' % curr_dir, 'r', encoding='utf-8') as f:
+                cfg = json.load(f)
+            env_activate = cfg['env']
+            path = '%s/config-%s.json' % (curr_dir, env_activate)
+        with open(path, encoding='utf-8') as f:
             env_cfg = json.load(f)
         self.cfg = env_cfg
 
@@ -420,4 +420,32 @@ void getTestBatch(INT *ph, INT *pt, INT *pr, INT *nh, INT *nt, INT *nr) {
         nr[i] = negTestList[i].r;
     }
 }
+
+Triple *negValidList = NULL;
+
+extern "C"
+void getNegValid() {
+    if (negValidList == NULL)
+        negValidList = (Triple *)calloc(validTotal, sizeof(Triple));
+    for (INT i = 0; i < validTotal; i++) {
+        negValidList[i] = validList[i];
+        if (randd(0) % 1000 < 500)
+            negValidList[i].t = corrupt_head(0, validList[i].h, validList[i].r);
+        else
+            negValidList[i].h = corrupt_tail(0, validList[i].t, validList[i].r);
+    }
+}
+
+extern "C"
+void getValidBatch(INT *ph, INT *pt, INT *pr, INT *nh, INT *nt, INT *nr) {
+    getNegValid();
+    for (INT i = 0; i < validTotal; i++) {
+        ph[i] = validList[i].h;
+        pt[i] = validList[i].t;
+        pr[i] = validList[i].r;
+        nh[i] = negValidList[i].h;
+        nt[i] = negValidList[i].t;
+        nr[i] = negValidList[i].r;
+    }
+}
 #endif
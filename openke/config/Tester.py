@@ -16,6 +16,9 @@ from tqdm import tqdm
 
 class Tester(object):
 
+    # max number of scores of a batch of run_link_prediction, per mode
+    max_batch_elements = 1 << 24
+
     def __init__(self, model = None, data_loader = None, use_gpu = True):
         base_file = os.path.abspath(os.path.join(os.path.dirname(__file__), "../release/Base.so"))
         self.lib = ctypes.cdll.LoadLibrary(base_file)
@@ -67,7 +70,11 @@ class Tester(object):
             'mode': data['mode']
         })
 
-    def run_link_prediction(self, type_constrain = False):
+    def run_link_prediction(self, type_constrain = False, batch_size = 1):
+        """
+        :param batch_size: number of test triples scored at once when the model has predict_batch (TransE),
+                           capped so that a batch of scores holds at most max_batch_elements floats
+        """
         self.lib.initTest()
         self.data_loader.set_sampling_mode('link')
         if type_constrain:
@@ -75,11 +82,15 @@ class Tester(object):
         else:
             type_constrain = 0
         training_range = tqdm(self.data_loader)
-        for index, [data_head, data_tail] in enumerate(training_range):
-            score = self.test_one_step(data_head)
-            self.lib.testHead(score.__array_interface__["data"][0], index, type_constrain)
-            score = self.test_one_step(data_tail)
-            self.lib.testTail(score.__array_interface__["data"][0], index, type_constrain)
+        batch_size = min(batch_size, self.max_batch_elements // max(1, self.model.ent_tot))
+        if batch_size > 1 and hasattr(self.model, 'predict_batch'):
+            self.run_link_prediction_batches(training_range, type_constrain, batch_size)
+        else:
+            for index, [data_head, data_tail] in enumerate(training_range):
+                score = self.test_one_step(data_head)
+                self.lib.testHead(score.__array_interface__["data"][0], index, type_constrain)
+                score = self.test_one_step(data_tail)
+                self.lib.testTail(score.__array_interface__["data"][0], index, type_constrain)
         self.lib.test_link_prediction(type_constrain)
 
         mrr = self.lib.getTestLinkMRR(type_constrain)
@@ -90,62 +101,110 @@ class Tester(object):
         print (hit10)
         return mrr, mr, hit10, hit3, hit1
 
-    def get_best_threshlod(self, score, ans):
-        res = np.concatenate([ans.reshape(-1,1), score.reshape(-1,1)], axis = -1)
-        order = np.argsort(score)
-        res = res[order]
-
-        total_all = (float)(len(score))
-        total_current = 0.0
-        total_true = np.sum(ans)
-        total_false = total_all - total_true
-
-        res_mx = 0.0
-        threshlod = None
-        for index, [ans, score] in enumerate(res):
-            if ans == 1:
-                total_current += 1.0
-            res_current = (2 * total_current + total_false - index - 1) / total_all
-            if res_current > res_mx:
-                res_mx = res_current
-                threshlod = score
-        return threshlod, res_mx
-
-    def run_triple_classification(self, threshlod = None):
-        self.lib.initTest()
-        self.data_loader.set_sampling_mode('classification')
+    def run_link_prediction_batches(self, data_range, type_constrain, batch_size):
+        # the entities and their norms are prepared once, every batch of test triples is one distance computation
+        with torch.no_grad():
+            entities = self.model.entity_matrix()
+            start = 0
+            batch = []
+            for data_head, data_tail in data_range:
+                batch.append((data_tail['batch_h'][0], data_head['batch_t'][0], data_head['batch_r'][0]))
+                if len(batch) == batch_size:
+                    self.test_link_batch(start, batch, entities, type_constrain)
+                    start += len(batch)
+                    batch = []
+            if len(batch) > 0:
+                self.test_link_batch(start, batch, entities, type_constrain)
+
+    def test_link_batch(self, start, batch, entities, type_constrain):
+        h, t, r = [self.to_var(np.array(ids, dtype = np.int64), self.use_gpu) for ids in zip(*batch)]
+        head_score = self.model.predict_batch(t, r, 'head_batch', entities)
+        tail_score = self.model.predict_batch(h, r, 'tail_batch', entities)
+        for i in range(len(batch)):
+            self.lib.testHead(head_score[i].__array_interface__["data"][0], start + i, type_constrain)
+            self.lib.testTail(tail_score[i].__array_interface__["data"][0], start + i, type_constrain)
+
+    def collect_classification(self):
+        # scores, labels (1 for positives, 0 for negatives) and relation ids of the sampled triples
         score = []
         ans = []
+        rel = []
         training_range = tqdm(self.data_loader)
         for index, [pos_ins, neg_ins] in enumerate(training_range):
-            res_pos = self.test_one_step(pos_ins)
-            ans = ans + [1 for i in range(len(res_pos))]
-            score.append(res_pos)
+            for ins, label in [(pos_ins, 1), (neg_ins, 0)]:
+                res = self.test_one_step(ins)
+                score.append(res)
+                ans.append(np.full(len(res), label, dtype = np.int64))
+                # the sampler reuses its batch arrays
+                rel.append(ins['batch_r'].copy())
+        if len(score) == 0:
+            return np.zeros(0, dtype = np.float32), np.zeros(0, dtype = np.int64), np.zeros(0, dtype = np.int64)
+        return np.concatenate(score, axis = -1), np.concatenate(ans), np.concatenate(rel)
 
-            res_neg = self.test_one_step(neg_ins)
-            ans = ans + [0 for i in range(len(res_pos))]
-            score.append(res_neg)
+    def get_best_threshlod(self, score, ans):
+        order = np.argsort(score, kind = 'stable')
+        score = score[order]
+        ans = ans[order]
 
-        score = np.concatenate(score, axis = -1)
-        ans = np.array(ans)
+        total_all = (float)(len(score))
+        total_false = total_all - np.sum(ans)
+        # accuracy when the triples up to index are classified as positive
+        res = (2 * np.cumsum(ans) + total_false - np.arange(1, len(score) + 1)) / max(total_all, 1.0)
+        if len(res) == 0 or res.max() <= 0:
+            return None, 0.0
+        index = np.argmax(res)
+        return score[index], res[index]
+
+    def get_relation_thresholds(self, score, ans, rel, rel_tot):
+        """
+        Best threshold of every relation in one pass: triples are sorted by (relation, score) and the accuracy of
+        every split is computed from cumulative sums restarted at the first triple of each relation.
+        :return: thresholds, shape (rel_tot,), relations without triples get the best global threshold
+        """
+        # on the given order, the order of tied scores changes the best split
+        threshlod, _ = self.get_best_threshlod(score, ans)
+        order = np.lexsort((score, rel))
+        score = score[order]
+        ans = ans[order]
+        rel = rel[order]
+
+        total_all = np.bincount(rel, minlength = rel_tot)
+        total_true = np.bincount(rel, weights = ans, minlength = rel_tot)
+        start = np.concatenate([[0], np.cumsum(total_all)[:-1]])
+        cum_true = np.cumsum(ans)
+        # positives of the relation up to index, and position of index within the relation
+        current = cum_true - np.concatenate([[0], cum_true])[start][rel]
+        index = np.arange(len(score)) - start[rel]
+        res = (2 * current + (total_all - total_true)[rel] - index - 1) / total_all[rel]
+
+        # the first best split of every relation
+        best = np.lexsort((-res, rel))
+        thresholds = np.full(rel_tot, np.inf if threshlod is None else threshlod, dtype = np.float32)
+        # like get_best_threshlod, a relation without a split of positive accuracy keeps the global threshold
+        present = total_all > 0
+        present[present] = res[best[start[present]]] > 0
+        thresholds[present] = score[best[start[present]]]
+        return thresholds
+
+    def run_relation_thresholds(self):
+        # per relation thresholds tuned on the validation triples and their corrupted negatives
+        self.data_loader.set_sampling_mode('valid_classification')
+        score, ans, rel = self.collect_classification()
+        if len(score) == 0:
+            return None
+        return self.get_relation_thresholds(score, ans, rel, self.data_loader.get_rel_tot())
+
+    def run_triple_classification(self, threshlod = None, relation_thresholds = None):
+        self.lib.initTest()
+        self.data_loader.set_sampling_mode('classification')
+        score, ans, rel = self.collect_classification()
 
+        if relation_thresholds is not None:
+            return self.get_accuracy(score, ans, relation_thresholds[rel]), relation_thresholds
         if threshlod == None:
             threshlod, _ = self.get_best_threshlod(score, ans)
+        return self.get_accuracy(score, ans, threshlod), threshlod
 
-        res = np.concatenate([ans.reshape(-1,1), score.reshape(-1,1)], axis = -1)
-        order = np.argsort(score)
-        res = res[order]
-
-        total_all = (float)(len(score))
-        total_current = 0.0
-        total_true = np.sum(ans)
-        total_false = total_all - total_true
-
-        for index, [ans, score] in enumerate(res):
-            if score > threshlod:
-                acc = (2 * total_current + total_false - index) / total_all
-                break
-            elif ans == 1:
-                total_current += 1.0
-
-        return acc, threshlod
\ No newline at end of file
+    def get_accuracy(self, score, ans, threshlod):
+        # a triple is positive when its score is at most the threshold (of its relation)
+        return np.mean((score <= threshlod) == (ans == 1))
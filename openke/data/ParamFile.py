@@ -0,0 +1,79 @@
+# coding:utf-8
+"""
+Binary parameter file:
+	magic            8 bytes, b'SHPARAM1'
+	header length    uint64, little-endian
+	header           utf-8 json, {"tensors": [{"name", "dtype", "shape", "offset"}, ...]}
+	data             raw little-endian arrays, each starting at data start + offset, 64-byte aligned
+"""
+import json
+import struct
+import numpy as np
+
+MAGIC = b'SHPARAM1'
+ALIGNMENT = 64
+
+
+def _align(n):
+	return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_param_file(path, arrays):
+	"""
+	:param path: file path
+	:param arrays: {name: numpy array}
+	"""
+	tensors = []
+	offset = 0
+	converted = []
+	for name in arrays:
+		array = np.ascontiguousarray(arrays[name])
+		array = array.astype(array.dtype.newbyteorder('<'), copy = False)
+		tensors.append({
+			'name': name,
+			'dtype': array.dtype.str,
+			'shape': list(array.shape),
+			'offset': offset
+		})
+		converted.append(array)
+		offset = _align(offset + array.nbytes)
+	header = json.dumps({'tensors': tensors}).encode('utf-8')
+	data_start = _align(len(MAGIC) + 8 + len(header))
+	with open(path, 'wb') as f:
+		f.write(MAGIC)
+		f.write(struct.pack('<Q', len(header)))
+		f.write(header)
+		for tensor, array in zip(tensors, converted):
+			f.write(b'\0' * (data_start + tensor['offset'] - f.tell()))
+			f.write(array.tobytes())
+
+
+def is_param_file(path):
+	with open(path, 'rb') as f:
+		return f.read(len(MAGIC)) == MAGIC
+
+
+def load_param_file(path, mmap = True):
+	"""
+	:param path: file path
+	:param mmap: map the arrays copy-on-write instead of reading them into memory
+	:return: {name: numpy array}
+	"""
+	with open(path, 'rb') as f:
+		if f.read(len(MAGIC)) != MAGIC:
+			raise ValueError('%s is not a binary parameter file' % path)
+		header_len = struct.unpack('<Q', f.read(8))[0]
+		header = json.loads(f.read(header_len).decode('utf-8'))
+	data_start = _align(len(MAGIC) + 8 + header_len)
+	res = {}
+	for tensor in header['tensors']:
+		dtype = np.dtype(tensor['dtype'])
+		shape = tuple(tensor['shape'])
+		count = int(np.prod(shape))
+		if count == 0:
+			res[tensor['name']] = np.zeros(shape, dtype = dtype)
+		elif mmap:
+			res[tensor['name']] = np.memmap(path, dtype = dtype, mode = 'c', offset = data_start + tensor['offset'], shape = shape)
+		else:
+			res[tensor['name']] = np.fromfile(path, dtype = dtype, count = count, offset = data_start + tensor['offset']).reshape(shape)
+	return res
@@ -47,6 +47,14 @@ class TestDataLoader(object):
 			ctypes.c_void_p,
 			ctypes.c_void_p,
 		]
+		self.lib.getValidBatch.argtypes = [
+			ctypes.c_void_p,
+			ctypes.c_void_p,
+			ctypes.c_void_p,
+			ctypes.c_void_p,
+			ctypes.c_void_p,
+			ctypes.c_void_p,
+		]
 		"""set essential parameters"""
 		self.in_path = in_path
 		self.sampling_mode = sampling_mode
@@ -59,6 +67,7 @@ class TestDataLoader(object):
 		self.relTotal = self.lib.getRelationTotal()
 		self.entTotal = self.lib.getEntityTotal()
 		self.testTotal = self.lib.getTestTotal()
+		self.validTotal = self.lib.getValidTotal()
 
 		self.test_h = np.zeros(self.entTotal, dtype=np.int64)
 		self.test_t = np.zeros(self.entTotal, dtype=np.int64)
@@ -80,6 +89,13 @@ class TestDataLoader(object):
 		self.test_neg_t_addr = self.test_neg_t.__array_interface__["data"][0]
 		self.test_neg_r_addr = self.test_neg_r.__array_interface__["data"][0]
 
+		self.valid_pos_h = np.zeros(self.validTotal, dtype=np.int64)
+		self.valid_pos_t = np.zeros(self.validTotal, dtype=np.int64)
+		self.valid_pos_r = np.zeros(self.validTotal, dtype=np.int64)
+		self.valid_neg_h = np.zeros(self.validTotal, dtype=np.int64)
+		self.valid_neg_t = np.zeros(self.validTotal, dtype=np.int64)
+		self.valid_neg_r = np.zeros(self.validTotal, dtype=np.int64)
+
 	def sampling_lp(self):
 		res = []
 		self.lib.getHeadBatch(self.test_h_addr, self.test_t_addr, self.test_r_addr)
@@ -122,6 +138,30 @@ class TestDataLoader(object):
 			}
 		]
 
+	def sampling_valid_tc(self):
+		self.lib.getValidBatch(
+			self.valid_pos_h.__array_interface__["data"][0],
+			self.valid_pos_t.__array_interface__["data"][0],
+			self.valid_pos_r.__array_interface__["data"][0],
+			self.valid_neg_h.__array_interface__["data"][0],
+			self.valid_neg_t.__array_interface__["data"][0],
+			self.valid_neg_r.__array_interface__["data"][0],
+		)
+		return [
+			{
+				'batch_h': self.valid_pos_h,
+				'batch_t': self.valid_pos_t,
+				'batch_r': self.valid_pos_r,
+				"mode": "normal"
+			},
+			{
+				'batch_h': self.valid_neg_h,
+				'batch_t': self.valid_neg_t,
+				'batch_r': self.valid_neg_r,
+				"mode": "normal"
+			}
+		]
+
 	"""interfaces to get essential parameters"""
 
 	def get_ent_tot(self):
@@ -133,6 +173,9 @@ class TestDataLoader(object):
 	def get_triple_tot(self):
 		return self.testTotal
 
+	def get_valid_tot(self):
+		return self.validTotal
+
 	def set_sampling_mode(self, sampling_mode):
 		self.sampling_mode = sampling_mode
 
@@ -143,6 +186,8 @@ class TestDataLoader(object):
 		if self.sampling_mode == "link":
 			self.lib.initTest()
 			return TestDataSampler(self.testTotal, self.sampling_lp)
+		elif self.sampling_mode == "valid_classification":
+			return TestDataSampler(1, self.sampling_valid_tc)
 		else:
 			self.lib.initTest()
 			return TestDataSampler(1, self.sampling_tc)
\ No newline at end of file
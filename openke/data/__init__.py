@@ -4,8 +4,12 @@ from __future__ import print_function
 
 from .TrainDataLoader import TrainDataLoader
 from .TestDataLoader import TestDataLoader
+from .ParamFile import save_param_file, load_param_file, is_param_file
 
 __all__ = [
 	'TrainDataLoader',
-	'TestDataLoader'
+	'TestDataLoader',
+	'save_param_file',
+	'load_param_file',
+	'is_param_file'
 ]
\ No newline at end of file
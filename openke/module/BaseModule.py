@@ -3,6 +3,7 @@ import torch.nn as nn
 import os
 import json
 import numpy as np
+from ..data.ParamFile import save_param_file, load_param_file, is_param_file
 
 class BaseModule(nn.Module):
 
@@ -21,15 +22,21 @@ class BaseModule(nn.Module):
 		torch.save(self.state_dict(), path)
 
 	def load_parameters(self, path):
-		f = open(path, "r")
-		parameters = json.loads(f.read())
-		f.close()
+		if is_param_file(path):
+			parameters = load_param_file(path, mmap = False)
+		else:
+			f = open(path, "r")
+			parameters = json.loads(f.read())
+			f.close()
 		for i in parameters:
 			parameters[i] = torch.Tensor(parameters[i])
 		self.load_state_dict(parameters, strict = False)
 		self.eval()
 
-	def save_parameters(self, path):
+	def save_parameters(self, path, binary = False):
+		if binary:
+			save_param_file(path, self.get_parameters("numpy"))
+			return
 		f = open(path, "w")
 		f.write(json.dumps(self.get_parameters("list")))
 		f.close()
@@ -0,0 +1,45 @@
+# coding:utf-8
+"""
+Distances between a batch of queries and every row of a matrix (e.g. all entities), for the Trans* models,
+without materializing the (queries, rows, dim) difference tensor.
+"""
+import torch
+
+# max number of elements of the (queries, rows) block computed at once
+BLOCK_SIZE = 1 << 21
+
+
+def squared_norms(m):
+	"""
+	:param m: matrix, shape (N, d)
+	:return: squared l2 norm of every row, shape (N,), to be cached next to a matrix scanned many times
+	"""
+	return (m * m).sum(-1)
+
+
+def pairwise_distance(q, m, p_norm = 1, m_sq_norms = None, block_size = BLOCK_SIZE):
+	"""
+	p_norm = 2 uses ||q - e||^2 = ||q||^2 + ||e||^2 - 2 q.e, one matrix product per block of rows,
+	other norms are computed by torch.cdist a block of rows at a time.
+	The distance of (nearly) equal vectors is less precise with p_norm = 2, about 1e-3 instead of 0.
+	:param q: queries, shape (B, d)
+	:param m: rows, shape (N, d)
+	:param m_sq_norms: squared_norms(m), computed here when it is not given (p_norm = 2 only)
+	:param block_size: max number of elements of the temporary (queries, rows) blocks
+	:return: distance of every (query, row) pair, shape (B, N)
+	"""
+	rows = max(1, block_size // max(1, q.shape[0]))
+	scores = q.new_empty((q.shape[0], m.shape[0]))
+	if p_norm == 2:
+		if m_sq_norms is None:
+			m_sq_norms = squared_norms(m)
+		q_sq_norms = squared_norms(q).unsqueeze(1)
+		for j in range(0, m.shape[0], rows):
+			block = torch.mm(q, m[j:j + rows].t())
+			block.mul_(-2).add_(q_sq_norms).add_(m_sq_norms[j:j + rows])
+			# rounding may take the squared distance of close vectors below 0
+			scores[:, j:j + rows] = block.clamp_(min = 0).sqrt_()
+		return scores
+	for j in range(0, m.shape[0], rows):
+		scores[:, j:j + rows] = torch.cdist(q, m[j:j + rows], p = p_norm)
+	return scores
@@ -2,6 +2,7 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 from .Model import Model
+from ..Distance import pairwise_distance, squared_norms
 
 class TransE(Model):
 
@@ -91,4 +92,36 @@ class TransE(Model):
 			score = self.margin - score
 			return score.cpu().data.numpy()
 		else:
-			return score.cpu().data.numpy()
\ No newline at end of file
+			return score.cpu().data.numpy()
+
+	def entity_matrix(self):
+		"""
+		:return: (entities as compared with the queries of predict_batch, their squared norms or None unless p_norm is 2),
+				 to be computed once for a whole evaluation
+		"""
+		ent = self.ent_embeddings.weight
+		if self.norm_flag:
+			ent = F.normalize(ent, 2, -1)
+		return ent, squared_norms(ent) if self.p_norm == 2 else None
+
+	def predict_batch(self, ids, r, mode, entities = None):
+		"""
+		Scores of every entity as the head (head_batch, ids are tails) or the tail (tail_batch, ids are heads) of B
+		queries with one pairwise_distance, instead of one predict call over ent_tot triples per query.
+		:param entities: entity_matrix(), computed here when it is not given
+		:return: numpy array, shape (B, ent_tot), same scores as predict
+		"""
+		if entities is None:
+			entities = self.entity_matrix()
+		ent, ent_sq_norms = entities
+		e = self.ent_embeddings(ids)
+		r = self.rel_embeddings(r)
+		if self.norm_flag:
+			e = F.normalize(e, 2, -1)
+			r = F.normalize(r, 2, -1)
+		if mode == 'head_batch':
+			q = e - r
+		else:
+			q = e + r
+		score = pairwise_distance(q, ent, self.p_norm, ent_sq_norms)
+		return score.cpu().data.numpy()
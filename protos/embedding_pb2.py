@@ -21,7 +21,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='com.ices.sh.embedding.rpc',
   syntax='proto3',
   serialized_options=_b('\n\031com.ices.sh.embedding.rpcB\021GraphEmbeddingRpc'),
-  serialized_pb=_b('\n\x0f\x65mbedding.proto\x12\x19\x63om.ices.sh.embedding.rpc\x1a\x1egoogle/protobuf/wrappers.proto\"B\n\x13GetEmbeddingRequest\x12\x0b\n\x03gid\x18\x01 \x01(\x03\x12\x11\n\tmodelName\x18\x02 \x01(\t\x12\x0b\n\x03val\x18\x03 \x01(\t\"#\n\x14GetEmbeddingResponse\x12\x0b\n\x03val\x18\x01 \x03(\x01\"_\n\x12PredictHeadRequest\x12\x0c\n\x04tail\x18\x01 \x01(\t\x12\x10\n\x08relation\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\"_\n\x12PredictTailRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x10\n\x08relation\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\"_\n\x16PredictRelationRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x0c\n\x04tail\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\"\"\n\x13PredictPartResponse\x12\x0b\n\x03val\x18\x01 \x03(\t\"t\n\x14PredictTripleRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x0c\n\x04tail\x18\x02 \x01(\t\x12\x10\n\x08relation\x18\x03 \x01(\t\x12\x0e\n\x06thresh\x18\x04 \x01(\x02\x12\x0b\n\x03gid\x18\x05 \x01(\x03\x12\x11\n\tmodelName\x18\x06 \x01(\t2\xb7\x05\n\x15GraphEmbeddingService\x12l\n\x0bpredictHead\x12-.com.ices.sh.embedding.rpc.PredictHeadRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12l\n\x0bpredictTail\x12-.com.ices.sh.embedding.rpc.PredictTailRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12t\n\x0fpredictRelation\x12\x31.com.ices.sh.embedding.rpc.PredictRelationRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12\\\n\rpredictTriple\x12/.com.ices.sh.embedding.rpc.PredictTripleRequest\x1a\x1a.google.protobuf.BoolValue\x12u\n\x12getEntityEmbedding\x12..com.ices.sh.embedding.rpc.GetEmbeddingRequest\x1a/.com.ices.sh.embedding.rpc.GetEmbeddingResponse\x12w\n\x14getRelationEmbedding\x12..com.ices.sh.embedding.rpc.GetEmbeddingRequest\x1a/.com.ices.sh.embedding.rpc.GetEmbeddingResponseB.\n\x19\x63om.ices.sh.embedding.rpcB\x11GraphEmbeddingRpcb\x06proto3')
+  serialized_pb=_b('\n\x0f\x65mbedding.proto\x12\x19\x63om.ices.sh.embedding.rpc\x1a\x1egoogle/protobuf/wrappers.proto\"Q\n\x13GetEmbeddingRequest\x12\x0b\n\x03gid\x18\x01 \x01(\x03\x12\x11\n\tmodelName\x18\x02 \x01(\t\x12\x0b\n\x03val\x18\x03 \x01(\t\x12\r\n\x05\x64type\x18\x04 \x01(\t\"O\n\x14GetEmbeddingResponse\x12\x0b\n\x03val\x18\x01 \x03(\x01\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\r\n\x05\x64type\x18\x03 \x01(\t\x12\r\n\x05shape\x18\x04 \x03(\x03\"\x8e\x01\n\x12PredictHeadRequest\x12\x0c\n\x04tail\x18\x01 \x01(\t\x12\x10\n\x08relation\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\x12\x15\n\rexclude_known\x18\x06 \x01(\x08\x12\x16\n\x0etype_constrain\x18\x07 \x01(\x08\"\x8e\x01\n\x12PredictTailRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x10\n\x08relation\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\x12\x15\n\rexclude_known\x18\x06 \x01(\x08\x12\x16\n\x0etype_constrain\x18\x07 \x01(\x08\"_\n\x16PredictRelationRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x0c\n\x04tail\x18\x02 \x01(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\"\"\n\x13PredictPartResponse\x12\x0b\n\x03val\x18\x01 \x03(\t\"t\n\x14PredictTripleRequest\x12\x0c\n\x04head\x18\x01 \x01(\t\x12\x0c\n\x04tail\x18\x02 \x01(\t\x12\x10\n\x08relation\x18\x03 \x01(\t\x12\x0e\n\x06thresh\x18\x04 \x01(\x02\x12\x0b\n\x03gid\x18\x05 \x01(\x03\x12\x11\n\tmodelName\x18\x06 \x01(\t\"R\n\x14GetEmbeddingsRequest\x12\x0b\n\x03gid\x18\x01 \x01(\x03\x12\x11\n\tmodelName\x18\x02 \x01(\t\x12\x0b\n\x03val\x18\x03 \x03(\t\x12\r\n\x05\x64type\x18\x04 \x01(\t\"\x81\x01\n\x15GetEmbeddingsResponse\x12<\n\x03val\x18\x01 \x03(\x0b\x32/.com.ices.sh.embedding.rpc.GetEmbeddingResponse\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\r\n\x05\x64type\x18\x03 \x01(\t\x12\r\n\x05shape\x18\x04 \x03(\x03\"\x8c\x01\n\x17\x45xportEmbeddingsRequest\x12\x0b\n\x03gid\x18\x01 \x01(\x03\x12\x11\n\tmodelName\x18\x02 \x01(\t\x12\x0c\n\x04kind\x18\x03 \x01(\t\x12\r\n\x05\x64type\x18\x04 \x01(\t\x12\x11\n\tpage_size\x18\x05 \x01(\x05\x12\r\n\x05start\x18\x06 \x01(\x03\x12\x12\n\nwith_names\x18\x07 \x01(\x08\"d\n\x18\x45xportEmbeddingsResponse\x12\r\n\x05start\x18\x01 \x01(\x03\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\r\n\x05\x64type\x18\x03 \x01(\t\x12\r\n\x05shape\x18\x04 \x03(\x03\x12\r\n\x05names\x18\x05 \x03(\t\"\x93\x01\n\x17PredictHeadBatchRequest\x12\x0c\n\x04tail\x18\x01 \x03(\t\x12\x10\n\x08relation\x18\x02 \x03(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\x12\x15\n\rexclude_known\x18\x06 \x01(\x08\x12\x16\n\x0etype_constrain\x18\x07 \x01(\x08\"\x93\x01\n\x17PredictTailBatchRequest\x12\x0c\n\x04head\x18\x01 \x03(\t\x12\x10\n\x08relation\x18\x02 \x03(\t\x12\t\n\x01k\x18\x03 \x01(\x05\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\x12\x15\n\rexclude_known\x18\x06 \x01(\x08\x12\x16\n\x0etype_constrain\x18\x07 \x01(\x08\"W\n\x18PredictPartBatchResponse\x12;\n\x03val\x18\x01 \x03(\x0b\x32..com.ices.sh.embedding.rpc.PredictPartResponse\"y\n\x19PredictTripleBatchRequest\x12\x0c\n\x04head\x18\x01 \x03(\t\x12\x0c\n\x04tail\x18\x02 \x03(\t\x12\x10\n\x08relation\x18\x03 \x03(\t\x12\x0e\n\x06thresh\x18\x04 \x01(\x02\x12\x0b\n\x03gid\x18\x05 \x01(\x03\x12\x11\n\tmodelName\x18\x06 \x01(\t\")\n\x1aPredictTripleBatchResponse\x12\x0b\n\x03val\x18\x01 \x03(\x08\"\x97\x01\n\x1a\x43lassifyTripleBatchRequest\x12\x0c\n\x04head\x18\x01 \x03(\t\x12\x0c\n\x04tail\x18\x02 \x03(\t\x12\x10\n\x08relation\x18\x03 \x03(\t\x12\x0b\n\x03gid\x18\x04 \x01(\x03\x12\x11\n\tmodelName\x18\x05 \x01(\t\x12+\n\x06thresh\x18\x06 \x01(\x0b\x32\x1b.google.protobuf.FloatValue\"I\n\x1b\x43lassifyTripleBatchResponse\x12\x0b\n\x03val\x18\x01 \x03(\x08\x12\r\n\x05score\x18\x02 \x03(\x02\x12\x0e\n\x06thresh\x18\x03 \x03(\x02\"7\n\x17\x44umpSlowRequestsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\r\n\x05\x63lear\x18\x02 \x01(\x08\"(\n\x0bStageTiming\x12\r\n\x05stage\x18\x01 \x01(\t\x12\n\n\x02ms\x18\x02 \x01(\x01\"v\n\x0bSlowRequest\x12\x0b\n\x03rpc\x18\x01 \x01(\t\x12\x11\n\ttimestamp\x18\x02 \x01(\x01\x12\x36\n\x06stages\x18\x03 \x03(\x0b\x32&.com.ices.sh.embedding.rpc.StageTiming\x12\x0f\n\x07request\x18\x04 \x01(\t\"T\n\x18\x44umpSlowRequestsResponse\x12\x38\n\x08requests\x18\x01 \x03(\x0b\x32&.com.ices.sh.embedding.rpc.SlowRequest\"c\n\x16SimilarEntitiesRequest\x12\x0b\n\x03gid\x18\x01 \x01(\x03\x12\x11\n\tmodelName\x18\x02 \x01(\t\x12\x0e\n\x06\x65ntity\x18\x03 \x03(\t\x12\t\n\x01k\x18\x04 \x01(\x05\x12\x0e\n\x06metric\x18\x05 \x01(\t\"1\n\x13SimilarEntitiesPart\x12\x0b\n\x03val\x18\x01 \x03(\t\x12\r\n\x05score\x18\x02 \x03(\x01\"V\n\x17SimilarEntitiesResponse\x12;\n\x03val\x18\x01 \x03(\x0b\x32..com.ices.sh.embedding.rpc.SimilarEntitiesPart2\x9c\x0f\n\x15GraphEmbeddingService\x12l\n\x0bpredictHead\x12-.com.ices.sh.embedding.rpc.PredictHeadRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12l\n\x0bpredictTail\x12-.com.ices.sh.embedding.rpc.PredictTailRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12t\n\x0fpredictRelation\x12\x31.com.ices.sh.embedding.rpc.PredictRelationRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse\x12\\\n\rpredictTriple\x12/.com.ices.sh.embedding.rpc.PredictTripleRequest\x1a\x1a.google.protobuf.BoolValue\x12u\n\x12getEntityEmbedding\x12..com.ices.sh.embedding.rpc.GetEmbeddingRequest\x1a/.com.ices.sh.embedding.rpc.GetEmbeddingResponse\x12w\n\x14getRelationEmbedding\x12..com.ices.sh.embedding.rpc.GetEmbeddingRequest\x1a/.com.ices.sh.embedding.rpc.GetEmbeddingResponse\x12{\n\x10predictHeadBatch\x12\x32.com.ices.sh.embedding.rpc.PredictHeadBatchRequest\x1a\x33.com.ices.sh.embedding.rpc.PredictPartBatchResponse\x12{\n\x10predictTailBatch\x12\x32.com.ices.sh.embedding.rpc.PredictTailBatchRequest\x1a\x33.com.ices.sh.embedding.rpc.PredictPartBatchResponse\x12\x81\x01\n\x12predictTripleBatch\x12\x34.com.ices.sh.embedding.rpc.PredictTripleBatchRequest\x1a\x35.com.ices.sh.embedding.rpc.PredictTripleBatchResponse\x12x\n\x13getEntityEmbeddings\x12/.com.ices.sh.embedding.rpc.GetEmbeddingsRequest\x1a\x30.com.ices.sh.embedding.rpc.GetEmbeddingsResponse\x12v\n\x11predictHeadStream\x12-.com.ices.sh.embedding.rpc.PredictHeadRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse(\x01\x30\x01\x12v\n\x11predictTailStream\x12-.com.ices.sh.embedding.rpc.PredictTailRequest\x1a..com.ices.sh.embedding.rpc.PredictPartResponse(\x01\x30\x01\x12}\n\x10\x65xportEmbeddings\x12\x32.com.ices.sh.embedding.rpc.ExportEmbeddingsRequest\x1a\x33.com.ices.sh.embedding.rpc.ExportEmbeddingsResponse0\x01\x12{\n\x10\x64umpSlowRequests\x12\x32.com.ices.sh.embedding.rpc.DumpSlowRequestsRequest\x1a\x33.com.ices.sh.embedding.rpc.DumpSlowRequestsResponse\x12x\n\x0fsimilarEntities\x12\x31.com.ices.sh.embedding.rpc.SimilarEntitiesRequest\x1a\x32.com.ices.sh.embedding.rpc.SimilarEntitiesResponse\x12\x84\x01\n\x13\x63lassifyTripleBatch\x12\x35.com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest\x1a\x36.com.ices.sh.embedding.rpc.ClassifyTripleBatchResponseB.\n\x19\x63om.ices.sh.embedding.rpcB\x11GraphEmbeddingRpcb\x06proto3')
   ,
   dependencies=[google_dot_protobuf_dot_wrappers__pb2.DESCRIPTOR,])
 
@@ -56,6 +56,988 @@ _GETEMBEDDINGREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.GetEmbeddingRequest.dtype', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=78,
+  serialized_end=159,
+)
+
+
+_GETEMBEDDINGRESPONSE = _descriptor.Descriptor(
+  name='GetEmbeddingResponse',
+  full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse.val', index=0,
+      number=1, type=1, cpp_type=5, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse.data', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse.dtype', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shape', full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse.shape', index=3,
+      number=4, type=3, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=161,
+  serialized_end=240,
+)
+
+
+_PREDICTHEADREQUEST = _descriptor.Descriptor(
+  name='PredictHeadRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictHeadRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.tail', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.relation', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.k', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='exclude_known', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.exclude_known', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='type_constrain', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.type_constrain', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=243,
+  serialized_end=385,
+)
+
+
+_PREDICTTAILREQUEST = _descriptor.Descriptor(
+  name='PredictTailRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictTailRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.relation', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.k', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='exclude_known', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.exclude_known', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='type_constrain', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.type_constrain', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=388,
+  serialized_end=530,
+)
+
+
+_PREDICTRELATIONREQUEST = _descriptor.Descriptor(
+  name='PredictRelationRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictRelationRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.tail', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.k', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=532,
+  serialized_end=627,
+)
+
+
+_PREDICTPARTRESPONSE = _descriptor.Descriptor(
+  name='PredictPartResponse',
+  full_name='com.ices.sh.embedding.rpc.PredictPartResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.PredictPartResponse.val', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=629,
+  serialized_end=663,
+)
+
+
+_PREDICTTRIPLEREQUEST = _descriptor.Descriptor(
+  name='PredictTripleRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictTripleRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.tail', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.relation', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='thresh', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.thresh', index=3,
+      number=4, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.gid', index=4,
+      number=5, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.modelName', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=665,
+  serialized_end=781,
+)
+
+
+_GETEMBEDDINGSREQUEST = _descriptor.Descriptor(
+  name='GetEmbeddingsRequest',
+  full_name='com.ices.sh.embedding.rpc.GetEmbeddingsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsRequest.gid', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsRequest.modelName', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsRequest.val', index=2,
+      number=3, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsRequest.dtype', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=783,
+  serialized_end=865,
+)
+
+
+_GETEMBEDDINGSRESPONSE = _descriptor.Descriptor(
+  name='GetEmbeddingsResponse',
+  full_name='com.ices.sh.embedding.rpc.GetEmbeddingsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsResponse.val', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsResponse.data', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsResponse.dtype', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shape', full_name='com.ices.sh.embedding.rpc.GetEmbeddingsResponse.shape', index=3,
+      number=4, type=3, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=868,
+  serialized_end=997,
+)
+
+
+_EXPORTEMBEDDINGSREQUEST = _descriptor.Descriptor(
+  name='ExportEmbeddingsRequest',
+  full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.gid', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.modelName', index=1,
+      number=2, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='kind', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.kind', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.dtype', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='page_size', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.page_size', index=4,
+      number=5, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='start', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.start', index=5,
+      number=6, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='with_names', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsRequest.with_names', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1000,
+  serialized_end=1140,
+)
+
+
+_EXPORTEMBEDDINGSRESPONSE = _descriptor.Descriptor(
+  name='ExportEmbeddingsResponse',
+  full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='start', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse.start', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='data', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse.data', index=1,
+      number=2, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='dtype', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse.dtype', index=2,
+      number=3, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='shape', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse.shape', index=3,
+      number=4, type=3, cpp_type=2, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='names', full_name='com.ices.sh.embedding.rpc.ExportEmbeddingsResponse.names', index=4,
+      number=5, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1142,
+  serialized_end=1242,
+)
+
+
+_PREDICTHEADBATCHREQUEST = _descriptor.Descriptor(
+  name='PredictHeadBatchRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.tail', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.relation', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.k', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='exclude_known', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.exclude_known', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='type_constrain', full_name='com.ices.sh.embedding.rpc.PredictHeadBatchRequest.type_constrain', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1245,
+  serialized_end=1392,
+)
+
+
+_PREDICTTAILBATCHREQUEST = _descriptor.Descriptor(
+  name='PredictTailBatchRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.relation', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='k', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.k', index=2,
+      number=3, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='exclude_known', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.exclude_known', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='type_constrain', full_name='com.ices.sh.embedding.rpc.PredictTailBatchRequest.type_constrain', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1395,
+  serialized_end=1542,
+)
+
+
+_PREDICTPARTBATCHRESPONSE = _descriptor.Descriptor(
+  name='PredictPartBatchResponse',
+  full_name='com.ices.sh.embedding.rpc.PredictPartBatchResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.PredictPartBatchResponse.val', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1544,
+  serialized_end=1631,
+)
+
+
+_PREDICTTRIPLEBATCHREQUEST = _descriptor.Descriptor(
+  name='PredictTripleBatchRequest',
+  full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.tail', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.relation', index=2,
+      number=3, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='thresh', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.thresh', index=3,
+      number=4, type=2, cpp_type=6, label=1,
+      has_default_value=False, default_value=float(0),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.gid', index=4,
+      number=5, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchRequest.modelName', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1633,
+  serialized_end=1754,
+)
+
+
+_PREDICTTRIPLEBATCHRESPONSE = _descriptor.Descriptor(
+  name='PredictTripleBatchResponse',
+  full_name='com.ices.sh.embedding.rpc.PredictTripleBatchResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.PredictTripleBatchResponse.val', index=0,
+      number=1, type=8, cpp_type=7, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1756,
+  serialized_end=1797,
+)
+
+
+_CLASSIFYTRIPLEBATCHREQUEST = _descriptor.Descriptor(
+  name='ClassifyTripleBatchRequest',
+  full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='head', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.head', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='tail', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.tail', index=1,
+      number=2, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='relation', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.relation', index=2,
+      number=3, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='gid', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.gid', index=3,
+      number=4, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='modelName', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.modelName', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='thresh', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest.thresh', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1800,
+  serialized_end=1951,
+)
+
+
+_CLASSIFYTRIPLEBATCHRESPONSE = _descriptor.Descriptor(
+  name='ClassifyTripleBatchResponse',
+  full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='val', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchResponse.val', index=0,
+      number=1, type=8, cpp_type=7, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='score', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchResponse.score', index=1,
+      number=2, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='thresh', full_name='com.ices.sh.embedding.rpc.ClassifyTripleBatchResponse.thresh', index=2,
+      number=3, type=2, cpp_type=6, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -68,22 +1050,29 @@ _GETEMBEDDINGREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=78,
-  serialized_end=144,
+  serialized_start=1953,
+  serialized_end=2026,
 )
 
 
-_GETEMBEDDINGRESPONSE = _descriptor.Descriptor(
-  name='GetEmbeddingResponse',
-  full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse',
+_DUMPSLOWREQUESTSREQUEST = _descriptor.Descriptor(
+  name='DumpSlowRequestsRequest',
+  full_name='com.ices.sh.embedding.rpc.DumpSlowRequestsRequest',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='val', full_name='com.ices.sh.embedding.rpc.GetEmbeddingResponse.val', index=0,
-      number=1, type=1, cpp_type=5, label=3,
-      has_default_value=False, default_value=[],
+      name='limit', full_name='com.ices.sh.embedding.rpc.DumpSlowRequestsRequest.limit', index=0,
+      number=1, type=5, cpp_type=1, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='clear', full_name='com.ices.sh.embedding.rpc.DumpSlowRequestsRequest.clear', index=1,
+      number=2, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
@@ -99,50 +1088,29 @@ _GETEMBEDDINGRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=146,
-  serialized_end=181,
+  serialized_start=2028,
+  serialized_end=2083,
 )
 
 
-_PREDICTHEADREQUEST = _descriptor.Descriptor(
-  name='PredictHeadRequest',
-  full_name='com.ices.sh.embedding.rpc.PredictHeadRequest',
+_STAGETIMING = _descriptor.Descriptor(
+  name='StageTiming',
+  full_name='com.ices.sh.embedding.rpc.StageTiming',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='tail', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.tail', index=0,
+      name='stage', full_name='com.ices.sh.embedding.rpc.StageTiming.stage', index=0,
       number=1, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='relation', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.relation', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='k', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.k', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='gid', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.gid', index=3,
-      number=4, type=3, cpp_type=2, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictHeadRequest.modelName', index=4,
-      number=5, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='ms', full_name='com.ices.sh.embedding.rpc.StageTiming.ms', index=1,
+      number=2, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
@@ -158,50 +1126,74 @@ _PREDICTHEADREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=183,
-  serialized_end=278,
+  serialized_start=2085,
+  serialized_end=2125,
 )
 
 
-_PREDICTTAILREQUEST = _descriptor.Descriptor(
-  name='PredictTailRequest',
-  full_name='com.ices.sh.embedding.rpc.PredictTailRequest',
+_SLOWREQUEST = _descriptor.Descriptor(
+  name='SlowRequest',
+  full_name='com.ices.sh.embedding.rpc.SlowRequest',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='head', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.head', index=0,
+      name='rpc', full_name='com.ices.sh.embedding.rpc.SlowRequest.rpc', index=0,
       number=1, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.relation', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='timestamp', full_name='com.ices.sh.embedding.rpc.SlowRequest.timestamp', index=1,
+      number=2, type=1, cpp_type=5, label=1,
+      has_default_value=False, default_value=float(0),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='k', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.k', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
+      name='stages', full_name='com.ices.sh.embedding.rpc.SlowRequest.stages', index=2,
+      number=3, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.gid', index=3,
-      number=4, type=3, cpp_type=2, label=1,
-      has_default_value=False, default_value=0,
+      name='request', full_name='com.ices.sh.embedding.rpc.SlowRequest.request', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=2127,
+  serialized_end=2245,
+)
+
+
+_DUMPSLOWREQUESTSRESPONSE = _descriptor.Descriptor(
+  name='DumpSlowRequestsResponse',
+  full_name='com.ices.sh.embedding.rpc.DumpSlowRequestsResponse',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
     _descriptor.FieldDescriptor(
-      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTailRequest.modelName', index=4,
-      number=5, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='requests', full_name='com.ices.sh.embedding.rpc.DumpSlowRequestsResponse.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
@@ -217,48 +1209,48 @@ _PREDICTTAILREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=280,
-  serialized_end=375,
+  serialized_start=2247,
+  serialized_end=2331,
 )
 
 
-_PREDICTRELATIONREQUEST = _descriptor.Descriptor(
-  name='PredictRelationRequest',
-  full_name='com.ices.sh.embedding.rpc.PredictRelationRequest',
+_SIMILARENTITIESREQUEST = _descriptor.Descriptor(
+  name='SimilarEntitiesRequest',
+  full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='head', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.head', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='gid', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest.gid', index=0,
+      number=1, type=3, cpp_type=2, label=1,
+      has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='tail', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.tail', index=1,
+      name='modelName', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest.modelName', index=1,
       number=2, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='k', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.k', index=2,
-      number=3, type=5, cpp_type=1, label=1,
-      has_default_value=False, default_value=0,
+      name='entity', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest.entity', index=2,
+      number=3, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='gid', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.gid', index=3,
-      number=4, type=3, cpp_type=2, label=1,
+      name='k', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest.k', index=3,
+      number=4, type=5, cpp_type=1, label=1,
       has_default_value=False, default_value=0,
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
     _descriptor.FieldDescriptor(
-      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictRelationRequest.modelName', index=4,
+      name='metric', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesRequest.metric', index=4,
       number=5, type=9, cpp_type=9, label=1,
       has_default_value=False, default_value=_b("").decode('utf-8'),
       message_type=None, enum_type=None, containing_type=None,
@@ -276,25 +1268,32 @@ _PREDICTRELATIONREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=377,
-  serialized_end=472,
+  serialized_start=2333,
+  serialized_end=2432,
 )
 
 
-_PREDICTPARTRESPONSE = _descriptor.Descriptor(
-  name='PredictPartResponse',
-  full_name='com.ices.sh.embedding.rpc.PredictPartResponse',
+_SIMILARENTITIESPART = _descriptor.Descriptor(
+  name='SimilarEntitiesPart',
+  full_name='com.ices.sh.embedding.rpc.SimilarEntitiesPart',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='val', full_name='com.ices.sh.embedding.rpc.PredictPartResponse.val', index=0,
+      name='val', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesPart.val', index=0,
       number=1, type=9, cpp_type=9, label=3,
       has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='score', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesPart.score', index=1,
+      number=2, type=1, cpp_type=5, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -307,57 +1306,22 @@ _PREDICTPARTRESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=474,
-  serialized_end=508,
+  serialized_start=2434,
+  serialized_end=2483,
 )
 
 
-_PREDICTTRIPLEREQUEST = _descriptor.Descriptor(
-  name='PredictTripleRequest',
-  full_name='com.ices.sh.embedding.rpc.PredictTripleRequest',
+_SIMILARENTITIESRESPONSE = _descriptor.Descriptor(
+  name='SimilarEntitiesResponse',
+  full_name='com.ices.sh.embedding.rpc.SimilarEntitiesResponse',
   filename=None,
   file=DESCRIPTOR,
   containing_type=None,
   fields=[
     _descriptor.FieldDescriptor(
-      name='head', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.head', index=0,
-      number=1, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='tail', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.tail', index=1,
-      number=2, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='relation', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.relation', index=2,
-      number=3, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='thresh', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.thresh', index=3,
-      number=4, type=2, cpp_type=6, label=1,
-      has_default_value=False, default_value=float(0),
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='gid', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.gid', index=4,
-      number=5, type=3, cpp_type=2, label=1,
-      has_default_value=False, default_value=0,
-      message_type=None, enum_type=None, containing_type=None,
-      is_extension=False, extension_scope=None,
-      serialized_options=None, file=DESCRIPTOR),
-    _descriptor.FieldDescriptor(
-      name='modelName', full_name='com.ices.sh.embedding.rpc.PredictTripleRequest.modelName', index=5,
-      number=6, type=9, cpp_type=9, label=1,
-      has_default_value=False, default_value=_b("").decode('utf-8'),
+      name='val', full_name='com.ices.sh.embedding.rpc.SimilarEntitiesResponse.val', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
@@ -373,10 +1337,16 @@ _PREDICTTRIPLEREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=510,
-  serialized_end=626,
+  serialized_start=2485,
+  serialized_end=2571,
 )
 
+_GETEMBEDDINGSRESPONSE.fields_by_name['val'].message_type = _GETEMBEDDINGRESPONSE
+_PREDICTPARTBATCHRESPONSE.fields_by_name['val'].message_type = _PREDICTPARTRESPONSE
+_CLASSIFYTRIPLEBATCHREQUEST.fields_by_name['thresh'].message_type = google_dot_protobuf_dot_wrappers__pb2._FLOATVALUE
+_SLOWREQUEST.fields_by_name['stages'].message_type = _STAGETIMING
+_DUMPSLOWREQUESTSRESPONSE.fields_by_name['requests'].message_type = _SLOWREQUEST
+_SIMILARENTITIESRESPONSE.fields_by_name['val'].message_type = _SIMILARENTITIESPART
 DESCRIPTOR.message_types_by_name['GetEmbeddingRequest'] = _GETEMBEDDINGREQUEST
 DESCRIPTOR.message_types_by_name['GetEmbeddingResponse'] = _GETEMBEDDINGRESPONSE
 DESCRIPTOR.message_types_by_name['PredictHeadRequest'] = _PREDICTHEADREQUEST
@@ -384,6 +1354,24 @@ DESCRIPTOR.message_types_by_name['PredictTailRequest'] = _PREDICTTAILREQUEST
 DESCRIPTOR.message_types_by_name['PredictRelationRequest'] = _PREDICTRELATIONREQUEST
 DESCRIPTOR.message_types_by_name['PredictPartResponse'] = _PREDICTPARTRESPONSE
 DESCRIPTOR.message_types_by_name['PredictTripleRequest'] = _PREDICTTRIPLEREQUEST
+DESCRIPTOR.message_types_by_name['GetEmbeddingsRequest'] = _GETEMBEDDINGSREQUEST
+DESCRIPTOR.message_types_by_name['GetEmbeddingsResponse'] = _GETEMBEDDINGSRESPONSE
+DESCRIPTOR.message_types_by_name['ExportEmbeddingsRequest'] = _EXPORTEMBEDDINGSREQUEST
+DESCRIPTOR.message_types_by_name['ExportEmbeddingsResponse'] = _EXPORTEMBEDDINGSRESPONSE
+DESCRIPTOR.message_types_by_name['PredictHeadBatchRequest'] = _PREDICTHEADBATCHREQUEST
+DESCRIPTOR.message_types_by_name['PredictTailBatchRequest'] = _PREDICTTAILBATCHREQUEST
+DESCRIPTOR.message_types_by_name['PredictPartBatchResponse'] = _PREDICTPARTBATCHRESPONSE
+DESCRIPTOR.message_types_by_name['PredictTripleBatchRequest'] = _PREDICTTRIPLEBATCHREQUEST
+DESCRIPTOR.message_types_by_name['PredictTripleBatchResponse'] = _PREDICTTRIPLEBATCHRESPONSE
+DESCRIPTOR.message_types_by_name['ClassifyTripleBatchRequest'] = _CLASSIFYTRIPLEBATCHREQUEST
+DESCRIPTOR.message_types_by_name['ClassifyTripleBatchResponse'] = _CLASSIFYTRIPLEBATCHRESPONSE
+DESCRIPTOR.message_types_by_name['DumpSlowRequestsRequest'] = _DUMPSLOWREQUESTSREQUEST
+DESCRIPTOR.message_types_by_name['StageTiming'] = _STAGETIMING
+DESCRIPTOR.message_types_by_name['SlowRequest'] = _SLOWREQUEST
+DESCRIPTOR.message_types_by_name['DumpSlowRequestsResponse'] = _DUMPSLOWREQUESTSRESPONSE
+DESCRIPTOR.message_types_by_name['SimilarEntitiesRequest'] = _SIMILARENTITIESREQUEST
+DESCRIPTOR.message_types_by_name['SimilarEntitiesPart'] = _SIMILARENTITIESPART
+DESCRIPTOR.message_types_by_name['SimilarEntitiesResponse'] = _SIMILARENTITIESRESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 GetEmbeddingRequest = _reflection.GeneratedProtocolMessageType('GetEmbeddingRequest', (_message.Message,), dict(
@@ -435,6 +1423,132 @@ PredictTripleRequest = _reflection.GeneratedProtocolMessageType('PredictTripleRe
   ))
 _sym_db.RegisterMessage(PredictTripleRequest)
 
+GetEmbeddingsRequest = _reflection.GeneratedProtocolMessageType('GetEmbeddingsRequest', (_message.Message,), dict(
+  DESCRIPTOR = _GETEMBEDDINGSREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.GetEmbeddingsRequest)
+  ))
+_sym_db.RegisterMessage(GetEmbeddingsRequest)
+
+GetEmbeddingsResponse = _reflection.GeneratedProtocolMessageType('GetEmbeddingsResponse', (_message.Message,), dict(
+  DESCRIPTOR = _GETEMBEDDINGSRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.GetEmbeddingsResponse)
+  ))
+_sym_db.RegisterMessage(GetEmbeddingsResponse)
+
+ExportEmbeddingsRequest = _reflection.GeneratedProtocolMessageType('ExportEmbeddingsRequest', (_message.Message,), dict(
+  DESCRIPTOR = _EXPORTEMBEDDINGSREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.ExportEmbeddingsRequest)
+  ))
+_sym_db.RegisterMessage(ExportEmbeddingsRequest)
+
+ExportEmbeddingsResponse = _reflection.GeneratedProtocolMessageType('ExportEmbeddingsResponse', (_message.Message,), dict(
+  DESCRIPTOR = _EXPORTEMBEDDINGSRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.ExportEmbeddingsResponse)
+  ))
+_sym_db.RegisterMessage(ExportEmbeddingsResponse)
+
+PredictHeadBatchRequest = _reflection.GeneratedProtocolMessageType('PredictHeadBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _PREDICTHEADBATCHREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.PredictHeadBatchRequest)
+  ))
+_sym_db.RegisterMessage(PredictHeadBatchRequest)
+
+PredictTailBatchRequest = _reflection.GeneratedProtocolMessageType('PredictTailBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _PREDICTTAILBATCHREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.PredictTailBatchRequest)
+  ))
+_sym_db.RegisterMessage(PredictTailBatchRequest)
+
+PredictPartBatchResponse = _reflection.GeneratedProtocolMessageType('PredictPartBatchResponse', (_message.Message,), dict(
+  DESCRIPTOR = _PREDICTPARTBATCHRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.PredictPartBatchResponse)
+  ))
+_sym_db.RegisterMessage(PredictPartBatchResponse)
+
+PredictTripleBatchRequest = _reflection.GeneratedProtocolMessageType('PredictTripleBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _PREDICTTRIPLEBATCHREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.PredictTripleBatchRequest)
+  ))
+_sym_db.RegisterMessage(PredictTripleBatchRequest)
+
+PredictTripleBatchResponse = _reflection.GeneratedProtocolMessageType('PredictTripleBatchResponse', (_message.Message,), dict(
+  DESCRIPTOR = _PREDICTTRIPLEBATCHRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.PredictTripleBatchResponse)
+  ))
+_sym_db.RegisterMessage(PredictTripleBatchResponse)
+
+ClassifyTripleBatchRequest = _reflection.GeneratedProtocolMessageType('ClassifyTripleBatchRequest', (_message.Message,), dict(
+  DESCRIPTOR = _CLASSIFYTRIPLEBATCHREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.ClassifyTripleBatchRequest)
+  ))
+_sym_db.RegisterMessage(ClassifyTripleBatchRequest)
+
+ClassifyTripleBatchResponse = _reflection.GeneratedProtocolMessageType('ClassifyTripleBatchResponse', (_message.Message,), dict(
+  DESCRIPTOR = _CLASSIFYTRIPLEBATCHRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.ClassifyTripleBatchResponse)
+  ))
+_sym_db.RegisterMessage(ClassifyTripleBatchResponse)
+
+DumpSlowRequestsRequest = _reflection.GeneratedProtocolMessageType('DumpSlowRequestsRequest', (_message.Message,), dict(
+  DESCRIPTOR = _DUMPSLOWREQUESTSREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.DumpSlowRequestsRequest)
+  ))
+_sym_db.RegisterMessage(DumpSlowRequestsRequest)
+
+StageTiming = _reflection.GeneratedProtocolMessageType('StageTiming', (_message.Message,), dict(
+  DESCRIPTOR = _STAGETIMING,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.StageTiming)
+  ))
+_sym_db.RegisterMessage(StageTiming)
+
+SlowRequest = _reflection.GeneratedProtocolMessageType('SlowRequest', (_message.Message,), dict(
+  DESCRIPTOR = _SLOWREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.SlowRequest)
+  ))
+_sym_db.RegisterMessage(SlowRequest)
+
+DumpSlowRequestsResponse = _reflection.GeneratedProtocolMessageType('DumpSlowRequestsResponse', (_message.Message,), dict(
+  DESCRIPTOR = _DUMPSLOWREQUESTSRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.DumpSlowRequestsResponse)
+  ))
+_sym_db.RegisterMessage(DumpSlowRequestsResponse)
+
+SimilarEntitiesRequest = _reflection.GeneratedProtocolMessageType('SimilarEntitiesRequest', (_message.Message,), dict(
+  DESCRIPTOR = _SIMILARENTITIESREQUEST,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.SimilarEntitiesRequest)
+  ))
+_sym_db.RegisterMessage(SimilarEntitiesRequest)
+
+SimilarEntitiesPart = _reflection.GeneratedProtocolMessageType('SimilarEntitiesPart', (_message.Message,), dict(
+  DESCRIPTOR = _SIMILARENTITIESPART,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.SimilarEntitiesPart)
+  ))
+_sym_db.RegisterMessage(SimilarEntitiesPart)
+
+SimilarEntitiesResponse = _reflection.GeneratedProtocolMessageType('SimilarEntitiesResponse', (_message.Message,), dict(
+  DESCRIPTOR = _SIMILARENTITIESRESPONSE,
+  __module__ = 'embedding_pb2'
+  # @@protoc_insertion_point(class_scope:com.ices.sh.embedding.rpc.SimilarEntitiesResponse)
+  ))
+_sym_db.RegisterMessage(SimilarEntitiesResponse)
+
 
 DESCRIPTOR._options = None
 
@@ -444,8 +1558,8 @@ _GRAPHEMBEDDINGSERVICE = _descriptor.ServiceDescriptor(
   file=DESCRIPTOR,
   index=0,
   serialized_options=None,
-  serialized_start=629,
-  serialized_end=1324,
+  serialized_start=2574,
+  serialized_end=4522,
   methods=[
   _descriptor.MethodDescriptor(
     name='predictHead',
@@ -501,6 +1615,96 @@ _GRAPHEMBEDDINGSERVICE = _descriptor.ServiceDescriptor(
     output_type=_GETEMBEDDINGRESPONSE,
     serialized_options=None,
   ),
+  _descriptor.MethodDescriptor(
+    name='predictHeadBatch',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.predictHeadBatch',
+    index=6,
+    containing_service=None,
+    input_type=_PREDICTHEADBATCHREQUEST,
+    output_type=_PREDICTPARTBATCHRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='predictTailBatch',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.predictTailBatch',
+    index=7,
+    containing_service=None,
+    input_type=_PREDICTTAILBATCHREQUEST,
+    output_type=_PREDICTPARTBATCHRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='predictTripleBatch',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.predictTripleBatch',
+    index=8,
+    containing_service=None,
+    input_type=_PREDICTTRIPLEBATCHREQUEST,
+    output_type=_PREDICTTRIPLEBATCHRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='getEntityEmbeddings',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.getEntityEmbeddings',
+    index=9,
+    containing_service=None,
+    input_type=_GETEMBEDDINGSREQUEST,
+    output_type=_GETEMBEDDINGSRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='predictHeadStream',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.predictHeadStream',
+    index=10,
+    containing_service=None,
+    input_type=_PREDICTHEADREQUEST,
+    output_type=_PREDICTPARTRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='predictTailStream',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.predictTailStream',
+    index=11,
+    containing_service=None,
+    input_type=_PREDICTTAILREQUEST,
+    output_type=_PREDICTPARTRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='exportEmbeddings',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.exportEmbeddings',
+    index=12,
+    containing_service=None,
+    input_type=_EXPORTEMBEDDINGSREQUEST,
+    output_type=_EXPORTEMBEDDINGSRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='dumpSlowRequests',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.dumpSlowRequests',
+    index=13,
+    containing_service=None,
+    input_type=_DUMPSLOWREQUESTSREQUEST,
+    output_type=_DUMPSLOWREQUESTSRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='similarEntities',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.similarEntities',
+    index=14,
+    containing_service=None,
+    input_type=_SIMILARENTITIESREQUEST,
+    output_type=_SIMILARENTITIESRESPONSE,
+    serialized_options=None,
+  ),
+  _descriptor.MethodDescriptor(
+    name='classifyTripleBatch',
+    full_name='com.ices.sh.embedding.rpc.GraphEmbeddingService.classifyTripleBatch',
+    index=15,
+    containing_service=None,
+    input_type=_CLASSIFYTRIPLEBATCHREQUEST,
+    output_type=_CLASSIFYTRIPLEBATCHRESPONSE,
+    serialized_options=None,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_GRAPHEMBEDDINGSERVICE)
 
@@ -45,6 +45,56 @@ class GraphEmbeddingServiceStub(object):
         request_serializer=embedding__pb2.GetEmbeddingRequest.SerializeToString,
         response_deserializer=embedding__pb2.GetEmbeddingResponse.FromString,
         )
+    self.predictHeadBatch = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/predictHeadBatch',
+        request_serializer=embedding__pb2.PredictHeadBatchRequest.SerializeToString,
+        response_deserializer=embedding__pb2.PredictPartBatchResponse.FromString,
+        )
+    self.predictTailBatch = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/predictTailBatch',
+        request_serializer=embedding__pb2.PredictTailBatchRequest.SerializeToString,
+        response_deserializer=embedding__pb2.PredictPartBatchResponse.FromString,
+        )
+    self.predictTripleBatch = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/predictTripleBatch',
+        request_serializer=embedding__pb2.PredictTripleBatchRequest.SerializeToString,
+        response_deserializer=embedding__pb2.PredictTripleBatchResponse.FromString,
+        )
+    self.getEntityEmbeddings = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/getEntityEmbeddings',
+        request_serializer=embedding__pb2.GetEmbeddingsRequest.SerializeToString,
+        response_deserializer=embedding__pb2.GetEmbeddingsResponse.FromString,
+        )
+    self.predictHeadStream = channel.stream_stream(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/predictHeadStream',
+        request_serializer=embedding__pb2.PredictHeadRequest.SerializeToString,
+        response_deserializer=embedding__pb2.PredictPartResponse.FromString,
+        )
+    self.predictTailStream = channel.stream_stream(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/predictTailStream',
+        request_serializer=embedding__pb2.PredictTailRequest.SerializeToString,
+        response_deserializer=embedding__pb2.PredictPartResponse.FromString,
+        )
+    self.exportEmbeddings = channel.unary_stream(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/exportEmbeddings',
+        request_serializer=embedding__pb2.ExportEmbeddingsRequest.SerializeToString,
+        response_deserializer=embedding__pb2.ExportEmbeddingsResponse.FromString,
+        )
+    self.dumpSlowRequests = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/dumpSlowRequests',
+        request_serializer=embedding__pb2.DumpSlowRequestsRequest.SerializeToString,
+        response_deserializer=embedding__pb2.DumpSlowRequestsResponse.FromString,
+        )
+    self.similarEntities = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/similarEntities',
+        request_serializer=embedding__pb2.SimilarEntitiesRequest.SerializeToString,
+        response_deserializer=embedding__pb2.SimilarEntitiesResponse.FromString,
+        )
+    self.classifyTripleBatch = channel.unary_unary(
+        '/com.ices.sh.embedding.rpc.GraphEmbeddingService/classifyTripleBatch',
+        request_serializer=embedding__pb2.ClassifyTripleBatchRequest.SerializeToString,
+        response_deserializer=embedding__pb2.ClassifyTripleBatchResponse.FromString,
+        )
 
 
 class GraphEmbeddingServiceServicer(object):
@@ -93,6 +143,76 @@ class GraphEmbeddingServiceServicer(object):
     context.set_details('Method not implemented!')
     raise NotImplementedError('Method not implemented!')
 
+  def predictHeadBatch(self, request, context):
+    """批量预测头实体
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def predictTailBatch(self, request, context):
+    """批量预测尾实体
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def predictTripleBatch(self, request, context):
+    """批量预测三元组是否正确
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def getEntityEmbeddings(self, request, context):
+    """批量获取实体embedding
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def predictHeadStream(self, request_iterator, context):
+    """流式预测头实体，按请求顺序返回结果
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def predictTailStream(self, request_iterator, context):
+    """流式预测尾实体，按请求顺序返回结果
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def exportEmbeddings(self, request, context):
+    """按 id 顺序分页导出模型全部实体或关系的 embedding
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def dumpSlowRequests(self, request, context):
+    """导出最近的慢请求及其各阶段耗时（管理接口）
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def similarEntities(self, request, context):
+    """批量查询 embedding 空间中与给定实体最相似的实体
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
+  def classifyTripleBatch(self, request, context):
+    """批量判断三元组是否正确，默认使用训练时在验证集上得到的每个关系的阈值
+    """
+    context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+    context.set_details('Method not implemented!')
+    raise NotImplementedError('Method not implemented!')
+
 
 def add_GraphEmbeddingServiceServicer_to_server(servicer, server):
   rpc_method_handlers = {
@@ -126,6 +246,56 @@ def add_GraphEmbeddingServiceServicer_to_server(servicer, server):
           request_deserializer=embedding__pb2.GetEmbeddingRequest.FromString,
           response_serializer=embedding__pb2.GetEmbeddingResponse.SerializeToString,
       ),
+      'predictHeadBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.predictHeadBatch,
+          request_deserializer=embedding__pb2.PredictHeadBatchRequest.FromString,
+          response_serializer=embedding__pb2.PredictPartBatchResponse.SerializeToString,
+      ),
+      'predictTailBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.predictTailBatch,
+          request_deserializer=embedding__pb2.PredictTailBatchRequest.FromString,
+          response_serializer=embedding__pb2.PredictPartBatchResponse.SerializeToString,
+      ),
+      'predictTripleBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.predictTripleBatch,
+          request_deserializer=embedding__pb2.PredictTripleBatchRequest.FromString,
+          response_serializer=embedding__pb2.PredictTripleBatchResponse.SerializeToString,
+      ),
+      'getEntityEmbeddings': grpc.unary_unary_rpc_method_handler(
+          servicer.getEntityEmbeddings,
+          request_deserializer=embedding__pb2.GetEmbeddingsRequest.FromString,
+          response_serializer=embedding__pb2.GetEmbeddingsResponse.SerializeToString,
+      ),
+      'predictHeadStream': grpc.stream_stream_rpc_method_handler(
+          servicer.predictHeadStream,
+          request_deserializer=embedding__pb2.PredictHeadRequest.FromString,
+          response_serializer=embedding__pb2.PredictPartResponse.SerializeToString,
+      ),
+      'predictTailStream': grpc.stream_stream_rpc_method_handler(
+          servicer.predictTailStream,
+          request_deserializer=embedding__pb2.PredictTailRequest.FromString,
+          response_serializer=embedding__pb2.PredictPartResponse.SerializeToString,
+      ),
+      'exportEmbeddings': grpc.unary_stream_rpc_method_handler(
+          servicer.exportEmbeddings,
+          request_deserializer=embedding__pb2.ExportEmbeddingsRequest.FromString,
+          response_serializer=embedding__pb2.ExportEmbeddingsResponse.SerializeToString,
+      ),
+      'dumpSlowRequests': grpc.unary_unary_rpc_method_handler(
+          servicer.dumpSlowRequests,
+          request_deserializer=embedding__pb2.DumpSlowRequestsRequest.FromString,
+          response_serializer=embedding__pb2.DumpSlowRequestsResponse.SerializeToString,
+      ),
+      'similarEntities': grpc.unary_unary_rpc_method_handler(
+          servicer.similarEntities,
+          request_deserializer=embedding__pb2.SimilarEntitiesRequest.FromString,
+          response_serializer=embedding__pb2.SimilarEntitiesResponse.SerializeToString,
+      ),
+      'classifyTripleBatch': grpc.unary_unary_rpc_method_handler(
+          servicer.classifyTripleBatch,
+          request_deserializer=embedding__pb2.ClassifyTripleBatchRequest.FromString,
+          response_serializer=embedding__pb2.ClassifyTripleBatchResponse.SerializeToString,
+      ),
   }
   generic_handler = grpc.method_handlers_generic_handler(
       'com.ices.sh.embedding.rpc.GraphEmbeddingService', rpc_method_handlers)
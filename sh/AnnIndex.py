@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class IvfIndex:
+    """
+    Inverted file index over entity vectors, optionally with product quantization (IVF-PQ).
+    Entities are grouped by their nearest coarse k-means centroid. A query only visits the
+    nprobe closest groups, the visited entities are optionally shortlisted by their PQ codes,
+    and the remaining candidates are re-ranked with the exact model score.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_lists: int = 0, pq_m: int = 0, n_iter: int = 10,
+                 train_size: int = 65536, seed: int = 0):
+        """
+        :param vectors: vectors to index, shape (N, d)
+        :param n_lists: number of coarse centroids, 0 means sqrt(N)
+        :param pq_m: number of product quantization sub-spaces, 0 disables PQ
+        :param n_iter: k-means iterations
+        :param train_size: max number of vectors sampled to train the centroids
+        :param seed: random seed
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rng = np.random.RandomState(seed)
+        n = vectors.shape[0]
+        if n_lists <= 0:
+            n_lists = int(np.sqrt(n))
+        n_lists = max(1, min(n_lists, n))
+        train = vectors[rng.choice(n, min(n, max(train_size, n_lists)), replace=False)]
+
+        self.centroids = _kmeans(train, n_lists, n_iter, rng)
+        assign = _nearest(vectors, self.centroids)
+        # inverted lists in CSR layout: ids of list c are ids[offsets[c]:offsets[c + 1]]
+        self.ids = np.argsort(assign, kind='stable')
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=n_lists))])
+
+        self.pq_m = pq_m
+        if pq_m > 0:
+            residuals = vectors - self.centroids[assign]
+            self.sub_dims = np.array_split(np.arange(vectors.shape[1]), pq_m)
+            train_residuals = residuals[rng.choice(n, min(n, train_size), replace=False)]
+            self.codebooks = [_kmeans(train_residuals[:, dims], min(256, len(train_residuals)), n_iter, rng)
+                              for dims in self.sub_dims]
+            # codes are stored in inverted list order
+            codes = np.empty((n, pq_m), dtype=np.uint8)
+            for j, dims in enumerate(self.sub_dims):
+                codes[:, j] = _nearest(residuals[:, dims], self.codebooks[j])
+            self.codes = codes[self.ids]
+
+    def search(self, queries: np.ndarray, k: int, exact, nprobe: int = 8, rerank_size: int = 0) -> list:
+        """
+        :param queries: query vectors, shape (B, d)
+        :param k: top k ids to return for every query
+        :param exact: exact(i, ids) returns the exact model scores of ids for the i-th query
+        :param nprobe: number of inverted lists visited per query, higher means better recall and more latency
+        :param rerank_size: with PQ, number of candidates re-ranked exactly, 0 means 10 * k
+        :return: for every query, at most k ids ordered by ascending exact score
+        """
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        res = []
+        probes = _nearest(queries, self.centroids, nprobe).reshape(len(queries), -1)
+        for i, lists in enumerate(probes):
+            cands = np.concatenate([self.ids[self.offsets[c]:self.offsets[c + 1]] for c in lists])
+            if self.pq_m > 0:
+                cands = self._shortlist(queries[i], lists, cands, rerank_size or 10 * k)
+            if len(cands) == 0:
+                res.append(cands)
+                continue
+            scores = exact(i, cands)
+            top = np.argpartition(scores, k - 1)[:k] if k < len(cands) else np.arange(len(cands))
+            top = top[np.lexsort((cands[top], scores[top]))]
+            res.append(cands[top])
+        return res
+
+    def nbytes(self) -> int:
+        size = self.centroids.nbytes + self.ids.nbytes + self.offsets.nbytes
+        if self.pq_m > 0:
+            size += self.codes.nbytes + sum(codebook.nbytes for codebook in self.codebooks)
+        return size
+
+    def _shortlist(self, q: np.ndarray, lists: np.ndarray, cands: np.ndarray, size: int) -> np.ndarray:
+        """
+        Keeps the candidates closest to the query by asymmetric PQ distance.
+        """
+        if len(cands) <= size:
+            return cands
+        dists = []
+        for c in lists:
+            codes = self.codes[self.offsets[c]:self.offsets[c + 1]]
+            residual = q - self.centroids[c]
+            dist = np.zeros(len(codes), dtype=np.float32)
+            for j, dims in enumerate(self.sub_dims):
+                table = np.sum((self.codebooks[j] - residual[dims]) ** 2, -1)
+                dist += table[codes[:, j]]
+            dists.append(dist)
+        dists = np.concatenate(dists)
+        return cands[np.argpartition(dists, size - 1)[:size]]
+
+
+def _nearest(x: np.ndarray, centroids: np.ndarray, n: int = 1, block: int = 65536) -> np.ndarray:
+    """
+    :return: index of the n nearest centroids (L2) of every row of x, shape (len(x),) if n == 1 else (len(x), n)
+    """
+    c_norm = np.sum(centroids ** 2, -1)
+    res = []
+    for i in range(0, len(x), block):
+        dist = c_norm - 2 * x[i:i + block] @ centroids.T
+        if n == 1:
+            res.append(np.argmin(dist, -1))
+        elif n >= len(centroids):
+            res.append(np.argsort(dist, -1))
+        else:
+            top = np.argpartition(dist, n - 1, -1)[:, :n]
+            order = np.argsort(np.take_along_axis(dist, top, -1), -1)
+            res.append(np.take_along_axis(top, order, -1))
+    if len(res) == 0:
+        return np.empty((0,) if n == 1 else (0, min(n, len(centroids))), dtype=np.int64)
+    return np.concatenate(res)
+
+
+def _kmeans(x: np.ndarray, k: int, n_iter: int, rng: np.random.RandomState) -> np.ndarray:
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = _nearest(x, centroids)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, x)
+        # empty clusters keep their previous centroid
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
@@ -0,0 +1,253 @@
+from concurrent import futures
+import asyncio
+import contextvars
+import grpc
+import logging
+import threading
+import time
+
+from protos import embedding_pb2_grpc as embedding_pb2_grpc, embedding_pb2 as embedding_pb2
+from config.config_loader import config_loader
+from sh.EmbeddingServer import EmbeddingServicer, MetricsInterceptor, make_cache, make_servicer, make_slow_log, \
+    observe_rpc, stream_chunk_key, update_model
+from sh.Metrics import start_metrics
+from sh.ModelLoader import ModelLoader
+from sh.ResultCache import ResultCache
+
+
+class _Abort(Exception):
+
+    def __init__(self, code: grpc.StatusCode, details: str):
+        super(_Abort, self).__init__(details)
+        self.code = code
+        self.details = details
+
+
+class _ExecutorContext:
+    """
+    Context handed to EmbeddingServicer methods running on the executor, aborts are re-raised on the event loop.
+    """
+
+    def abort(self, code: grpc.StatusCode, details: str):
+        raise _Abort(code, details)
+
+
+class AsyncEmbeddingServicer(embedding_pb2_grpc.GraphEmbeddingServiceServicer):
+    """
+    grpc.aio front of EmbeddingServicer: connections and request streams are handled on the event loop,
+    model loading and scoring run on a bounded executor, so idle or slow clients do not hold a thread.
+    """
+
+    def __init__(self, servicer: EmbeddingServicer, executor: futures.ThreadPoolExecutor):
+        self.servicer = servicer
+        self.executor = executor
+
+    async def predictHead(self, request, context):
+        return await self._run(self.servicer.predictHead, request, context)
+
+    async def predictTail(self, request, context):
+        return await self._run(self.servicer.predictTail, request, context)
+
+    async def predictRelation(self, request, context):
+        return await self._run(self.servicer.predictRelation, request, context)
+
+    async def predictTriple(self, request, context):
+        return await self._run(self.servicer.predictTriple, request, context)
+
+    async def getEntityEmbedding(self, request, context):
+        return await self._run(self.servicer.getEntityEmbedding, request, context)
+
+    async def getRelationEmbedding(self, request, context):
+        return await self._run(self.servicer.getRelationEmbedding, request, context)
+
+    async def predictHeadBatch(self, request, context):
+        return await self._run(self.servicer.predictHeadBatch, request, context)
+
+    async def predictTailBatch(self, request, context):
+        return await self._run(self.servicer.predictTailBatch, request, context)
+
+    async def predictTripleBatch(self, request, context):
+        return await self._run(self.servicer.predictTripleBatch, request, context)
+
+    async def classifyTripleBatch(self, request, context):
+        return await self._run(self.servicer.classifyTripleBatch, request, context)
+
+    async def getEntityEmbeddings(self, request, context):
+        return await self._run(self.servicer.getEntityEmbeddings, request, context)
+
+    async def exportEmbeddings(self, request, context):
+        self.servicer.request_logger.log('exportEmbeddings', request)
+        loop = asyncio.get_running_loop()
+        pages = self.servicer.export_pages(request, _ExecutorContext())
+        end = object()
+        while True:
+            try:
+                page = await loop.run_in_executor(self.executor, next, pages, end)
+            except _Abort as e:
+                await context.abort(e.code, e.details)
+            if page is end:
+                return
+            yield page
+
+    async def similarEntities(self, request, context):
+        return await self._run(self.servicer.similarEntities, request, context)
+
+    async def dumpSlowRequests(self, request, context):
+        return self.servicer.dumpSlowRequests(request, context)
+
+    async def predictHeadStream(self, request_iterator, context):
+        self.servicer.request_logger.log('predictHeadStream')
+        async for chunk in self._stream_chunks(request_iterator):
+            res = await self._run(self.servicer.predict_head_chunk, chunk, context)
+            for val in res:
+                yield embedding_pb2.PredictPartResponse(val=val)
+
+    async def predictTailStream(self, request_iterator, context):
+        self.servicer.request_logger.log('predictTailStream')
+        async for chunk in self._stream_chunks(request_iterator):
+            res = await self._run(self.servicer.predict_tail_chunk, chunk, context)
+            for val in res:
+                yield embedding_pb2.PredictPartResponse(val=val)
+
+    async def _run(self, method, request, context):
+        try:
+            # the copied context carries the request trace, if any, to the executor thread
+            return await asyncio.get_running_loop().run_in_executor(self.executor, contextvars.copy_context().run,
+                                                                    method, request, _ExecutorContext())
+        except _Abort as e:
+            await context.abort(e.code, e.details)
+
+    async def _stream_chunks(self, request_iterator):
+        """
+        Same chunking as EmbeddingServicer._stream_chunks, with a reader task instead of a thread.
+        """
+        chunk_size = self.servicer.stream_chunk_size
+        requests = asyncio.Queue(maxsize=2 * chunk_size)
+        end = object()
+
+        async def read() -> None:
+            try:
+                async for request in request_iterator:
+                    await requests.put(request)
+            except Exception as e:
+                await requests.put(e)
+            await requests.put(end)
+
+        reader = asyncio.ensure_future(read())
+        try:
+            pending = await requests.get()
+            while pending is not end:
+                if isinstance(pending, Exception):
+                    raise pending
+                chunk = [pending]
+                pending = None
+                while len(chunk) < chunk_size:
+                    try:
+                        request = requests.get_nowait()
+                    except asyncio.QueueEmpty:
+                        break
+                    if request is end or isinstance(request, Exception) or stream_chunk_key(request) != stream_chunk_key(chunk[0]):
+                        pending = request
+                        break
+                    chunk.append(request)
+                yield chunk
+                if pending is None:
+                    pending = await requests.get()
+        finally:
+            reader.cancel()
+
+
+class AsyncMetricsInterceptor(MetricsInterceptor, grpc.aio.ServerInterceptor):
+    """
+    MetricsInterceptor of the asyncio server.
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        rpc = handler_call_details.method.rsplit('/', 1)[-1]
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(_timed_unary(handler.unary_unary, rpc, self),
+                                                       handler.request_deserializer, handler.response_serializer)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(_timed_stream(handler.unary_stream, rpc),
+                                                        handler.request_deserializer, handler.response_serializer)
+        if handler.stream_stream is not None:
+            return grpc.stream_stream_rpc_method_handler(_timed_stream(handler.stream_stream, rpc),
+                                                         handler.request_deserializer, handler.response_serializer)
+        return handler
+
+
+def _timed_unary(behavior, rpc: str, interceptor: AsyncMetricsInterceptor):
+    async def timed(request, context):
+        trace, debug = interceptor.trace(rpc, context)
+        start_time = time.perf_counter()
+        status = 'ok'
+        try:
+            if trace is None:
+                return await behavior(request, context)
+            with trace.activate():
+                return await behavior(request, context)
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            observe_rpc(rpc, status, time.perf_counter() - start_time)
+            if trace is not None:
+                interceptor.finish(trace, debug, request, context)
+    return timed
+
+
+def _timed_stream(behavior, rpc: str):
+    async def timed(request_or_iterator, context):
+        start_time = time.perf_counter()
+        status = 'ok'
+        try:
+            async for response in behavior(request_or_iterator, context):
+                yield response
+        except (asyncio.CancelledError, GeneratorExit):
+            status = 'cancelled'
+            raise
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            observe_rpc(rpc, status, time.perf_counter() - start_time)
+    return timed
+
+
+async def serve(model_loader: ModelLoader, cache: ResultCache = None):
+    grpc_config = config_loader.get_config()['grpc']
+    executor = futures.ThreadPoolExecutor(max_workers=grpc_config.get('executor_workers', 4))
+    slow_log = make_slow_log()
+    interceptor = AsyncMetricsInterceptor(slow_log, config_loader.get_config().get('debug', {}).get('trace_all', False))
+    server = grpc.aio.server(interceptors=[interceptor],
+                             maximum_concurrent_rpcs=grpc_config.get('max_concurrent_rpcs') or None)
+    servicer = make_servicer(model_loader, cache, slow_log)
+    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(AsyncEmbeddingServicer(servicer, executor), server)
+    port = grpc_config['port']
+    server.add_insecure_port('[::]:%d' % port)
+    await server.start()
+    print('start serve on [::]:%d (asyncio)' % port)
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+        servicer.shutdown()
+        executor.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    model_loader = ModelLoader(config_loader.get_config()['gpu'])
+    cache = make_cache()
+    start_metrics()
+    threading.Thread(target=update_model, args=(model_loader, cache), daemon=True).start()
+    try:
+        asyncio.run(serve(model_loader, cache))
+    except KeyboardInterrupt:
+        print('stop serve...')
@@ -0,0 +1,456 @@
+"""
+Scoring shared by the torch (sh.ModelScorers) and numpy (sh.NumpyScorers) backends.
+The scorers here only index, add and subtract arrays, everything specific to an array library
+(norms, normalization, allocation, ...) is an operation the backend implements, see BaseScorer.
+"""
+
+
+class QuantizedMatrix:
+    """
+    Entity matrix stored as float16 or as int8 with one float32 scale per row.
+    Rows are dequantized to float32 only when they are read, a block at a time for full scans.
+    """
+
+    def __init__(self, shape: tuple, data, scale):
+        """
+        :param data: float16 or int8 matrix, shape (N, d)
+        :param scale: float32 scale of every row of an int8 matrix, shape (N, 1), None for float16
+        """
+        self.shape = shape
+        self.data = data
+        self.scale = scale
+
+    def __getitem__(self, ids):
+        if self.scale is None:
+            return self._to_float(self.data[ids])
+        return self._to_float(self.data[ids]) * self.scale[ids]
+
+    def rows(self, start: int, end: int):
+        return self[start:end]
+
+    def dequantize(self):
+        return self.rows(0, self.shape[0])
+
+    def arrays(self) -> list:
+        return [a for a in [self.data, self.scale] if a is not None]
+
+    def _to_float(self, a):
+        """
+        :return: a as float32
+        """
+        raise NotImplementedError
+
+
+class BaseScorer:
+    """
+    Scores queries directly against the entity / relation matrices of a trained model.
+    The matrices are prepared once per loaded model, so a query against all entities is
+    a single broadcast instead of a gather over ent_tot index tensors.
+    """
+
+    # max number of elements of the temporary (queries, candidates) blocks of _dist
+    block_size = 1 << 21
+    # number of rows of a quantized matrix dequantized at once
+    dequantize_rows = 65536
+    # arrays of the backend, counted by arrays() and buffers()
+    array_type = None
+    # QuantizedMatrix of the backend, built from a float32 array and float16 or int8
+    quantized_type = None
+
+    def __init__(self, params: dict, p_norm: int = 1, norm_flag: bool = True, quantization: str = 'float32'):
+        """
+        :param quantization: storage of the entity matrix scanned by head / tail predictions,
+                             float32, float16 or int8 (one scale per row)
+        """
+        self.p_norm = p_norm
+        self.norm_flag = norm_flag
+        self.quantization = quantization
+        # optional cache of the entity matrices projected per relation, see projected_matrix
+        self.projections = None
+        self.ent_tot = params['ent_embeddings.weight'].shape[0]
+        self.rel_tot = params['rel_embeddings.weight'].shape[0]
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, use_gpu: bool = False, **kwargs) -> 'BaseScorer':
+        """
+        :param arrays: {name: float32 numpy array} model weights
+        :param kwargs: p_norm, norm_flag, quantization
+        """
+        raise NotImplementedError
+
+    def as_ids(self, ids):
+        """
+        :return: ids as an index array of the backend
+        """
+        raise NotImplementedError
+
+    def as_numpy(self, a):
+        raise NotImplementedError
+
+    def mask(self, scores, rows, cols) -> None:
+        """
+        Sets scores[rows, cols] to +inf, in place.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def array_nbytes(a) -> int:
+        raise NotImplementedError
+
+    @staticmethod
+    def array_address(a) -> int:
+        raise NotImplementedError
+
+    def buffers(self) -> dict:
+        """
+        :return: {buffer address: bytes} of every array held by the scorer
+        """
+        return dict((self.array_address(a), self.array_nbytes(a)) for a in self.arrays())
+
+    def arrays(self) -> list:
+        """
+        :return: every array held by the scorer
+        """
+        res = []
+        for value in vars(self).values():
+            if isinstance(value, self.array_type):
+                res.append(value)
+            elif isinstance(value, QuantizedMatrix):
+                res.extend(value.arrays())
+        return res
+
+    def score_head(self, t, r):
+        """
+        :param t: tail entity ids, shape (B,)
+        :param r: relation ids, shape (B,)
+        :return: scores of every entity as head, shape (B, ent_tot)
+        """
+        raise NotImplementedError
+
+    def score_tail(self, h, r):
+        """
+        :param h: head entity ids, shape (B,)
+        :param r: relation ids, shape (B,)
+        :return: scores of every entity as tail, shape (B, ent_tot)
+        """
+        raise NotImplementedError
+
+    def score_relation(self, h, t):
+        """
+        :param h: head entity ids, shape (B,)
+        :param t: tail entity ids, shape (B,)
+        :return: scores of every relation, shape (B, rel_tot)
+        """
+        raise NotImplementedError
+
+    def score_triple(self, h, t, r):
+        """
+        :param h: head entity ids, shape (B,)
+        :param t: tail entity ids, shape (B,)
+        :param r: relation ids, shape (B,)
+        :return: scores of the triples, shape (B,)
+        """
+        raise NotImplementedError
+
+    def ann_vectors(self):
+        """
+        :return: entity vectors for a nearest-neighbour index, None if head / tail scores are not
+                 a distance between a query vector and a fixed entity vector
+        """
+        return None
+
+    def head_query(self, t, r):
+        """
+        :return: query vectors of head predictions, compared with the rows of candidate_matrix
+                 (and in the space of ann_vectors if there is one), shape (B, d)
+        """
+        raise NotImplementedError
+
+    def tail_query(self, h, r):
+        """
+        :return: query vectors of tail predictions, compared with the rows of candidate_matrix
+                 (and in the space of ann_vectors if there is one), shape (B, d)
+        """
+        raise NotImplementedError
+
+    def candidate_matrix(self, r: int, ids):
+        """
+        :param r: relation id
+        :param ids: candidate entity ids, shape (N,)
+        :return: candidates as scored against the queries of relation r, shape (N, d)
+        """
+        raise NotImplementedError
+
+    def projected_matrix(self, r: int):
+        """
+        :param r: relation id
+        :return: all entities as scored against the queries of relation r, shape (ent_tot, d),
+                 None if the entities do not depend on the relation
+        """
+        return None
+
+    def score_matrix(self, q, m):
+        """
+        :param q: queries returned by head_query / tail_query, shape (B, d)
+        :param m: a matrix returned by candidate_matrix, shape (N, d)
+        :return: scores, shape (B, N)
+        """
+        return self._dist(q, m)
+
+    def score_candidates(self, q, ids):
+        """
+        :param q: a query vector returned by head_query / tail_query, shape (d,)
+        :param ids: candidate entity ids, shape (N,)
+        :return: exact scores of the candidates, shape (N,)
+        """
+        raise NotImplementedError
+
+    def _quantize(self, e):
+        """
+        :return: e unchanged for float32, otherwise a QuantizedMatrix
+        """
+        if self.quantization == 'float32':
+            return e
+        return self.quantized_type(e, self.quantization)
+
+    def _rows(self, m, start: int, end: int):
+        if isinstance(m, QuantizedMatrix):
+            return m.rows(start, end)
+        return m[start:end]
+
+    def _normalize(self, e):
+        if self.norm_flag:
+            e = self._l2_normalize(e)
+        return self._contiguous(e)
+
+    def _dist(self, q, m, m_sq_norms=None):
+        """
+        :param q: queries, shape (B, d)
+        :param m: candidates, shape (N, d), an array or a QuantizedMatrix
+        :param m_sq_norms: optional squared l2 norms of the rows of m, used when p_norm is 2
+        :return: p-norm distance of every (query, candidate) pair, shape (B, N)
+        """
+        if isinstance(m, QuantizedMatrix):
+            scores = self._empty(q, m.shape[0])
+            for j in range(0, m.shape[0], self.dequantize_rows):
+                sq_norms = m_sq_norms[j:j + self.dequantize_rows] if m_sq_norms is not None else None
+                scores[:, j:j + self.dequantize_rows] = self._dist(q, m.rows(j, j + self.dequantize_rows), sq_norms)
+            return scores
+        return self._pairwise_distance(q, m, m_sq_norms)
+
+    def _sq_norms(self, m):
+        """
+        :return: squared l2 norms of the rows of a matrix scanned by every head / tail prediction,
+                 None unless p_norm is 2
+        """
+        if self.p_norm != 2:
+            return None
+        if isinstance(m, QuantizedMatrix):
+            return self._concat([self._squared_norms(m.rows(j, j + self.dequantize_rows))
+                                 for j in range(0, m.shape[0], self.dequantize_rows)])
+        return self._squared_norms(m)
+
+    # array operations implemented by the backends
+
+    def _contiguous(self, a):
+        """
+        :return: a as a contiguous float32 array
+        """
+        raise NotImplementedError
+
+    def _l2_normalize(self, e):
+        """
+        :return: e divided by its l2 norm over the last axis
+        """
+        raise NotImplementedError
+
+    def _norm(self, x):
+        """
+        :return: p-norm over the last axis
+        """
+        raise NotImplementedError
+
+    def _row_sums(self, x):
+        """
+        :return: sums over the last axis, which is kept, shape (..., 1)
+        """
+        raise NotImplementedError
+
+    def _empty(self, q, cols: int):
+        """
+        :return: uninitialized float32 scores of the queries, shape (B, cols)
+        """
+        raise NotImplementedError
+
+    def _unique(self, ids) -> list:
+        """
+        :return: sorted distinct values of ids
+        """
+        raise NotImplementedError
+
+    def _nonzero(self, mask):
+        """
+        :return: positions of the true values of a 1-d mask
+        """
+        raise NotImplementedError
+
+    def _resize(self, e, size: int):
+        """
+        :return: e truncated or zero-padded to size columns
+        """
+        raise NotImplementedError
+
+    def _concat(self, arrays: list):
+        raise NotImplementedError
+
+    def _squared_norms(self, m):
+        raise NotImplementedError
+
+    def _pairwise_distance(self, q, m, m_sq_norms=None):
+        raise NotImplementedError
+
+
+class BaseTranseScorer(BaseScorer):
+
+    def __init__(self, params: dict, p_norm: int = 1, norm_flag: bool = True, quantization: str = 'float32'):
+        super(BaseTranseScorer, self).__init__(params, p_norm, norm_flag, quantization)
+        self.ent = self._quantize(self._normalize(params['ent_embeddings.weight']))
+        self.rel = self._normalize(params['rel_embeddings.weight'])
+        # squared norms of the scanned entities, reused by every head / tail prediction when p_norm is 2
+        self.ent_sq_norms = self._sq_norms(self.ent)
+
+    def score_head(self, t, r):
+        return self._dist(self.head_query(t, r), self.ent, self.ent_sq_norms)
+
+    def score_tail(self, h, r):
+        return self._dist(self.tail_query(h, r), self.ent, self.ent_sq_norms)
+
+    def score_relation(self, h, t):
+        return self._dist(self.ent[t] - self.ent[h], self.rel)
+
+    def score_triple(self, h, t, r):
+        return self._norm(self.ent[h] + self.rel[r] - self.ent[t])
+
+    def ann_vectors(self):
+        if isinstance(self.ent, QuantizedMatrix):
+            return self.ent.dequantize()
+        return self.ent
+
+    def head_query(self, t, r):
+        return self.ent[t] - self.rel[r]
+
+    def tail_query(self, h, r):
+        return self.ent[h] + self.rel[r]
+
+    def candidate_matrix(self, r, ids):
+        return self.ent[ids]
+
+    def score_candidates(self, q, ids):
+        return self._dist(q[None], self.ent[ids])[0]
+
+
+class BaseTranshScorer(BaseScorer):
+
+    def __init__(self, params: dict, p_norm: int = 1, norm_flag: bool = True, quantization: str = 'float32'):
+        super(BaseTranshScorer, self).__init__(params, p_norm, norm_flag, quantization)
+        # entities are projected onto the relation hyperplane before normalization
+        self.ent = self._quantize(self._contiguous(params['ent_embeddings.weight']))
+        self.rel = self._normalize(params['rel_embeddings.weight'])
+        self.norm_vector = self._contiguous(self._l2_normalize(params['norm_vector.weight']))
+
+    def score_head(self, t, r):
+        return self._score_all(self.head_query(t, r), r)
+
+    def score_tail(self, h, r):
+        return self._score_all(self.tail_query(h, r), r)
+
+    def score_relation(self, h, t):
+        w = self.norm_vector[None]
+        h = self._normalize(self._transfer(self.ent[h][:, None], w))
+        t = self._normalize(self._transfer(self.ent[t][:, None], w))
+        return self._norm(h + self.rel[None] - t)
+
+    def score_triple(self, h, t, r):
+        w = self.norm_vector[r]
+        h = self._normalize(self._transfer(self.ent[h], w))
+        t = self._normalize(self._transfer(self.ent[t], w))
+        return self._norm(h + self.rel[r] - t)
+
+    def head_query(self, t, r):
+        return self._normalize(self._transfer(self.ent[t], self.norm_vector[r])) - self.rel[r]
+
+    def tail_query(self, h, r):
+        return self._normalize(self._transfer(self.ent[h], self.norm_vector[r])) + self.rel[r]
+
+    def candidate_matrix(self, r, ids):
+        return self._normalize(self._transfer(self.ent[ids], self.norm_vector[r]))
+
+    def projected_matrix(self, r):
+        return self._project_rows(r, 0, self.ent_tot)
+
+    def _transfer(self, e, w):
+        return e - self._row_sums(e * w) * w
+
+    def _project_rows(self, r: int, start: int, end: int):
+        return self._normalize(self._transfer(self._rows(self.ent, start, end), self.norm_vector[r]))
+
+    def _score_all(self, q, r):
+        """
+        Entities are projected once per distinct relation of the batch, or taken from self.projections
+        (keyed by ('projection', relation id)) when there is a cache, so hot relations skip the projection.
+        Otherwise a quantized entity matrix is dequantized and projected a block at a time.
+        """
+        step = self.dequantize_rows if isinstance(self.ent, QuantizedMatrix) else max(1, self.ent_tot)
+        # a projected matrix larger than the cache would be computed in full on every request
+        cached = self.projections is not None and self.ent_tot * self.rel.shape[-1] * 4 <= self.projections.max_bytes
+        scores = self._empty(q, self.ent_tot)
+        for rel in self._unique(r):
+            rows = self._nonzero(r == rel)
+            if cached:
+                m = self.projections.get_or_compute(('projection', rel), lambda: self.projected_matrix(rel))
+                scores[rows] = self._dist(q[rows], m)
+                continue
+            for j in range(0, self.ent_tot, step):
+                scores[rows, j:j + step] = self._dist(q[rows], self._project_rows(rel, j, j + step))
+        return scores
+
+
+class BaseTransdScorer(BaseTranshScorer):
+
+    def __init__(self, params: dict, p_norm: int = 1, norm_flag: bool = True, quantization: str = 'float32'):
+        # skips the TransH matrices
+        super(BaseTranshScorer, self).__init__(params, p_norm, norm_flag, quantization)
+        self.rel = self._normalize(params['rel_embeddings.weight'])
+        self.rel_transfer = self._contiguous(params['rel_transfer.weight'])
+        dim_r = self.rel.shape[-1]
+        ent = params['ent_embeddings.weight']
+        # e . e_transfer does not depend on the relation, so it is computed only once
+        self.ent_dot = self._contiguous(self._row_sums(ent * params['ent_transfer.weight']))
+        self.ent = self._quantize(self._contiguous(self._resize(ent, dim_r)))
+
+    def score_relation(self, h, t):
+        r_transfer = self.rel_transfer[None]
+        h = self._transfer_ids(h[:, None], r_transfer)
+        t = self._transfer_ids(t[:, None], r_transfer)
+        return self._norm(h + self.rel[None] - t)
+
+    def score_triple(self, h, t, r):
+        r_transfer = self.rel_transfer[r]
+        h = self._transfer_ids(h, r_transfer)
+        t = self._transfer_ids(t, r_transfer)
+        return self._norm(h + self.rel[r] - t)
+
+    def head_query(self, t, r):
+        return self._transfer_ids(t, self.rel_transfer[r]) - self.rel[r]
+
+    def tail_query(self, h, r):
+        return self._transfer_ids(h, self.rel_transfer[r]) + self.rel[r]
+
+    def candidate_matrix(self, r, ids):
+        return self._transfer_ids(ids, self.rel_transfer[r])
+
+    def _transfer_ids(self, e, r_transfer):
+        return self._l2_normalize(self.ent[e] + self.ent_dot[e] * r_transfer)
+
+    def _project_rows(self, r: int, start: int, end: int):
+        return self._l2_normalize(self._rows(self.ent, start, end) + self.ent_dot[start:end] * self.rel_transfer[r])
@@ -1,62 +1,503 @@
 from concurrent import futures
 from google.protobuf import wrappers_pb2 as wrappers
 import grpc
+import logging
+import numpy as np
+import queue
+import threading
 import time
 
 from protos import embedding_pb2_grpc as embedding_pb2_grpc, embedding_pb2 as embedding_pb2
 from config.config_loader import config_loader
+from sh.Metrics import registry, start_metrics
+from sh.MicroBatcher import MicroBatcher
 from sh.ModelLoader import ModelLoader
+from sh.ModelPredictors import ModelPredictor
+from sh.RequestLogger import RequestLogger
+from sh.RequestTrace import RequestTrace, SlowRequestLog, stage
+from sh.ResultCache import ResultCache
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
+DEBUG_HEADER = 'x-debug-timing'  # request metadata asking for the timing breakdown
+TIMING_TRAILER = 'x-timing'  # trailing metadata carrying it, see RequestTrace.format
+PACKED_DTYPES = {'float32': '<f4', 'float16': '<f2'}  # dtype of packed embeddings -> little-endian numpy dtype
+RPC_REQUESTS = registry.counter('embedding_rpc_requests_total', 'Finished RPCs by method and status (ok, error, cancelled)',
+                                ('rpc', 'status'))
+RPC_SECONDS = registry.histogram('embedding_rpc_latency_seconds', 'RPC latency by method, streams until the last response',
+                                 ('rpc',))
 
 
 class EmbeddingServicer(embedding_pb2_grpc.GraphEmbeddingServiceServicer):
 
-    def __init__(self, model_loader: ModelLoader):
+    def __init__(self, model_loader: ModelLoader, batcher: MicroBatcher = None, cache: ResultCache = None,
+                 stream_chunk_size: int = 256, request_logger: RequestLogger = None, slow_log: SlowRequestLog = None):
+        """
+        :param stream_chunk_size: max number of streamed queries scored together
+        :param request_logger: logs the requests, a default rate-limited logger if None
+        :param slow_log: slow traced requests, dumped by dumpSlowRequests
+        """
         self.model_loader = model_loader
+        self.batcher = batcher
+        self.cache = cache
+        self.stream_chunk_size = stream_chunk_size
+        self.request_logger = request_logger or RequestLogger()
+        self.slow_log = slow_log
 
     def predictHead(self, request: embedding_pb2.PredictHeadRequest, context) -> embedding_pb2.PredictPartResponse:
-        print('[%s] predictHead\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.predict_head_entity(request.tail, request.relation, request.k)
+        self.request_logger.log('predictHead', request)
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            res = self._cached(request, model, ('head', request.tail, request.relation, request.k, request.exclude_known,
+                                                request.type_constrain),
+                               lambda: self._predict_head_entity(model, request.tail, request.relation, request.k,
+                                                                 request.exclude_known, request.type_constrain))
+        except queue.Full:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'too many pending predictions')
+        except ValueError as e:
+            # exclude_known / type_constrain on a model trained without known triples / type constraints
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
         return embedding_pb2.PredictPartResponse(val=res)
 
     def predictTail(self, request: embedding_pb2.PredictTailRequest, context) -> embedding_pb2.PredictPartResponse:
-        print('[%s] predictTail\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.predict_tail_entity(request.head, request.relation, request.k)
+        self.request_logger.log('predictTail', request)
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            res = self._cached(request, model, ('tail', request.head, request.relation, request.k, request.exclude_known,
+                                                request.type_constrain),
+                               lambda: self._predict_tail_entity(model, request.head, request.relation, request.k,
+                                                                 request.exclude_known, request.type_constrain))
+        except queue.Full:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, 'too many pending predictions')
+        except ValueError as e:
+            # exclude_known / type_constrain on a model trained without known triples / type constraints
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
         return embedding_pb2.PredictPartResponse(val=res)
 
     def predictRelation(self, request: embedding_pb2.PredictRelationRequest, context) -> embedding_pb2.PredictPartResponse:
-        print('[%s] predictRelation\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.predict_relation(request.head, request.tail, request.k)
+        self.request_logger.log('predictRelation', request)
+        model = self._get_model(request.gid, request.modelName)
+        res = self._cached(request, model, ('relation', request.head, request.tail, request.k),
+                           lambda: model.predict_relation(request.head, request.tail, request.k))
         return embedding_pb2.PredictPartResponse(val=res)
 
     def predictTriple(self, request: embedding_pb2.PredictTripleRequest, context) -> wrappers.BoolValue:
-        print('[%s] predictTriple\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.predict_triple(request.head, request.tail, request.relation, request.thresh)
+        self.request_logger.log('predictTriple', request)
+        model = self._get_model(request.gid, request.modelName)
+        res = self._cached(request, model, ('triple', request.head, request.tail, request.relation, request.thresh),
+                           lambda: model.predict_triple(request.head, request.tail, request.relation, request.thresh))
         return wrappers.BoolValue(value=res)
 
     def getEntityEmbedding(self, request: embedding_pb2.GetEmbeddingRequest, context) -> embedding_pb2.GetEmbeddingResponse:
-        print('[%s] getEntityEmbedding\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.get_ent_embedding(request.val)
+        self.request_logger.log('getEntityEmbedding', request)
+        model = self._get_model(request.gid, request.modelName)
+        if request.dtype:
+            self._check_dtype(request.dtype, context)
+            data, shape = self._cached(request, model, ('entity', request.val, request.dtype),
+                                       lambda: pack(model.get_ent_embedding_array([request.val])[0], request.dtype))
+            return embedding_pb2.GetEmbeddingResponse(data=data, dtype=request.dtype, shape=shape)
+        res = self._cached(request, model, ('entity', request.val), lambda: model.get_ent_embedding(request.val))
         return embedding_pb2.GetEmbeddingResponse(val=res)
 
     def getRelationEmbedding(self, request: embedding_pb2.GetEmbeddingRequest, context) -> embedding_pb2.GetEmbeddingResponse:
-        print('[%s] getRelationEmbedding\n' % time.time(), request)
-        model = self.model_loader.get_model(request.gid, request.modelName)
-        res = model.get_rel_embedding(request.val)
+        self.request_logger.log('getRelationEmbedding', request)
+        model = self._get_model(request.gid, request.modelName)
+        if request.dtype:
+            self._check_dtype(request.dtype, context)
+            data, shape = self._cached(request, model, ('relation_embedding', request.val, request.dtype),
+                                       lambda: pack(model.get_rel_embedding_array([request.val])[0], request.dtype))
+            return embedding_pb2.GetEmbeddingResponse(data=data, dtype=request.dtype, shape=shape)
+        res = self._cached(request, model, ('relation_embedding', request.val), lambda: model.get_rel_embedding(request.val))
         return embedding_pb2.GetEmbeddingResponse(val=res)
 
+    def predictHeadBatch(self, request: embedding_pb2.PredictHeadBatchRequest, context) -> embedding_pb2.PredictPartBatchResponse:
+        self.request_logger.log('predictHeadBatch', gid=request.gid, modelName=request.modelName, size=len(request.tail))
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            res = model.predict_head_entity_batch(request.tail, request.relation, request.k, request.exclude_known,
+                                                  request.type_constrain)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        return embedding_pb2.PredictPartBatchResponse(val=[embedding_pb2.PredictPartResponse(val=val) for val in res])
 
-def serve(model_loader: ModelLoader):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(
-        EmbeddingServicer(model_loader), server
-    )
+    def predictTailBatch(self, request: embedding_pb2.PredictTailBatchRequest, context) -> embedding_pb2.PredictPartBatchResponse:
+        self.request_logger.log('predictTailBatch', gid=request.gid, modelName=request.modelName, size=len(request.head))
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            res = model.predict_tail_entity_batch(request.head, request.relation, request.k, request.exclude_known,
+                                                  request.type_constrain)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        return embedding_pb2.PredictPartBatchResponse(val=[embedding_pb2.PredictPartResponse(val=val) for val in res])
+
+    def predictTripleBatch(self, request: embedding_pb2.PredictTripleBatchRequest, context) -> embedding_pb2.PredictTripleBatchResponse:
+        self.request_logger.log('predictTripleBatch', gid=request.gid, modelName=request.modelName, size=len(request.head))
+        model = self._get_model(request.gid, request.modelName)
+        res = model.predict_triple_batch(request.head, request.tail, request.relation, request.thresh)
+        return embedding_pb2.PredictTripleBatchResponse(val=res)
+
+    def classifyTripleBatch(self, request: embedding_pb2.ClassifyTripleBatchRequest, context) -> embedding_pb2.ClassifyTripleBatchResponse:
+        self.request_logger.log('classifyTripleBatch', gid=request.gid, modelName=request.modelName, size=len(request.head))
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            val, score, thresh = model.classify_triple_batch(request.head, request.tail, request.relation,
+                                                             request.thresh.value if request.HasField('thresh') else None)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+        return embedding_pb2.ClassifyTripleBatchResponse(val=val, score=score, thresh=thresh)
+
+    def getEntityEmbeddings(self, request: embedding_pb2.GetEmbeddingsRequest, context) -> embedding_pb2.GetEmbeddingsResponse:
+        self.request_logger.log('getEntityEmbeddings', gid=request.gid, modelName=request.modelName, size=len(request.val))
+        model = self._get_model(request.gid, request.modelName)
+        if request.dtype:
+            self._check_dtype(request.dtype, context)
+            data, shape = pack(model.get_ent_embedding_array(request.val), request.dtype)
+            return embedding_pb2.GetEmbeddingsResponse(data=data, dtype=request.dtype, shape=shape)
+        res = model.get_ent_embedding_batch(request.val)
+        return embedding_pb2.GetEmbeddingsResponse(val=[embedding_pb2.GetEmbeddingResponse(val=val) for val in res])
+
+    def exportEmbeddings(self, request: embedding_pb2.ExportEmbeddingsRequest, context):
+        self.request_logger.log('exportEmbeddings', request)
+        for page in self.export_pages(request, context):
+            yield page
+
+    def export_pages(self, request: embedding_pb2.ExportEmbeddingsRequest, context):
+        """
+        Pages of ExportEmbeddingsResponse, every page is packed straight from a slice of the embedding table.
+        """
+        dtype = request.dtype or 'float32'
+        self._check_dtype(dtype, context)
+        model = self._get_model(request.gid, request.modelName)
+        try:
+            table, names = model.get_embedding_table(request.kind or 'entity')
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        page_size = request.page_size if request.page_size > 0 else 1024
+        for start in range(max(request.start, 0), table.shape[0], page_size):
+            end = min(start + page_size, table.shape[0])
+            data, shape = pack(table[start:end], dtype)
+            page = embedding_pb2.ExportEmbeddingsResponse(start=start, data=data, dtype=dtype, shape=shape)
+            if request.with_names:
+                page.names.extend(_name_or_empty(names, i) for i in range(start, end))
+            yield page
+
+    def similarEntities(self, request: embedding_pb2.SimilarEntitiesRequest, context) -> embedding_pb2.SimilarEntitiesResponse:
+        self.request_logger.log('similarEntities', gid=request.gid, modelName=request.modelName,
+                                size=len(request.entity), k=request.k, metric=request.metric)
+        metric = request.metric or 'cosine'
+        if metric not in ModelPredictor.similar_metrics:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'metric must be one of %s' % ModelPredictor.similar_metrics)
+        model = self._get_model(request.gid, request.modelName)
+        res = model.similar_entities(request.entity, request.k, metric)
+        return embedding_pb2.SimilarEntitiesResponse(val=[embedding_pb2.SimilarEntitiesPart(val=val, score=score)
+                                                          for val, score in res])
+
+    def predictHeadStream(self, request_iterator, context):
+        self.request_logger.log('predictHeadStream')
+        for chunk in self._stream_chunks(request_iterator, context):
+            for val in self.predict_head_chunk(chunk, context):
+                yield embedding_pb2.PredictPartResponse(val=val)
+
+    def predictTailStream(self, request_iterator, context):
+        self.request_logger.log('predictTailStream')
+        for chunk in self._stream_chunks(request_iterator, context):
+            for val in self.predict_tail_chunk(chunk, context):
+                yield embedding_pb2.PredictPartResponse(val=val)
+
+    def dumpSlowRequests(self, request: embedding_pb2.DumpSlowRequestsRequest, context) -> embedding_pb2.DumpSlowRequestsResponse:
+        self.request_logger.log('dumpSlowRequests', request)
+        entries = self.slow_log.dump(request.limit, request.clear) if self.slow_log is not None else []
+        return embedding_pb2.DumpSlowRequestsResponse(requests=[embedding_pb2.SlowRequest(
+            rpc=entry['rpc'],
+            timestamp=entry['timestamp'],
+            stages=[embedding_pb2.StageTiming(stage=name, ms=ms) for name, ms in entry['stages']],
+            request=entry.get('request', '')
+        ) for entry in entries])
+
+    def predict_head_chunk(self, chunk: list, context) -> list:
+        """
+        :param chunk: PredictHeadRequest sharing gid, modelName, k, exclude_known and type_constrain
+        """
+        model = self._get_model(chunk[0].gid, chunk[0].modelName)
+        try:
+            return model.predict_head_entity_batch([request.tail for request in chunk],
+                                                   [request.relation for request in chunk], chunk[0].k,
+                                                   chunk[0].exclude_known, chunk[0].type_constrain)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+
+    def predict_tail_chunk(self, chunk: list, context) -> list:
+        """
+        :param chunk: PredictTailRequest sharing gid, modelName, k, exclude_known and type_constrain
+        """
+        model = self._get_model(chunk[0].gid, chunk[0].modelName)
+        try:
+            return model.predict_tail_entity_batch([request.head for request in chunk],
+                                                   [request.relation for request in chunk], chunk[0].k,
+                                                   chunk[0].exclude_known, chunk[0].type_constrain)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, str(e))
+
+    def _stream_chunks(self, request_iterator, context):
+        """
+        Reads the request stream on a separate thread into a bounded queue, so a slow consumer stops
+        reading and the client is throttled by flow control. Yields chunks of consecutive queued
+        requests with the same stream_chunk_key, without waiting for more requests to arrive.
+        """
+        requests = queue.Queue(maxsize=2 * self.stream_chunk_size)
+        end = object()
+
+        def put(item) -> None:
+            while context.is_active():
+                try:
+                    requests.put(item, timeout=1)
+                    return
+                except queue.Full:
+                    pass
+
+        def read() -> None:
+            try:
+                for request in request_iterator:
+                    put(request)
+            except Exception as e:
+                put(e)
+            put(end)
+
+        threading.Thread(target=read, daemon=True).start()
+        pending = requests.get()
+        while pending is not end:
+            if isinstance(pending, Exception):
+                raise pending
+            chunk = [pending]
+            pending = None
+            while len(chunk) < self.stream_chunk_size:
+                try:
+                    request = requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is end or isinstance(request, Exception) or stream_chunk_key(request) != stream_chunk_key(chunk[0]):
+                    pending = request
+                    break
+                chunk.append(request)
+            yield chunk
+            if pending is None:
+                pending = requests.get()
+
+    def _check_dtype(self, dtype: str, context) -> None:
+        if dtype not in PACKED_DTYPES:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, 'dtype must be one of %s' % sorted(PACKED_DTYPES))
+
+    def shutdown(self) -> None:
+        """
+        Stops the micro batcher, called once the grpc server has stopped.
+        """
+        if self.batcher is not None:
+            self.batcher.shutdown()
+
+    def _get_model(self, gid: int, model_name: str) -> ModelPredictor:
+        with stage('get_model'):
+            return self.model_loader.get_model(gid, model_name)
+
+    def _predict_head_entity(self, model: ModelPredictor, t: str, r: str, k: int, exclude_known: bool,
+                            type_constrain: bool) -> list:
+        if self.batcher is None:
+            return model.predict_head_entity(t, r, k, exclude_known, type_constrain)
+        # the batch is scored on the dispatcher thread, its stages are not broken down
+        with stage('batch'):
+            return self.batcher.predict_head_entity(model, t, r, k, exclude_known, type_constrain)
+
+    def _predict_tail_entity(self, model: ModelPredictor, h: str, r: str, k: int, exclude_known: bool,
+                            type_constrain: bool) -> list:
+        if self.batcher is None:
+            return model.predict_tail_entity(h, r, k, exclude_known, type_constrain)
+        with stage('batch'):
+            return self.batcher.predict_tail_entity(model, h, r, k, exclude_known, type_constrain)
+
+    def _cached(self, request, model: ModelPredictor, query: tuple, compute):
+        """
+        :param request: request carrying gid and modelName
+        :param model: the model serving the request, its version is part of the cache key
+        :param query: the rest of the cache key
+        :param compute: computes the result on a cache miss
+        """
+        if self.cache is None:
+            return compute()
+        key = (str(request.gid), request.modelName, model.version) + query
+        return self.cache.get_or_compute(key, compute)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """
+    Counts the requests and observes the latency of every RPC.
+    Unary requests carrying the x-debug-timing header are traced: their per-stage timings are returned in the
+    x-timing trailing metadata. Traced requests slower than slow_log.slow_ms are kept in slow_log.
+    """
+
+    def __init__(self, slow_log: SlowRequestLog = None, trace_all: bool = False):
+        """
+        :param trace_all: trace every unary request, so slow requests are sampled without the header
+        """
+        self.slow_log = slow_log
+        self.trace_all = trace_all
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        rpc = handler_call_details.method.rsplit('/', 1)[-1]
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(_timed_unary(handler.unary_unary, rpc, self),
+                                                       handler.request_deserializer, handler.response_serializer)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(_timed_stream(handler.unary_stream, rpc),
+                                                        handler.request_deserializer, handler.response_serializer)
+        if handler.stream_stream is not None:
+            return grpc.stream_stream_rpc_method_handler(_timed_stream(handler.stream_stream, rpc),
+                                                         handler.request_deserializer, handler.response_serializer)
+        return handler
+
+    def trace(self, rpc: str, context) -> (RequestTrace, bool):
+        """
+        :return: the trace of the request (None if it is not traced), whether the client asked for the timings
+        """
+        debug = is_debug(context.invocation_metadata())
+        if not debug and not self.trace_all:
+            return None, False
+        return RequestTrace(rpc), debug
+
+    def finish(self, trace: RequestTrace, debug: bool, request, context) -> None:
+        if debug:
+            context.set_trailing_metadata(((TIMING_TRAILER, trace.format()),))
+        if self.slow_log is not None:
+            self.slow_log.record(trace, request)
+
+
+def is_debug(metadata) -> bool:
+    for key, value in metadata or ():
+        if key == DEBUG_HEADER:
+            return value.lower() not in ('', '0', 'false')
+    return False
+
+
+def _timed_unary(behavior, rpc: str, interceptor: MetricsInterceptor):
+    def timed(request, context):
+        trace, debug = interceptor.trace(rpc, context)
+        start_time = time.perf_counter()
+        status = 'ok'
+        try:
+            if trace is None:
+                return behavior(request, context)
+            with trace.activate():
+                return behavior(request, context)
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            observe_rpc(rpc, status, time.perf_counter() - start_time)
+            if trace is not None:
+                interceptor.finish(trace, debug, request, context)
+    return timed
+
+
+def _timed_stream(behavior, rpc: str):
+    def timed(request_or_iterator, context):
+        start_time = time.perf_counter()
+        status = 'ok'
+        try:
+            yield from behavior(request_or_iterator, context)
+        except GeneratorExit:
+            status = 'cancelled'
+            raise
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            observe_rpc(rpc, status, time.perf_counter() - start_time)
+    return timed
+
+
+def observe_rpc(rpc: str, status: str, seconds: float) -> None:
+    RPC_REQUESTS.inc(rpc=rpc, status=status)
+    RPC_SECONDS.observe(seconds, rpc=rpc)
+
+
+def pack(a: np.ndarray, dtype: str) -> tuple:
+    """
+    :param dtype: float32 or float16
+    :return: the array as packed little-endian bytes (row-major), its shape
+    """
+    return np.ascontiguousarray(a, dtype=PACKED_DTYPES[dtype]).tobytes(), list(a.shape)
+
+
+def _name_or_empty(names, id: int) -> str:
+    try:
+        return names[id]
+    except KeyError:
+        return ''
+
+
+def stream_chunk_key(request) -> tuple:
+    """
+    Streamed requests are scored together only if they have the same key.
+    """
+    return request.gid, request.modelName, request.k, request.exclude_known, request.type_constrain
+
+
+def make_batcher() -> MicroBatcher:
+    batching_config = config_loader.get_config().get('batching', {})
+    if not batching_config.get('enabled', False):
+        return None
+    return MicroBatcher(batching_config.get('window_ms', 2),
+                        batching_config.get('max_batch_size', 64),
+                        batching_config.get('max_queue_size', 1024),
+                        batching_config.get('workers', 4))
+
+
+def make_cache() -> ResultCache:
+    cache_config = config_loader.get_config().get('cache', {})
+    if not cache_config.get('enabled', False):
+        return None
+    cache = ResultCache(cache_config.get('max_bytes', 256 * 1024 * 1024), cache_config.get('ttl', 600))
+    registry.counter('embedding_cache_requests_total', 'Result cache lookups by result (hit, miss, coalesced)', ('result',),
+                     callback=lambda: _cache_requests(cache.stats()))
+    registry.gauge('embedding_cache_hit_ratio', 'Share of result cache lookups served from the cache',
+                   callback=lambda: _hit_ratio(cache.stats()))
+    registry.gauge('embedding_cache_bytes', 'Estimated size of the cached results', callback=lambda: cache.stats()['bytes'])
+    return cache
+
+
+def _cache_requests(stats: dict) -> dict:
+    return {('hit',): stats['hits'], ('miss',): stats['misses'], ('coalesced',): stats['coalesced']}
+
+
+def _hit_ratio(stats: dict) -> float:
+    total = stats['hits'] + stats['misses'] + stats['coalesced']
+    return stats['hits'] / total if total > 0 else 0
+
+
+def make_slow_log() -> SlowRequestLog:
+    debug_config = config_loader.get_config().get('debug', {})
+    return SlowRequestLog(debug_config.get('slow_ms', 100), debug_config.get('ring_size', 100))
+
+
+def make_interceptor(slow_log: SlowRequestLog) -> MetricsInterceptor:
+    return MetricsInterceptor(slow_log, config_loader.get_config().get('debug', {}).get('trace_all', False))
+
+
+def make_servicer(model_loader: ModelLoader, cache: ResultCache = None, slow_log: SlowRequestLog = None) -> EmbeddingServicer:
+    stream_chunk_size = config_loader.get_config().get('stream', {}).get('chunk_size', 256)
+    log_config = config_loader.get_config().get('request_log', {})
+    request_logger = RequestLogger(log_config.get('rate', 10), log_config.get('burst', 20))
+    return EmbeddingServicer(model_loader, make_batcher(), cache, stream_chunk_size, request_logger, slow_log)
+
+
+def serve(model_loader: ModelLoader, cache: ResultCache = None):
+    grpc_config = config_loader.get_config()['grpc']
+    slow_log = make_slow_log()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=grpc_config.get('max_workers', 10)),
+                         interceptors=[make_interceptor(slow_log)],
+                         maximum_concurrent_rpcs=grpc_config.get('max_concurrent_rpcs') or None)
+    servicer = make_servicer(model_loader, cache, slow_log)
+    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(servicer, server)
     port = config_loader.get_config()['grpc']['port']
     server.add_insecure_port('[::]:%d' % port)
     server.start()
@@ -66,24 +507,35 @@ def serve(model_loader: ModelLoader):
             time.sleep(_ONE_DAY_IN_SECONDS)
     except KeyboardInterrupt:
         print('stop serve...')
-        server.stop(0)
+        server.stop(0).wait()
+        servicer.shutdown()
 
 
-def update_model(model_loader: ModelLoader):
+def update_model(model_loader: ModelLoader, cache: ResultCache = None):
+    report_interval = config_loader.get_config().get('cache', {}).get('report_interval', 60)
+    last_report = time.time()
     try:
         while True:
             time.sleep(config_loader.get_config()['update_interval'])
             if model_loader.check_update():
                 print('[%s] updating model...' % time.time())
-                model_loader.model_map = model_loader.load()
+                model_loader.reload()
+                if cache is not None:
+                    cache.retain(model_loader.get_versions())
+            if cache is not None and time.time() - last_report >= report_interval:
+                print('[%s] cache' % time.time(), cache.stats())
+                last_report = time.time()
     except KeyboardInterrupt:
         print('stop udpate model')
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     model_loader = ModelLoader(config_loader.get_config()['gpu'])
+    cache = make_cache()
+    start_metrics()
     executor = futures.ThreadPoolExecutor(max_workers=2)
-    executor.submit(serve, model_loader)
-    update_model(model_loader)
+    executor.submit(serve, model_loader, cache)
+    update_model(model_loader, cache)
 
 
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class KnownTriples:
+    """
+    Triples known from the training data, as two CSR indexes shipped in the binary parameter file:
+        known.tail.keys / offsets / ids  (h, r) -> tails, key h * rel_tot + r
+        known.head.keys / offsets / ids  (r, t) -> heads, key t * rel_tot + r
+    keys are sorted and unique, the ids of keys[i] are ids[offsets[i]:offsets[i + 1]].
+    A query finds its row by binary search over the keys, never by scanning the triples.
+    """
+
+    def __init__(self, arrays: dict, rel_tot: int):
+        self.rel_tot = rel_tot
+        self.index = {}
+        for mode in ['head', 'tail']:
+            self.index[mode] = tuple(arrays['known.%s.%s' % (mode, name)] for name in ['keys', 'offsets', 'ids'])
+
+    @classmethod
+    def from_params(cls, params: dict, rel_tot: int) -> 'KnownTriples':
+        """
+        :return: None if the parameter file carries no known triples
+        """
+        if 'known.tail.keys' not in params:
+            return None
+        return cls(params, rel_tot)
+
+    @staticmethod
+    def build(triples: np.ndarray, rel_tot: int) -> dict:
+        """
+        :param triples: (h, t, r) ids, shape (M, 3)
+        :return: arrays to store in the parameter file
+        """
+        triples = np.asarray(triples, dtype=np.int64).reshape(-1, 3)
+        h, t, r = triples[:, 0], triples[:, 1], triples[:, 2]
+        arrays = {}
+        for mode, keys, ids in [('tail', h * rel_tot + r, t), ('head', t * rel_tot + r, h)]:
+            pairs = np.unique(np.stack([keys, ids], 1), axis=0)
+            unique_keys, counts = np.unique(pairs[:, 0], return_counts=True)
+            offsets = np.zeros(len(unique_keys) + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            arrays['known.%s.keys' % mode] = unique_keys
+            arrays['known.%s.offsets' % mode] = offsets
+            arrays['known.%s.ids' % mode] = np.ascontiguousarray(pairs[:, 1])
+        return arrays
+
+    def lookup(self, mode: str, e: list, r: list) -> list:
+        """
+        :param mode: head for the known heads of (r, t), tail for the known tails of (h, r)
+        :param e: tail entity ids for head, head entity ids for tail
+        :param r: relation ids
+        :return: known entity ids of every query
+        """
+        keys, offsets, ids = self.index[mode]
+        query = np.asarray(e, dtype=np.int64) * self.rel_tot + np.asarray(r, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(keys, query), max(len(keys) - 1, 0))
+        found = (keys[pos] == query) if len(keys) > 0 else np.zeros(len(query), dtype=bool)
+        return [ids[offsets[p]:offsets[p + 1]] if f else ids[:0] for p, f in zip(pos, found)]
+
+    @staticmethod
+    def cells(known: list) -> tuple:
+        """
+        :param known: known entity ids of every row, from lookup
+        :return: (rows, cols) of the known entities in a (B, ent_tot) score matrix, to mask with the scorer
+        """
+        counts = [len(ids) for ids in known]
+        if sum(counts) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.repeat(np.arange(len(known)), counts), np.concatenate(known).astype(np.int64)
+
+    def nbytes(self) -> int:
+        return sum(array.nbytes for arrays in self.index.values() for array in arrays)
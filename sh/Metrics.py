@@ -0,0 +1,224 @@
+import bisect
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.config_loader import config_loader
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), callback=None):
+        """
+        :param labels: label names, values are passed as keyword arguments
+        :param callback: called on every scrape instead of keeping values, returns a number,
+            or {label values tuple: number} for labelled metrics
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.callback = callback
+        self.values = {}  # label values -> value
+        self.lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def samples(self) -> list:
+        """
+        :return: [(suffix, label values, extra labels, value), ...]
+        """
+        if self.callback is not None:
+            values = self.callback()
+            if not isinstance(values, dict):
+                values = {(): values}
+            return [('', key, (), value) for key, value in values.items()]
+        with self.lock:
+            return [('', key, (), value) for key, value in self.values.items()]
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    type = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def dec(self, value: float = 1, **labels) -> None:
+        self.inc(-value, **labels)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # per bucket counts (the last one is +Inf), then sum
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self.lock:
+            values = [(key, list(counts)) for key, counts in self.values.items()]
+        res = []
+        for key, counts in values:
+            total = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                total += count
+                res.append(('_bucket', key, (('le', _format_value(bound)),), total))
+            res.append(('_count', key, (), total))
+            res.append(('_sum', key, (), counts[-1]))
+        return res
+
+
+class Registry:
+    """
+    Metrics of one process in the Prometheus text format.
+    Registering a metric under a name already in use replaces the previous one.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labels: tuple = (), callback=None) -> Counter:
+        return self._register(Counter(name, documentation, labels, callback))
+
+    def gauge(self, name: str, documentation: str, labels: tuple = (), callback=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, callback))
+
+    def histogram(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append('# HELP %s %s' % (metric.name, metric.documentation.replace('\\', '\\\\').replace('\n', '\\n')))
+            lines.append('# TYPE %s %s' % (metric.name, metric.type))
+            for suffix, key, extra, value in metric.samples():
+                labels = tuple(zip(metric.labels, key)) + extra
+                if labels:
+                    lines.append('%s%s{%s} %s' % (metric.name, suffix, ','.join(
+                        '%s="%s"' % (name, _escape(label)) for name, label in labels), _format_value(value)))
+                else:
+                    lines.append('%s%s %s' % (metric.name, suffix, _format_value(value)))
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric: _Metric):
+        with self.lock:
+            self.metrics[metric.name] = metric
+        return metric
+
+
+registry = Registry()
+
+
+def serve_metrics(port: int, host: str = '127.0.0.1', metrics_registry: Registry = None,
+                  reuse_port: bool = False) -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics on a daemon thread.
+    :param port: 0 picks a free port, see server.server_address
+    :param reuse_port: bind with SO_REUSEPORT, so a replacing process can bind the port before the old one exits
+    :return: the http server, server.shutdown() stops it
+    """
+    metrics_registry = metrics_registry or registry
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            try:
+                body = metrics_registry.render().encode('utf-8')
+            except Exception as e:
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+
+        def server_bind(self):
+            if reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            super(Server, self).server_bind()
+
+    server = Server((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_metrics(offset: int = 0, reuse_port: bool = False) -> ThreadingHTTPServer:
+    """
+    Serves the metrics of this process on metrics.port + offset if metrics are enabled.
+    """
+    metrics_config = config_loader.get_config().get('metrics', {})
+    if not metrics_config.get('enabled', False):
+        return None
+    port = metrics_config.get('port', 9100) + offset
+    server = serve_metrics(port, metrics_config.get('host', '127.0.0.1'), reuse_port=reuse_port)
+    print('serve metrics on %s:%d/metrics' % server.server_address[:2])
+    return server
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    if value != value:
+        return 'NaN'
+    if float(value).is_integer():
+        return '%d' % value
+    return repr(float(value))
@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import Future
+
+from sh.ModelPredictors import ModelPredictor
+
+# queued by shutdown, after every accepted query
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-query head / tail predictions within a small time window
+    and scores the ones targeting the same model as one batch, then fans the results back out.
+    Only the collection is serialized, the batches of different groups are scored in parallel.
+    """
+
+    def __init__(self, window_ms: float = 2, max_batch_size: int = 64, max_queue_size: int = 1024, workers: int = 4):
+        """
+        :param window_ms: how long to wait for more queries after the first one of a batch
+        :param max_batch_size: max number of queries scored together
+        :param max_queue_size: max number of pending queries, further queries are rejected
+        :param workers: number of batches scored at the same time, so a slow model does not hold up the others
+        """
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.requests = queue.Queue(maxsize=max_queue_size)
+        # guards stopped, so no query is queued after _STOP
+        self.lock = threading.Lock()
+        self.stopped = False
+        self.executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self.dispatcher = threading.Thread(target=self._run, daemon=True)
+        self.dispatcher.start()
+
+    def predict_head_entity(self, model: ModelPredictor, t: str, r: str, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
+        """
+        :raise queue.Full: too many pending queries
+        """
+        return self._submit(model, 'head', t, r, k, exclude_known, type_constrain)
+
+    def predict_tail_entity(self, model: ModelPredictor, h: str, r: str, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
+        """
+        :raise queue.Full: too many pending queries
+        """
+        return self._submit(model, 'tail', h, r, k, exclude_known, type_constrain)
+
+    def shutdown(self, timeout: float = None) -> None:
+        """
+        Scores the queries already accepted, then stops the dispatcher and the workers, later queries are rejected.
+        :param timeout: max seconds to wait for the dispatcher, None waits until it exits
+        """
+        with self.lock:
+            if self.stopped:
+                return
+            self.stopped = True
+            # the dispatcher keeps emptying the queue, so this put does not block for long
+            self.requests.put(_STOP)
+        self.dispatcher.join(timeout)
+        self.executor.shutdown(wait=True)
+
+    def _submit(self, model: ModelPredictor, mode: str, e: str, r: str, k: int, exclude_known: bool,
+                type_constrain: bool) -> list:
+        """
+        :raise RuntimeError: the batcher is shut down
+        """
+        future = Future()
+        with self.lock:
+            if self.stopped:
+                raise RuntimeError('micro batcher is shut down')
+            self.requests.put_nowait((model, mode, e, r, max(k, 0), exclude_known, type_constrain, future))
+        return future.result()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self.requests.get()]
+            if batch[0] is _STOP:
+                return
+            deadline = time.time() + self.window
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.requests.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            groups = {}
+            for item in batch:
+                groups.setdefault((id(item[0]), item[1], item[5], item[6]), []).append(item)
+            for items in groups.values():
+                self.executor.submit(self._score, items)
+
+    def _score(self, items: list) -> None:
+        """
+        Scores queries of the same model, mode, exclude_known and type_constrain together, using the largest k of the group.
+        If the batch fails (e.g. an unknown entity), every query is retried alone so the error
+        only reaches the request that caused it.
+        """
+        model, mode = items[0][0], items[0][1]
+        k = max(item[4] for item in items)
+        if mode == 'head':
+            predict = model.predict_head_entity_batch
+        else:
+            predict = model.predict_tail_entity_batch
+        try:
+            res = predict([item[2] for item in items], [item[3] for item in items], k, items[0][5], items[0][6])
+        except Exception as e:
+            if len(items) > 1:
+                for item in items:
+                    self._score([item])
+            else:
+                items[0][7].set_exception(e)
+            return
+        for item, val in zip(items, res):
+            item[7].set_result(val[:item[4]])
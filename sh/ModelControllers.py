@@ -16,7 +16,12 @@ class BaseModelController:
             # shutil.rmtree(checkpoint_dir)
         self.checkpoint_path = '%s/%s.ckpt' % (checkpoint_dir, self.model_name)
         self.parameters_path = '%s/%s.param' % (checkpoint_dir, self.model_name)
+        self.binary_parameters = config_loader.get_config().get('param_format', 'json') == 'binary'
+        # same norm as the serving models
+        self.p_norm = config_loader.get_config().get('models', {}).get('p_norm', 1)
         self.use_gpu = use_gpu
+        # triple classification threshold of every relation, tuned on the validation triples by test()
+        self.relation_thresholds = None
 
     def train(self) -> None:
         raise NotImplementedError
@@ -50,7 +55,7 @@ class TranseController(BaseModelController):
         self.transx = TransE(
             ent_tot = self.ent_tot,
             rel_tot = self.rel_tot,
-            p_norm = 1,
+            p_norm = self.p_norm,
             norm_flag = True)
 
         self.model = NegativeSampling(
@@ -63,13 +68,14 @@ class TranseController(BaseModelController):
         trainer = Trainer(model=self.model, data_loader=self.train_dataloader, train_times=1000, alpha=1.0, use_gpu=self.use_gpu)
         trainer.run()
         self.transx.save_checkpoint(self.checkpoint_path)
-        self.transx.save_parameters(self.parameters_path)
+        self.transx.save_parameters(self.parameters_path, self.binary_parameters)
         print("save check param")
 
     def test(self) -> None:
         self.transx.load_checkpoint(self.checkpoint_path)
         tester = Tester(model = self.transx, data_loader = self.test_dataloader, use_gpu=self.use_gpu)
-        tester.run_link_prediction(type_constrain = False)
+        tester.run_link_prediction(type_constrain = False, batch_size = 256)
+        self.relation_thresholds = tester.run_relation_thresholds()
 
 
 class TranshController(BaseModelController):
@@ -97,7 +103,7 @@ class TranshController(BaseModelController):
         self.transx = TransH(
             ent_tot = self.ent_tot,
             rel_tot = self.rel_tot,
-            p_norm = 1,
+            p_norm = self.p_norm,
             norm_flag = True)
 
         self.model = NegativeSampling(
@@ -110,12 +116,13 @@ class TranshController(BaseModelController):
         trainer = Trainer(model=self.model, data_loader=self.train_dataloader, train_times=1000, alpha=0.5, use_gpu=self.use_gpu)
         trainer.run()
         self.transx.save_checkpoint(self.checkpoint_path)
-        self.transx.save_parameters(self.parameters_path)
+        self.transx.save_parameters(self.parameters_path, self.binary_parameters)
 
     def test(self) -> None:
         self.transx.load_checkpoint(self.checkpoint_path)
         tester = Tester(model = self.transx, data_loader = self.test_dataloader, use_gpu=self.use_gpu)
-        tester.run_link_prediction(type_constrain = False)
+        tester.run_link_prediction(type_constrain = False, batch_size = 256)
+        self.relation_thresholds = tester.run_relation_thresholds()
 
 
 class TransdController(BaseModelController):
@@ -143,7 +150,7 @@ class TransdController(BaseModelController):
         self.transx = TransD(
             ent_tot = self.ent_tot,
             rel_tot = self.rel_tot,
-            p_norm = 1,
+            p_norm = self.p_norm,
             norm_flag = True)
 
         self.model = NegativeSampling(
@@ -156,12 +163,13 @@ class TransdController(BaseModelController):
         trainer = Trainer(model=self.model, data_loader=self.train_dataloader, train_times=1000, alpha=1.0, use_gpu=self.use_gpu)
         trainer.run()
         self.transx.save_checkpoint(self.checkpoint_path)
-        self.transx.save_parameters(self.parameters_path)
+        self.transx.save_parameters(self.parameters_path, self.binary_parameters)
 
     def test(self) -> None:
         self.transx.load_checkpoint(self.checkpoint_path)
         tester = Tester(model = self.transx, data_loader = self.test_dataloader, use_gpu=self.use_gpu)
-        tester.run_link_prediction(type_constrain = False)
+        tester.run_link_prediction(type_constrain = False, batch_size = 256)
+        self.relation_thresholds = tester.run_relation_thresholds()
 
 
 model_controllers = {
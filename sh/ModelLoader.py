@@ -1,10 +1,27 @@
+import datetime
 import os
+import queue
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from concurrent import futures
+from concurrent.futures import Future
+
+import pymysql
 
 from config.config_loader import config_loader
 from Utils import mysql_utils
+from sh.Metrics import registry
 from sh.ModelPredictors import ModelPredictor
+from sh.Vocabulary import Vocabulary, save_vocabularies
 
 curr_dir = os.path.split(os.path.abspath(__file__))[0]
+# 限定下载的版本，参数为 _updated_range(updated)
+UPDATED_FILTER = ' and updated >= %s and updated < %s'
+RELOAD_SECONDS = registry.histogram('embedding_model_reload_seconds', 'Time to rebuild one model of a new version during reload',
+                                    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600))
 
 
 class ModelLoader:
@@ -14,23 +31,136 @@ class ModelLoader:
         self.models_dir = '%s/../%s' % (curr_dir, config_loader.get_config()['path']['trainedmodels'])
         if not os.path.exists(self.models_dir):
             os.makedirs(self.models_dir)
+        models_config = config_loader.get_config().get('models', {})
+        self.lazy = models_config.get('lazy', False)
+        self.memory_budget = models_config.get('memory_budget', 0)
+        self.pinned = set(tuple(key.split('_')) for key in models_config.get('pinned', []))
+        self.quantization = models_config.get('quantization', {})  # "<gid>_<model_name>" 或 "default" -> float32 / float16 / int8
+        self.projection_cache_bytes = models_config.get('projection_cache_bytes', 256 * 1024 * 1024)
+        self.backend = models_config.get('backend', 'torch')  # torch 或 numpy（不导入 torch，只支持 cpu）
+        self.p_norm = models_config.get('p_norm', 1)  # 仅用于没有记录 model.p_norm 的旧参数文件
+        self.version_map = {}  # (<gid>, <model_name>) -> <updated>
+        self.loading = {}  # (<gid>, <model_name>) -> Future
+        self.lock = threading.Lock()
+        self.connections = queue.Queue()  # 下载参数使用的数据库连接
         self.model_map = self.load()
-
+        registry.gauge('embedding_models_loaded', 'Number of loaded models', callback=lambda: len(self.model_map))
+        registry.gauge('embedding_models_known', 'Number of models available for loading',
+                       callback=lambda: len(self.version_map))
+        registry.gauge('embedding_model_bytes', 'Estimated memory held by every loaded model', ('gid', 'model_name'),
+                       callback=lambda: dict((key, model.nbytes()) for key, model in list(self.model_map.items())))
 
     def get_model(self, gid: int, model_name: str) -> ModelPredictor:
-        return self.model_map[(str(gid), model_name)]
+        """
+        获取模型，未加载的模型在第一次请求时加载，同一模型的并发首次请求只加载一次
+        :raise KeyError: 模型不存在
+        """
+        key = (str(gid), model_name)
+        with self.lock:
+            model = self.model_map.get(key)
+            if model is not None:
+                self.model_map.move_to_end(key)
+                return model
+            future = self.loading.get(key)
+            owner = future is None
+            if owner:
+                updated = self.version_map[key]
+                future = self.loading[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            model = self._make_predictor(key[0], key[1], updated)
+        except Exception as e:
+            with self.lock:
+                del self.loading[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.loading[key]
+            if self.version_map.get(key) == updated:
+                self.model_map[key] = model
+                self._evict(key)
+        future.set_result(model)
+        return model
+
+    def preload(self) -> None:
+        """
+        关闭 lazy 模式并加载所有尚未加载的模型，之后 reload 也重建所有新版本模型
+        多进程部署在 fork 前调用：worker 共享 master 加载的模型，而不是在 fork 后各自加载一份
+        """
+        with self.lock:
+            self.lazy = False
+            missing = [(key, updated) for key, updated in self.version_map.items() if key not in self.model_map]
+        for (key, updated) in missing:
+            model = self._make_predictor(key[0], key[1], updated)
+            with self.lock:
+                self.model_map[key] = model
+
+    def get_versions(self) -> set:
+        """
+        已加载模型的版本
+        :return: {(<gid>, <model_name>, <updated>), ...}
+        """
+        return set((gid, model_name, model.version) for (gid, model_name), model in list(self.model_map.items()))
+
+    def get_loaded_bytes(self) -> int:
+        return sum(model.nbytes() for model in list(self.model_map.values()))
 
     def check_update(self) -> bool:
         """
-        检查模型是否更新
+        检查模型是否更新（新版本或下线）
         :return:
         """
-        local_embed_info = self._get_embed_infos()
         remote_embed_info = self._fetch_embed_infos()
-        to_download_embed = remote_embed_info - local_embed_info
-        return len(to_download_embed) > 0
+        local_versions = set((gid, modelname, updated) for (gid, modelname), updated in self.version_map.items())
+        return remote_embed_info != local_versions
+
+    def reload(self) -> None:
+        """
+        增量更新模型
+        S1 对比本地与远程版本，找到新版本和已下线的模型
+        S2 下载新版本参数
+        S3 逐个重建已加载（或 pinned）的新版本模型，每个模型构建完成后单独原子替换
+        S4 移除已下线的模型
+        旧版本模型在正在处理的请求结束、不再被引用后释放
+        :return:
+        """
+        remote_embed_info = self._fetch_embed_infos()
+        remote_versions = {}
+        for (gid, modelname, updated) in remote_embed_info:
+            remote_versions[(gid, modelname)] = updated
+        changed = [(key, updated) for key, updated in remote_versions.items() if self.version_map.get(key) != updated]
+        removed = [key for key in self.version_map if key not in remote_versions]
+        self._download_embed(list(remote_embed_info - self._get_embed_infos()))
 
-    def load(self) -> dict:
+        for (key, updated) in changed:
+            old = self.model_map.get(key)
+            if self.lazy and old is None and key not in self.pinned:
+                with self.lock:
+                    self.version_map[key] = updated
+                continue
+            start_time = time.time()
+            model = self._make_predictor(key[0], key[1], updated)
+            with self.lock:
+                self.version_map[key] = updated
+                self.model_map[key] = model
+                self._evict(key)
+            RELOAD_SECONDS.observe(time.time() - start_time)
+            old_bytes = old.nbytes() if old is not None else 0
+            print('[%s] reload model gid=%s modelName=%s version=%s duration=%.2fs memory delta=%+d bytes' % (
+                time.time(), key[0], key[1], updated, time.time() - start_time, model.nbytes() - old_bytes))
+            if old is not None:
+                weakref.finalize(old, print, '[release] model gid=%s modelName=%s version=%s' % (key[0], key[1], old.version))
+            del old, model
+
+        with self.lock:
+            for key in removed:
+                self.version_map.pop(key, None)
+                if self.model_map.pop(key, None) is not None:
+                    print('[%s] unload model gid=%s modelName=%s' % (time.time(), key[0], key[1]))
+
+    def load(self) -> OrderedDict:
         """
         {
             gspaceId: Long,
@@ -49,6 +179,7 @@ class ModelLoader:
         S5 下载缺少的embed param
         # S6 删除无用的embed param
         S7 load predictor
+        lazy 模式下只加载 pinned 模型，其余模型在第一次请求时加载
         :return:
         """
         local_embed_info = self._get_embed_infos()
@@ -56,18 +187,60 @@ class ModelLoader:
         to_download_embed = list(remote_embed_info - local_embed_info)
         # to_delete_embed = list(local_embed_info - remote_embed_info)
         self._download_embed(to_download_embed)
-        load_map = {}
+        load_map = OrderedDict()
+        version_map = {}
         for (gid, modelname, updated) in remote_embed_info:
-            paramters_path = '%s/%s' % (self.models_dir, self._make_param_file_name(gid, modelname, updated))
-            entity2id_path = '%s/%s' % (self.models_dir, self._make_entity2id_file_name(gid, modelname, updated))
-            relation2id_path = '%s/%s' % (self.models_dir, self._make_relation2id_file_name(gid, modelname, updated))
-            load_map[(gid, modelname)] = ModelPredictor(modelname,
-                                                        paramters_path,
-                                                        entity2id_path,
-                                                        relation2id_path,
-                                                        self.use_gpu)
+            version_map[(gid, modelname)] = updated
+            if self.lazy and (gid, modelname) not in self.pinned:
+                continue
+            load_map[(gid, modelname)] = self._make_predictor(gid, modelname, updated)
+        self.version_map = version_map
         return load_map
 
+    def _make_predictor(self, gid: str, modelname: str, updated: str) -> ModelPredictor:
+        paramters_path = '%s/%s' % (self.models_dir, self._make_param_file_name(gid, modelname, updated))
+        entity2id_path = '%s/%s' % (self.models_dir, self._make_entity2id_file_name(gid, modelname, updated))
+        relation2id_path = '%s/%s' % (self.models_dir, self._make_relation2id_file_name(gid, modelname, updated))
+        vocab_path = '%s/%s' % (self.models_dir, self._make_vocab_file_name(gid, modelname, updated))
+        if not os.path.exists(vocab_path):
+            self._write_vocab_file(vocab_path, entity2id_path, relation2id_path)
+        return ModelPredictor(modelname,
+                              paramters_path,
+                              entity2id_path,
+                              relation2id_path,
+                              self.use_gpu,
+                              config_loader.get_config().get('ann'),
+                              updated,
+                              self.quantization.get('%s_%s' % (gid, modelname), self.quantization.get('default', 'float32')),
+                              vocab_path,
+                              self.projection_cache_bytes,
+                              self.backend,
+                              self.p_norm)
+
+    def _write_vocab_file(self, vocab_path: str, entity2id_path: str, relation2id_path: str) -> None:
+        """
+        每个版本只解析一次 entity2id / relation2id 文本，之后的加载（包括重启、多进程 worker）直接内存映射
+        """
+        tmp_path = '%s/.%s.part' % (self.models_dir, os.path.basename(vocab_path))
+        save_vocabularies(tmp_path, Vocabulary.from_text(entity2id_path), Vocabulary.from_text(relation2id_path))
+        os.replace(tmp_path, vocab_path)
+
+    def _evict(self, keep: tuple) -> None:
+        """
+        lazy 模式下按最近访问顺序淘汰模型，直到已加载模型的内存不超过 memory_budget，pinned 模型和 keep 不淘汰
+        投影缓存按上限计入（max_nbytes），加载后缓存增长也不会超出预算
+        调用时需持有 self.lock
+        """
+        if not self.lazy or self.memory_budget <= 0:
+            return
+        total = sum(model.max_nbytes() for model in self.model_map.values())
+        for key in list(self.model_map.keys()):
+            if total <= self.memory_budget:
+                break
+            if key == keep or key in self.pinned:
+                continue
+            total -= self.model_map.pop(key).max_nbytes()
+            print('evict model gid=%s modelName=%s' % key)
 
     def _download_embed(self, to_download_embed: list) -> None:
         """
@@ -76,22 +249,110 @@ class ModelLoader:
             param: <gid>_<modelname>_<updated>.param
             entity2id: <gid>_<modelname>_<updated>.entity2id.txt
             relation2id: <gid>_<modelname>_<updated>.relation2id.txt
+        每个字段使用连接池中的连接并发下载，按块写入临时文件，一个模型的三个文件都下载完成后再原子重命名
+        每次查询都限定 updated，下载期间模型被重新上传时查询不到该版本，下载失败而不会混入新版本的内容；
+        下载的长度与 char_length 不一致时同样失败，临时文件被删除，下次检查更新时重新下载
         :param to_download_embed:
         :return: None
         """
-        for (gid, modelname, updated) in to_download_embed:
-            response = mysql_utils.query('select params, entity2id, relation2id from gspacemodelparam where gid=%s and modelname=%s',
-                                         [gid, modelname])[0]
-            paramters_path = '%s/%s' % (self.models_dir, self._make_param_file_name(gid, modelname, updated))
-            entity2id_path = '%s/%s' % (self.models_dir, self._make_entity2id_file_name(gid, modelname, updated))
-            relation2id_path = '%s/%s' % (self.models_dir, self._make_relation2id_file_name(gid, modelname, updated))
-            if response['params'] != None and response['entity2id'] != None and response['relation2id'] != None:
-                with open(paramters_path, 'w') as f:
-                    f.write(response['params'])
-                with open(entity2id_path, 'w') as f:
-                    f.write(response['entity2id'])
-                with open(relation2id_path, 'w') as f:
-                    f.write(response['relation2id'])
+        if len(to_download_embed) == 0:
+            return
+        download_config = config_loader.get_config().get('download', {})
+        chunk_size = download_config.get('chunk_size', 16 * 1024 * 1024)
+        tasks = []
+        with futures.ThreadPoolExecutor(max_workers=download_config.get('workers', 4)) as executor:
+            for (gid, modelname, updated) in to_download_embed:
+                lengths = mysql_utils.query('select char_length(params) as params, char_length(entity2id) as entity2id, '
+                                            'char_length(relation2id) as relation2id '
+                                            'from gspacemodelparam where gid=%s and modelname=%s' + UPDATED_FILTER,
+                                            [gid, modelname] + self._updated_range(updated))
+                if len(lengths) == 0:
+                    # 已经上传了新版本
+                    continue
+                lengths = lengths[0]
+                if lengths['params'] == None or lengths['entity2id'] == None or lengths['relation2id'] == None:
+                    continue
+                files = [
+                    ('params', self._make_param_file_name(gid, modelname, updated)),
+                    ('entity2id', self._make_entity2id_file_name(gid, modelname, updated)),
+                    ('relation2id', self._make_relation2id_file_name(gid, modelname, updated)),
+                ]
+                downloads = [(column, file_name, executor.submit(self._download_column, gid, modelname, updated, column,
+                                                                 lengths[column], file_name, chunk_size))
+                             for (column, file_name) in files]
+                tasks.append(((gid, modelname, updated), downloads))
+
+        for (info, downloads) in tasks:
+            try:
+                for (_, _, download) in downloads:
+                    download.result()
+            except Exception as e:
+                print('[%s] download failed gid=%s modelName=%s updated=%s' % ((time.time(),) + info), e)
+                for (_, file_name, _) in downloads:
+                    if os.path.exists(self._make_tmp_path(file_name)):
+                        os.remove(self._make_tmp_path(file_name))
+                continue
+            # 参数文件最后重命名
+            for (_, file_name, _) in reversed(downloads):
+                os.replace(self._make_tmp_path(file_name), '%s/%s' % (self.models_dir, file_name))
+
+    def _download_column(self, gid: str, modelname: str, updated: str, column: str, length: int, file_name: str,
+                         chunk_size: int) -> None:
+        """
+        用一次无缓冲（SSCursor）查询读取一个字段，按块写入临时文件，zlib / gzip 压缩的内容按块解压
+        按 substring 分块查询时每块都要在服务端重新读取整个字段，总读取量为 O(size² / chunk_size)，因此只查询一次；
+        字段在客户端仍是一整行，压缩后上传可以降低下载量与峰值内存
+        :raise RuntimeError: 下载期间模型版本发生变化，或下载的长度与 length 不一致
+        """
+        db = self._acquire_connection()
+        try:
+            with db.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute('select %s as value from gspacemodelparam where gid=%%s and modelname=%%s' % column
+                               + UPDATED_FILTER, [gid, modelname] + self._updated_range(updated))
+                row = cursor.fetchone()
+            db.commit()
+            if row is None or row['value'] is None:
+                raise RuntimeError('%s of gid=%s modelName=%s changed during download' % (column, gid, modelname))
+            value = row['value']
+            # char_length 按字符计数（BLOB 按字节）
+            if len(value) != length:
+                raise RuntimeError('%s of gid=%s modelName=%s: downloaded %d of %d characters' % (
+                    column, gid, modelname, len(value), length))
+            if isinstance(value, str):
+                value = value.encode('utf-8')
+            value = memoryview(value)
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS | 32) if self._is_compressed(value[:2]) else None
+            with open(self._make_tmp_path(file_name), 'wb') as f:
+                for offset in range(0, len(value), chunk_size):
+                    chunk = value[offset:offset + chunk_size]
+                    f.write(chunk if decompressor is None else decompressor.decompress(chunk))
+                if decompressor is not None:
+                    f.write(decompressor.flush())
+        finally:
+            self.connections.put(db)
+
+    def _updated_range(self, updated: str) -> list:
+        """
+        :param updated: 版本，updated 的秒级时间戳（见 _fetch_embed_infos）
+        :return: UPDATED_FILTER 的参数，updated 所在的一秒
+        """
+        start = datetime.datetime.fromtimestamp(int(updated))
+        return [start, start + datetime.timedelta(seconds=1)]
+
+    def _acquire_connection(self):
+        try:
+            db = self.connections.get_nowait()
+            db.ping(reconnect=True)
+            return db
+        except queue.Empty:
+            return mysql_utils.connect()
+
+    def _is_compressed(self, chunk: bytes) -> bool:
+        # gzip: 1f 8b, zlib: 78 01 / 78 5e / 78 9c / 78 da
+        return chunk[:2] == b'\x1f\x8b' or (len(chunk) >= 2 and chunk[0] == 0x78 and (chunk[0] * 256 + chunk[1]) % 31 == 0)
+
+    def _make_tmp_path(self, file_name: str) -> str:
+        return '%s/.%s.part' % (self.models_dir, file_name)
 
     def _get_embed_infos(self) -> set:
         """
@@ -102,6 +363,9 @@ class ModelLoader:
         result = set()
         files = os.listdir(self.models_dir)
         for file in files:
+            if file.startswith('.'):
+                # 下载中的临时文件
+                continue
             result.add(self._parse_param_file_name(file))
         return result
 
@@ -130,3 +394,6 @@ class ModelLoader:
     def _make_relation2id_file_name(self, gid: str, model_name: str, updated: int) -> str:
         return '%s_%s_%s.relation2id.txt' % (gid, model_name, updated)
 
+    def _make_vocab_file_name(self, gid: str, model_name: str, updated: int) -> str:
+        return '%s_%s_%s.vocab' % (gid, model_name, updated)
+
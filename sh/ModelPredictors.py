@@ -1,59 +1,122 @@
 import numpy as np
-import torch
 import json
+import os
 
-from openke.module.model import Model, TransE, TransH, TransD, TransR
+from openke.data import load_param_file, is_param_file
+from sh.AnnIndex import IvfIndex
+from sh.KnownTriples import KnownTriples
+from sh.Metrics import registry
+from sh.NumpyScorers import QuantizedArray
+from sh.RequestTrace import stage
+from sh.ResultCache import ResultCache
+from sh.TypeConstraints import TypeConstraints
+from sh.Vocabulary import Vocabulary, load_vocabularies
+
+STAGE_SECONDS = registry.histogram('embedding_predict_stage_seconds',
+                                   'Time spent in each stage of head / tail predictions: lookup (names to ids), known '
+                                   '(known triples), score, topk, ann (index search and re-ranking), response (ids to names)',
+                                   ('stage',))
+
+
+def scorer_constructor(model_name: str, backend: str = 'torch'):
+    """
+    :param backend: torch (sh.ModelScorers) or numpy (sh.NumpyScorers), the module is imported on first use,
+        so a process serving with the numpy backend never imports torch
+    """
+    if backend == 'torch':
+        from sh.ModelScorers import scorer_constructor as constructor
+    elif backend == 'numpy':
+        from sh.NumpyScorers import scorer_constructor as constructor
+    else:
+        raise ValueError('unknown scoring backend: %s' % backend)
+    return constructor(model_name)
 
 
 class ModelPredictor:
+    # max number of scores (queries x entities) held at once by the similar entity scan
+    similar_block_elements = 1 << 24
+    similar_metrics = ['cosine', 'dot', 'l2']
 
-    def __init__(self, model_name: str, paramters_path: str, entity2id_path: str, relation2id_path, use_gpu: bool = True):
+    def __init__(self, model_name: str, paramters_path: str, entity2id_path: str, relation2id_path, use_gpu: bool = True,
+                 ann_config: dict = None, version: str = None, quantization: str = 'float32', vocab_path: str = None,
+                 projection_cache_bytes: int = 256 * 1024 * 1024, backend: str = 'torch', p_norm: int = 1):
+        """
+        :param ann_config: optional nearest-neighbour index for head / tail predictions, e.g.
+            {"enabled": true, "min_ent_tot": 100000, "n_lists": 0, "nprobe": 8, "pq_m": 0, "rerank_size": 0,
+             "similar_metrics": ["cosine"]}
+            exact scan over all entities is used when it is disabled or the model does not support it,
+            similar_metrics lists the metrics of similar_entities served from an index as well
+        :param version: version of the parameters, the updated timestamp of the model
+        :param quantization: storage of the scanned entity matrix and of the served entity embeddings, float32,
+            float16 or int8, lower precision uses less memory, may change the order of near ties and
+            the entity embedding RPCs return the quantized values
+        :param vocab_path: optional compact vocabulary file (see sh.Vocabulary), used instead of parsing the text files
+        :param projection_cache_bytes: max size of the LRU of entity matrices projected per relation (TransH / TransD)
+            and of candidate matrices of type constrained predictions, counted in nbytes, 0 disables it
+        :param backend: torch, or numpy to score on the stored arrays without importing torch (cpu only)
+        :param p_norm: norm of the distances when the parameter file does not record the one the model was trained
+            with (model.p_norm, written by TrainJob); with 2 a scan over all entities is one matrix product per block
+            of entities against their cached squared norms
+        """
         self.use_gpu = use_gpu
+        self.version = version
         self.entity2id_map, self.id2entity_map, self.relation2id_map, self.id2relation_map \
-            = self._get_ent_rel_map(entity2id_path, relation2id_path)
+            = self._get_ent_rel_map(entity2id_path, relation2id_path, vocab_path)
         self.ent_tot = len(self.entity2id_map)
         self.rel_tot = len(self.relation2id_map)
-        self.ent_embeddings, self.rel_embeddings = self._get_ent_rel_embedding(paramters_path)
+        params = self._load_parameters(paramters_path)
+        if 'model.p_norm' in params:
+            p_norm = int(params['model.p_norm'][0])
+        self.p_norm = p_norm
+        # no float32 copy of the entity table is kept when it is quantized
+        self.ent_embeddings = params['ent_embeddings.weight']
+        if quantization != 'float32':
+            self.ent_embeddings = QuantizedArray(self.ent_embeddings, quantization)
+        self.rel_embeddings = params['rel_embeddings.weight']
 
-        constructor = self._get_model_constructor(model_name)
-        self.model = constructor(
-            ent_tot=self.ent_tot,
-            rel_tot=self.rel_tot,
-            p_norm=1,
-            norm_flag=True)
-        if use_gpu:
-            self.model.cuda()
-        self.model.load_parameters(paramters_path)
+        # other arrays of the parameter file (e.g. known.*) are not model weights
+        weights = dict((name, params[name]) for name in params if name.endswith('.weight'))
+        self.scorer = scorer_constructor(model_name, backend).from_arrays(weights, use_gpu, p_norm=p_norm, norm_flag=True,
+                                                                          quantization=quantization)
+        self.ann_config = ann_config or {}
+        self.ann_index = self._build_ann_index(self.ann_config)
+        self.ent_norms = self._row_norms(self.ent_embeddings)
+        self.similar_indexes = self._build_similar_indexes(self.ann_config)
+        self.vocab_nbytes = self._get_vocab_nbytes()
+        self.known = KnownTriples.from_params(params, self.rel_tot)
+        self.constraints = TypeConstraints.from_params(params)
+        # triple classification threshold of every relation, tuned on the validation triples by TrainJob
+        self.thresholds = params.get('classify.thresholds')
+        # ('projection', relation id) -> projected entity matrix,
+        # ('candidates', mode, relation id) -> (candidate ids, candidate matrix)
+        self.projection_cache = ResultCache(projection_cache_bytes, 0, self._entry_nbytes) if projection_cache_bytes > 0 else None
+        self.scorer.projections = self.projection_cache
 
-    def predict_head_entity(self, t: str, r: str, k: int) -> list:
+    def predict_head_entity(self, t: str, r: str, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
         """
         This method predicts the top k head entities given tail entity and relation.
         :param t: tail entity name
         :param r: relation type
         :param k: top k head entities
+        :param exclude_known: skip heads of triples known from the training data
+        :param type_constrain: only rank the heads observed with the relation in the training data
         :return: k possible entity names
         """
-        t = self.entity2id_map[t]
-        r = self.relation2id_map[r]
-        res = self._predict_head_entity(t, r, k)
-        for idx in range(len(res)):
-            res[idx] = self.id2entity_map[res[idx]]
-        return res
+        return self.predict_head_entity_batch([t], [r], k, exclude_known, type_constrain)[0]
 
-    def predict_tail_entity(self, h: str, r: str, k: int) -> list:
+    def predict_tail_entity(self, h: str, r: str, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
         """
         This method predicts the top k tail entities given head entity and relation.
         :param h: head entity name
         :param r: relation type
         :param k: top k tail entities
+        :param exclude_known: skip tails of triples known from the training data
+        :param type_constrain: only rank the tails observed with the relation in the training data
         :return: k possible entity names
         """
-        h = self.entity2id_map[h]
-        r = self.relation2id_map[r]
-        res = self._predict_tail_entity(h, r, k)
-        for idx in range(len(res)):
-            res[idx] = self.id2entity_map[res[idx]]
-        return res
+        return self.predict_tail_entity_batch([h], [r], k, exclude_known, type_constrain)[0]
 
     def predict_relation(self, h: str, t: str, k: int) -> list:
         """
@@ -65,10 +128,8 @@ class ModelPredictor:
         """
         h = self.entity2id_map[h]
         t = self.entity2id_map[t]
-        res = self._predict_relation(h, t, k)
-        for idx in range(len(res)):
-            res[idx] = self.id2relation_map[res[idx]]
-        return res
+        res = self._predict_relation([h], [t], k)[0]
+        return [self.id2relation_map[idx] for idx in res]
 
     def predict_triple(self, h: str, t: str, r: str, thresh: float) -> bool:
         """
@@ -77,146 +138,516 @@ class ModelPredictor:
         :param t: tail entity name
         :param r: relation type
         :param thresh: threshold for the triple
-        :return:
+        :return: True when the score of the triple is at most the threshold, like classify_triple_batch
         """
-        h = self.entity2id_map[h]
-        t = self.entity2id_map[t]
-        r = self.relation2id_map[r]
-        return self._predict_triple(h, t, r, thresh)
+        return self.predict_triple_batch([h], [t], [r], thresh)[0]
+
+    def predict_head_entity_batch(self, ts: list, rs: list, k: int, exclude_known: bool = False,
+                                  type_constrain: bool = False) -> list:
+        """
+        This method predicts the top k head entities of every (tail entity, relation) query in one pass.
+        :param ts: tail entity names
+        :param rs: relation types, aligned with ts
+        :param k: top k head entities
+        :param exclude_known: skip heads of triples known from the training data
+        :param type_constrain: only rank the heads observed with the relation in the training data
+        :return: k possible entity names for every query
+        """
+        self._check_aligned(ts, rs)
+        with stage('lookup', STAGE_SECONDS):
+            ts = [self.entity2id_map[t] for t in ts]
+            rs = [self.relation2id_map[r] for r in rs]
+        res = self._predict_head_entity(ts, rs, k, exclude_known, type_constrain)
+        with stage('response', STAGE_SECONDS):
+            return [[self.id2entity_map[idx] for idx in row] for row in res]
 
-    def get_ent_embedding(self, ent: str):
-        return self.ent_embeddings[self.entity2id_map[ent]]
+    def predict_tail_entity_batch(self, hs: list, rs: list, k: int, exclude_known: bool = False,
+                                  type_constrain: bool = False) -> list:
+        """
+        This method predicts the top k tail entities of every (head entity, relation) query in one pass.
+        :param hs: head entity names
+        :param rs: relation types, aligned with hs
+        :param k: top k tail entities
+        :param exclude_known: skip tails of triples known from the training data
+        :param type_constrain: only rank the tails observed with the relation in the training data
+        :return: k possible entity names for every query
+        """
+        self._check_aligned(hs, rs)
+        with stage('lookup', STAGE_SECONDS):
+            hs = [self.entity2id_map[h] for h in hs]
+            rs = [self.relation2id_map[r] for r in rs]
+        res = self._predict_tail_entity(hs, rs, k, exclude_known, type_constrain)
+        with stage('response', STAGE_SECONDS):
+            return [[self.id2entity_map[idx] for idx in row] for row in res]
 
-    def get_rel_embedding(self, rel: str):
-        return self.rel_embeddings[self.relation2id_map[rel]]
+    def predict_triple_batch(self, hs: list, ts: list, rs: list, thresh: float) -> list:
+        """
+        This method tells you whether each of the given triples (h, t, r) is correct or wrong
+        :param hs: head entity names
+        :param ts: tail entity names
+        :param rs: relation types
+        :param thresh: threshold for the triples
+        :return: one bool for every triple, True when its score is at most the threshold, like classify_triple_batch
+        """
+        self._check_aligned(hs, ts, rs)
+        hs = [self.entity2id_map[h] for h in hs]
+        ts = [self.entity2id_map[t] for t in ts]
+        rs = [self.relation2id_map[r] for r in rs]
+        return self._predict_triple(hs, ts, rs, thresh)
 
-    def _predict_head_entity(self, t: int, r: int, k: int) -> list:
+    def classify_triple_batch(self, hs: list, ts: list, rs: list, thresh: float = None) -> tuple:
         """
-        This method predicts the top k head entities given tail entity and relation.
-        :param t: tail entity id
-        :param r: relation id
+        This method classifies every given triple (h, t, r) as correct or wrong in one pass.
+        :param hs: head entity names
+        :param ts: tail entity names
+        :param rs: relation types
+        :param thresh: threshold for all triples, None to use the threshold stored for the relation of every triple
+        :return: (one bool for every triple, their scores, the thresholds used), a triple is correct when its score
+            is at most the threshold
+        """
+        self._check_aligned(hs, ts, rs)
+        if thresh is None and self.thresholds is None:
+            raise ValueError('the model carries no relation thresholds, pass a threshold')
+        hs = self._to_ids([self.entity2id_map[h] for h in hs])
+        ts = self._to_ids([self.entity2id_map[t] for t in ts])
+        rs = [self.relation2id_map[r] for r in rs]
+        scores = self._to_numpy(self.scorer.score_triple(hs, ts, self._to_ids(rs)))
+        if thresh is None:
+            thresh = self.thresholds[np.asarray(rs, dtype=np.int64)]
+        else:
+            thresh = np.full(len(rs), thresh, dtype=np.float32)
+        return (scores <= thresh).tolist(), scores.tolist(), thresh.tolist()
+
+    def similar_entities(self, ents: list, k: int, metric: str = 'cosine') -> list:
+        """
+        This method finds the k entities closest to every given entity in the embedding space, the entity itself excluded.
+        :param ents: entity names
+        :param k: top k entities
+        :param metric: cosine, dot (inner product) or l2
+        :return: (k entity names, k scores) for every entity, scores are similarities for cosine and dot,
+            distances for l2, best first
+        """
+        if metric not in self.similar_metrics:
+            raise ValueError('unknown metric: %s, expected one of %s' % (metric, self.similar_metrics))
+        with stage('lookup', STAGE_SECONDS):
+            ids = np.array([self.entity2id_map[ent] for ent in ents], dtype=np.int64)
+        res = self._similar_entities(ids, k, metric)
+        with stage('response', STAGE_SECONDS):
+            return [([self.id2entity_map[idx] for idx in row], self._similarity(dist, metric).tolist()) for row, dist in res]
+
+    def get_ent_embedding(self, ent: str) -> list:
+        return self.ent_embeddings[self.entity2id_map[ent]].tolist()
+
+    def get_ent_embedding_batch(self, ents: list) -> list:
+        return self.ent_embeddings[[self.entity2id_map[ent] for ent in ents]].tolist()
+
+    def get_rel_embedding(self, rel: str) -> list:
+        return self.rel_embeddings[self.relation2id_map[rel]].tolist()
+
+    def get_ent_embedding_array(self, ents: list) -> np.ndarray:
+        """
+        :return: float32 embeddings of the entities, shape (len(ents), dim)
+        """
+        return self.ent_embeddings[[self.entity2id_map[ent] for ent in ents]]
+
+    def get_rel_embedding_array(self, rels: list) -> np.ndarray:
+        """
+        :return: float32 embeddings of the relations, shape (len(rels), dim)
+        """
+        return self.rel_embeddings[[self.relation2id_map[rel] for rel in rels]]
+
+    def get_embedding_table(self, kind: str) -> tuple:
+        """
+        :param kind: entity or relation
+        :return: all embeddings indexed by id (the memory-mapped parameters, not a copy, or a QuantizedArray
+                 read as float32 slices), id -> name lookup
+        """
+        if kind == 'entity':
+            return self.ent_embeddings, self.id2entity_map
+        if kind == 'relation':
+            return self.rel_embeddings, self.id2relation_map
+        raise ValueError('unknown embedding kind: %s' % kind)
+
+    def nbytes(self) -> int:
+        """
+        Estimated memory held by the model: embedding tables, scorer matrices, index and vocabularies.
+        Arrays sharing the same buffer are counted once.
+        """
+        buffers = {self.ent_norms.__array_interface__['data'][0]: self.ent_norms.nbytes}
+        buffers.update(self.scorer.buffers())
+        tables = [self.rel_embeddings]
+        if isinstance(self.ent_embeddings, QuantizedArray):
+            tables.extend(self.ent_embeddings.arrays())
+        else:
+            tables.append(self.ent_embeddings)
+        for a in tables:
+            buffers[a.__array_interface__['data'][0]] = a.nbytes
+        size = sum(buffers.values()) + self.vocab_nbytes
+        if self.ann_index is not None:
+            size += self.ann_index.nbytes()
+        if self.known is not None:
+            size += self.known.nbytes()
+        if self.constraints is not None:
+            size += self.constraints.nbytes()
+        if self.thresholds is not None:
+            size += self.thresholds.nbytes
+        if self.projection_cache is not None:
+            size += self.projection_cache.nbytes
+        for index in self.similar_indexes.values():
+            size += index.nbytes()
+        return size
+
+    def max_nbytes(self) -> int:
+        """
+        nbytes once the projection cache is full, what a memory budget has to reserve for the model.
+        The cache cannot outgrow one projected matrix per relation plus the candidates of both modes.
+        """
+        if self.projection_cache is None:
+            return self.nbytes()
+        row_nbytes = self.rel_embeddings.shape[-1] * 4 + 8
+        limit = min(self.projection_cache.max_bytes, 3 * self.rel_tot * self.ent_tot * row_nbytes)
+        return self.nbytes() - self.projection_cache.nbytes + max(limit, self.projection_cache.nbytes)
+
+    def _predict_head_entity(self, t: list, r: list, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
+        """
+        This method predicts the top k head entities given tail entities and relations.
+        :param t: tail entity ids
+        :param r: relation ids
         :param k: top k head entities
-        :return: k possible entity ids
+        :param exclude_known: skip heads of triples known from the training data
+        :param type_constrain: only rank the heads observed with the relation in the training data
+        :return: k possible entity ids for every query
         """
-        test_h = self._to_cuda(torch.LongTensor(range(self.ent_tot)), self.use_gpu)
-        test_t = self._to_cuda(torch.LongTensor([t] * self.ent_tot), self.use_gpu)
-        test_r = self._to_cuda(torch.LongTensor([r] * self.ent_tot), self.use_gpu)
-        res = self._predict(test_h, test_t, test_r).reshape(-1).argsort()[:k]
-        return list(res)
+        known = None
+        if exclude_known:
+            with stage('known', STAGE_SECONDS):
+                known = self._known('head', t, r)
+        if type_constrain:
+            return self._constrained_top_k('head', t, r, k, known)
+        t, r = self._to_ids(t), self._to_ids(r)
+        if self.ann_index is not None:
+            with stage('ann', STAGE_SECONDS):
+                return self._ann_top_k(self.scorer.head_query(t, r), k, known)
+        with stage('score', STAGE_SECONDS):
+            scores = self.scorer.score_head(t, r)
+            if known is not None:
+                self.scorer.mask(scores, *self.known.cells(known))
+        with stage('topk', STAGE_SECONDS):
+            return self._drop_known(self._top_k(scores, k), known)
 
-    def _predict_tail_entity(self, h: int, r: int, k: int) -> list:
+    def _predict_tail_entity(self, h: list, r: list, k: int, exclude_known: bool = False,
+                            type_constrain: bool = False) -> list:
         """
-        This method predicts the top k tail entities given head entity and relation.
-        :param h: head entity id
-        :param r: relation id
+        This method predicts the top k tail entities given head entities and relations.
+        :param h: head entity ids
+        :param r: relation ids
         :param k: top k tail entities
-        :return: k possible entity ids
+        :param exclude_known: skip tails of triples known from the training data
+        :param type_constrain: only rank the tails observed with the relation in the training data
+        :return: k possible entity ids for every query
         """
-        test_h = self._to_cuda(torch.LongTensor([h] * self.ent_tot), self.use_gpu)
-        test_t = self._to_cuda(torch.LongTensor(range(self.ent_tot)), self.use_gpu)
-        test_r = self._to_cuda(torch.LongTensor([r] * self.ent_tot), self.use_gpu)
-        res = self._predict(test_h, test_t, test_r).reshape(-1).argsort()[:k]
-        return list(res)
+        known = None
+        if exclude_known:
+            with stage('known', STAGE_SECONDS):
+                known = self._known('tail', h, r)
+        if type_constrain:
+            return self._constrained_top_k('tail', h, r, k, known)
+        h, r = self._to_ids(h), self._to_ids(r)
+        if self.ann_index is not None:
+            with stage('ann', STAGE_SECONDS):
+                return self._ann_top_k(self.scorer.tail_query(h, r), k, known)
+        with stage('score', STAGE_SECONDS):
+            scores = self.scorer.score_tail(h, r)
+            if known is not None:
+                self.scorer.mask(scores, *self.known.cells(known))
+        with stage('topk', STAGE_SECONDS):
+            return self._drop_known(self._top_k(scores, k), known)
 
-    def _predict_relation(self, h: int, t: int, k: int) -> list:
+    def _predict_relation(self, h: list, t: list, k: int) -> np.ndarray:
         """
-        This methods predict the relation id given head entity and tail entity.
-        :param h: head entity id
-        :param t: tail entity id
+        This methods predict the relation ids given head entities and tail entities.
+        :param h: head entity ids
+        :param t: tail entity ids
         :param k: top k relations
-        :return: k possible relation ids
+        :return: k possible relation ids for every query
         """
-        test_h = self._to_cuda(torch.LongTensor([h] * self.rel_tot), self.use_gpu)
-        test_t = self._to_cuda(torch.LongTensor([t] * self.rel_tot), self.use_gpu)
-        test_r = self._to_cuda(torch.LongTensor(range(self.rel_tot)), self.use_gpu)
-        res = self._predict(test_h, test_t, test_r).reshape(-1).argsort()[:k]
-        return list(res)
+        scores = self.scorer.score_relation(self._to_ids(h), self._to_ids(t))
+        return self._top_k(scores, k)
 
-    def _predict_triple(self, h: int, t: int, r: int, thresh: float) -> bool:
+    def _predict_triple(self, h: list, t: list, r: list, thresh: float) -> list:
         """
-        This method tells you whether the given triple (h, t, r) is correct of wrong
-        :param h: head entity id
-        :param t: tail entity id
-        :param r: relation id
-        :param thresh: threshold for the triple
-        :return:
+        This method tells you whether the given triples (h, t, r) are correct of wrong
+        :param h: head entity ids
+        :param t: tail entity ids
+        :param r: relation ids
+        :param thresh: threshold for the triples
+        :return: one bool for every triple, the thresholds are tuned by Tester with the same score <= thresh
+        """
+        res = self._to_numpy(self.scorer.score_triple(self._to_ids(h), self._to_ids(t), self._to_ids(r)))
+        return (res <= thresh).tolist()
+
+    def _constrained_top_k(self, mode: str, e: list, r: list, k: int, known: list = None) -> list:
         """
-        test_h = self._to_cuda(torch.LongTensor([h]), self.use_gpu)
-        test_t = self._to_cuda(torch.LongTensor([t]), self.use_gpu)
-        test_r = self._to_cuda(torch.LongTensor([r]), self.use_gpu)
-        res = self._predict(test_h, test_t, test_r)[0]
-        return res < thresh
+        Top k entities among the type constraints of the relation of every query.
+        Queries are grouped by relation, every group is scored against the gathered candidate matrix of its
+        relation instead of all entities.
+        :param mode: head or tail
+        :param e: tail entity ids for head, head entity ids for tail
+        :param r: relation ids
+        :param known: entity ids to skip for every query
+        :return: ids ordered by ascending score for every query
+        """
+        query = self.scorer.head_query if mode == 'head' else self.scorer.tail_query
+        res = [None] * len(e)
+        groups = {}
+        for i, rel in enumerate(r):
+            groups.setdefault(rel, []).append(i)
+        for rel, rows in groups.items():
+            with stage('score', STAGE_SECONDS):
+                ids, m = self._candidates(mode, rel)
+                q = query(self._to_ids([e[i] for i in rows]), self._to_ids([rel] * len(rows)))
+                scores = self.scorer.score_matrix(q, m)
+                if known is not None:
+                    self.scorer.mask(scores, *self.known.cells([self._positions(ids, known[i]) for i in rows]))
+            with stage('topk', STAGE_SECONDS):
+                for i, pos in zip(rows, self._top_k(scores, k)):
+                    res[i] = ids[pos]
+        return self._drop_known(res, known)
+
+    def _candidates(self, mode: str, r: int) -> tuple:
+        """
+        :return: candidate ids of relation r and their matrix from scorer.candidate_matrix, kept in the projection cache
+        """
+        if self.constraints is None:
+            raise ValueError('the model carries no type constraints, it needs a binary parameter file built by TrainJob')
 
-    def _to_cuda(self, t: torch.Tensor, use_gpu: bool) -> torch.Tensor:
-        if use_gpu:
-            return t.cuda()
+        def compute() -> tuple:
+            ids = np.asarray(self.constraints.candidates(mode, r))
+            return ids, self.scorer.candidate_matrix(r, self._to_ids(ids))
+        if self.projection_cache is None:
+            return compute()
+        return self.projection_cache.get_or_compute(('candidates', mode, r), compute)
+
+    @staticmethod
+    def _positions(ids: np.ndarray, known: np.ndarray) -> np.ndarray:
+        """
+        :return: positions in the sorted candidate ids of the known ids that are candidates
+        """
+        pos = np.minimum(np.searchsorted(ids, known), max(len(ids) - 1, 0))
+        return pos[ids[pos] == known] if len(ids) > 0 else pos[:0]
+
+    def _similar_entities(self, ids: np.ndarray, k: int, metric: str) -> list:
+        """
+        :param ids: entity ids
+        :return: (ids, distances) of the k closest other entities of every entity, ordered by ascending distance,
+            distance is -similarity for cosine and dot, the squared distance for l2
+        """
+        k = max(0, min(k, self.ent_tot - 1))
+        if k == 0:
+            return [(ids[:0], np.zeros(0, dtype=np.float32)) for _ in ids]
+        q = np.asarray(self.ent_embeddings[ids], dtype=np.float32)
+        if metric == 'cosine':
+            q = q / np.maximum(self.ent_norms[ids], 1e-12)[:, None]
+        if metric in self.similar_indexes:
+            with stage('ann', STAGE_SECONDS):
+                return self._similar_ann(ids, q, k, metric)
+        best_ids = np.zeros((len(ids), 0), dtype=np.int64)
+        best = np.zeros((len(ids), 0), dtype=np.float32)
+        step = max(1, self.similar_block_elements // max(len(ids), 1))
+        for start in range(0, self.ent_tot, step):
+            end = min(start + step, self.ent_tot)
+            with stage('score', STAGE_SECONDS):
+                dist = self._similar_dist(q, start, end, metric)
+                rows = np.nonzero((ids >= start) & (ids < end))[0]
+                dist[rows, ids[rows] - start] = np.inf
+            with stage('topk', STAGE_SECONDS):
+                top = np.argpartition(dist, k - 1, -1)[:, :k] if k < end - start else \
+                    np.broadcast_to(np.arange(end - start), dist.shape)
+                best_ids = np.concatenate([best_ids, top + start], -1)
+                best = np.concatenate([best, np.take_along_axis(dist, top, -1)], -1)
+                if best.shape[1] > k:
+                    keep = np.argpartition(best, k - 1, -1)[:, :k]
+                    best_ids = np.take_along_axis(best_ids, keep, -1)
+                    best = np.take_along_axis(best, keep, -1)
+        order = np.lexsort((best_ids, best), axis=-1)
+        best_ids, best = np.take_along_axis(best_ids, order, -1), np.take_along_axis(best, order, -1)
+        return [(row[np.isfinite(dist)], dist[np.isfinite(dist)]) for row, dist in zip(best_ids, best)]
+
+    def _similar_dist(self, q: np.ndarray, start: int, end: int, metric: str, ids: np.ndarray = None) -> np.ndarray:
+        """
+        Distances by one matrix product with the rows start:end (or ids) and the precomputed row norms.
+        :param q: query vectors, already normalized for cosine, shape (B, d)
+        :return: distances, shape (B, end - start) or (B, len(ids))
+        """
+        if ids is None:
+            e, norms = self.ent_embeddings[start:end], self.ent_norms[start:end]
         else:
-            return t
-
-    def _predict(self, batch_h: torch.LongTensor, batch_t: torch.LongTensor, batch_r: torch.LongTensor, mode: str = None) -> np.ndarray:
-        """
-        :param batch_h: head entity ids
-        :param batch_t: tail entity ids
-        :param batch_r: relation ids
-        :param mode:
-        :return: scores
-        """
-        data = {
-            'batch_h': batch_h,
-            'batch_t': batch_t,
-            'batch_r': batch_r,
-            'mode': mode
-        }
-        return self.model.predict(data)
-
-    def _get_ent_rel_map(self, entity2id_path: str, relation2id_path: str) -> (dict, dict, dict, dict):
-        entity2id_map = {}
-        id2entity_map = {}
-        relation2id_map = {}
-        id2relation_map = {}
-        with open(entity2id_path, 'r') as f:
-            rows = f.read().split('\n')[1:]
-            for row in rows:
-                items = row.split('\t')
-                if len(items) != 2:
-                    continue
-                entity = str(items[0])
-                id = int(items[1])
-                entity2id_map[entity] = id
-                id2entity_map[id] = entity
-        with open(relation2id_path, 'r') as f:
-            rows = f.read().split('\n')[1:]
-            for row in rows:
-                items = row.split('\t')
-                if len(items) != 2:
-                    continue
-                relation = str(items[0])
-                id = int(items[1])
-                relation2id_map[relation] = id
-                id2relation_map[id] = relation
-        return entity2id_map, id2entity_map, relation2id_map, id2relation_map
-
-    def _get_model_constructor(self, model_name: str) -> Model:
-        models = {
-            'transe': TransE,
-            'transh': TransH,
-            'transd': TransD,
-        }
-        if model_name in models:
-            return models[model_name]
+            e, norms = self.ent_embeddings[ids], self.ent_norms[ids]
+        dot = q @ np.asarray(e, dtype=np.float32).T
+        if metric == 'cosine':
+            return -dot / np.maximum(norms, 1e-12)
+        if metric == 'dot':
+            return -dot
+        return np.maximum(np.sum(q * q, -1)[:, None] + norms * norms - 2 * dot, 0)
+
+    def _similar_ann(self, ids: np.ndarray, q: np.ndarray, k: int, metric: str) -> list:
+        def exact(i: int, cands: np.ndarray) -> np.ndarray:
+            dist = self._similar_dist(q[i:i + 1], 0, 0, metric, cands)[0]
+            dist[cands == ids[i]] = np.inf
+            return dist
+        res = self.similar_indexes[metric].search(q, k + 1, exact, self.ann_config.get('nprobe', 8),
+                                                  self.ann_config.get('rerank_size', 0))
+        res = [row[row != idx][:k] for row, idx in zip(res, ids)]
+        return [(row, exact(i, row)) for i, row in enumerate(res)]
+
+    @staticmethod
+    def _similarity(dist: np.ndarray, metric: str) -> np.ndarray:
+        return np.sqrt(dist) if metric == 'l2' else -dist
+
+    @staticmethod
+    def _row_norms(a: np.ndarray, block: int = 65536) -> np.ndarray:
+        """
+        :return: L2 norm of every row, float32, computed block by block so a memory-mapped (or quantized)
+                 table is not copied
+        """
+        norms = np.empty(a.shape[0], dtype=np.float32)
+        for i in range(0, a.shape[0], block):
+            rows = np.asarray(a[i:i + block], dtype=np.float32)
+            norms[i:i + block] = np.sqrt(np.einsum('ij,ij->i', rows, rows))
+        return norms
+
+    def _build_similar_indexes(self, ann_config: dict) -> dict:
+        """
+        :return: metric -> IvfIndex, cosine is indexed on the normalized vectors, dot cannot be indexed
+        """
+        if not ann_config.get('enabled', False) or self.ent_tot < ann_config.get('min_ent_tot', 0):
+            return {}
+        indexes = {}
+        for metric in ann_config.get('similar_metrics', []):
+            if metric == 'l2':
+                vectors = np.asarray(self.ent_embeddings[:], dtype=np.float32)
+            elif metric == 'cosine':
+                vectors = self.ent_embeddings[:] / np.maximum(self.ent_norms, 1e-12)[:, None]
+            else:
+                continue
+            indexes[metric] = IvfIndex(vectors, ann_config.get('n_lists', 0), ann_config.get('pq_m', 0))
+        return indexes
+
+    def _known(self, mode: str, e: list, r: list) -> list:
+        if self.known is None:
+            raise ValueError('the model carries no known triples, it needs a binary parameter file built by TrainJob')
+        return self.known.lookup(mode, e, r)
+
+    def _drop_known(self, res, known: list):
+        """
+        Masked entities only reach the top k when k exceeds the number of unknown entities, they are removed here.
+        """
+        if known is None:
+            return res
+        return [row[~np.isin(row, ids)] if len(ids) > 0 else row for row, ids in zip(res, known)]
+
+    def _check_aligned(self, *queries) -> None:
+        if len(set(len(q) for q in queries)) > 1:
+            raise ValueError('batch fields are not aligned: %s' % [len(q) for q in queries])
+
+    def _to_ids(self, ids: list):
+        """
+        :return: ids as the scorer takes them, a LongTensor for torch, an int64 array for numpy
+        """
+        return self.scorer.as_ids(ids)
+
+    def _to_numpy(self, scores) -> np.ndarray:
+        return self.scorer.as_numpy(scores)
+
+    def _entry_nbytes(self, key: tuple, value) -> int:
+        """
+        :return: size of a projection cache entry, a matrix or a tuple of arrays / matrices
+        """
+        if isinstance(value, tuple):
+            return sum(self._entry_nbytes(key, item) for item in value)
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        return self.scorer.array_nbytes(value)
+
+    @staticmethod
+    def _top_k(scores, k: int) -> np.ndarray:
+        """
+        Selects the k lowest scores of every row by partial selection, then sorts only those k winners.
+        Ties are broken by id, which keeps the ordering of a full argsort.
+        :param scores: scores, shape (B, N), a tensor or a numpy array
+        :param k: number of ids to keep for every row
+        :return: ids ordered by ascending score, shape (B, min(k, N))
+        """
+        k = max(0, min(k, scores.shape[-1]))
+        if isinstance(scores, np.ndarray):
+            ids = np.argpartition(scores, k - 1, -1)[:, :k] if 0 < k < scores.shape[-1] else \
+                np.broadcast_to(np.arange(k), (scores.shape[0], k))
+            values = np.take_along_axis(scores, ids, -1)
         else:
-            raise NotImplementedError
+            values, ids = scores.topk(k, dim=-1, largest=False, sorted=False)
+            values, ids = values.cpu().numpy(), ids.cpu().numpy()
+        order = np.lexsort((ids, values), axis=-1)
+        return np.take_along_axis(ids, order, axis=-1)
 
-    def _get_ent_rel_embedding(self, paramters_path: str):
+    def _build_ann_index(self, ann_config: dict) -> IvfIndex:
+        if not ann_config.get('enabled', False) or self.ent_tot < ann_config.get('min_ent_tot', 0):
+            return None
+        vectors = self.scorer.ann_vectors()
+        if vectors is None:
+            return None
+        return IvfIndex(self._to_numpy(vectors), ann_config.get('n_lists', 0), ann_config.get('pq_m', 0))
+
+    def _ann_top_k(self, q, k: int, known: list = None) -> list:
+        """
+        Top k entities of every query vector from the nearest-neighbour index, re-ranked with the exact score.
+        :param q: query vectors, shape (B, d)
+        :param known: entity ids to skip for every query, the index is asked for that many more results
+        :return: ids ordered by ascending score for every query
+        """
+        k = max(0, min(k, self.ent_tot))
+        if k == 0:
+            return [[] for _ in range(q.shape[0])]
+        extra = max([len(ids) for ids in known]) if known else 0
+
+        def exact(i: int, ids: np.ndarray) -> np.ndarray:
+            return self._to_numpy(self.scorer.score_candidates(q[i], self._to_ids(ids)))
+        res = self.ann_index.search(self._to_numpy(q), min(k + extra, self.ent_tot), exact,
+                                    self.ann_config.get('nprobe', 8),
+                                    self.ann_config.get('rerank_size', 0))
+        if known is None:
+            return res
+        return [row[:k] for row in self._drop_known(res, known)]
+
+    def _get_ent_rel_map(self, entity2id_path: str, relation2id_path: str, vocab_path: str = None) -> tuple:
+        """
+        :param vocab_path: compact vocabulary file built from the two text files, memory-mapped when it exists
+        :return: name -> id and id -> name lookups of entities, then of relations
+        """
+        if vocab_path is not None and os.path.exists(vocab_path):
+            entities, relations = load_vocabularies(vocab_path, mmap=True)
+        else:
+            entities, relations = Vocabulary.from_text(entity2id_path), Vocabulary.from_text(relation2id_path)
+        return entities, entities.names, relations, relations.names
+
+    def _get_vocab_nbytes(self) -> int:
+        return self.entity2id_map.nbytes() + self.relation2id_map.nbytes()
+
+    def _load_parameters(self, paramters_path: str) -> dict:
+        """
+        Binary parameter files are memory-mapped copy-on-write, JSON files are still readable.
+        :return: {name: float32 numpy array}
+        """
+        if is_param_file(paramters_path):
+            return load_param_file(paramters_path, mmap=True)
         with open(paramters_path, 'r') as f:
             params = json.load(f)
-        ent_embedding = params['ent_embeddings.weight']
-        rel_embedding = params['rel_embeddings.weight']
-        return ent_embedding, rel_embedding
+        for name in params:
+            params[name] = np.array(params[name], dtype=np.float32)
+        return params
 
-if __name__ == '__main__':
-    import os
 
+if __name__ == '__main__':
     curr_dir = os.path.split(os.path.abspath(__file__))[0]
     predictor = ModelPredictor('transe',
                                '%s/../checkpoint/gspace/1/transe.param' % curr_dir,
@@ -226,4 +657,5 @@ if __name__ == '__main__':
     res = predictor.predict_head_entity(440, 13, 10)
     # res = predictor.predict_tail_entity(439, 13, 10)
     # res = predictor.predict_triple(439, 440, 13, 10)
-    print(res)
\ No newline at end of file
+    print(res)
+
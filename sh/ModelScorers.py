@@ -0,0 +1,136 @@
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from openke.module.Distance import pairwise_distance, squared_norms
+from sh.BaseScorers import BaseScorer, BaseTransdScorer, BaseTranseScorer, BaseTranshScorer, QuantizedMatrix
+
+
+class QuantizedTensor(QuantizedMatrix):
+    """
+    torch QuantizedMatrix.
+    """
+
+    def __init__(self, t: torch.Tensor, dtype: str):
+        """
+        :param t: float32 matrix, shape (N, d)
+        :param dtype: float16 or int8
+        """
+        if dtype == 'float16':
+            super(QuantizedTensor, self).__init__(t.shape, t.half().contiguous(), None)
+        elif dtype == 'int8':
+            scale = t.abs().amax(-1, keepdim=True) / 127
+            scale[scale == 0] = 1
+            super(QuantizedTensor, self).__init__(t.shape, torch.round(t / scale).to(torch.int8).contiguous(),
+                                                  scale.contiguous())
+        else:
+            raise ValueError('unknown quantization %s' % dtype)
+
+    def _to_float(self, a: torch.Tensor) -> torch.Tensor:
+        return a.float()
+
+
+class BaseModelScorer(BaseScorer):
+    """
+    torch operations of the scorers, on cpu or on the gpu holding the parameters.
+    """
+
+    array_type = torch.Tensor
+    quantized_type = QuantizedTensor
+
+    def __init__(self, params: dict, p_norm: int = 1, norm_flag: bool = True, quantization: str = 'float32'):
+        self.device = params['ent_embeddings.weight'].device
+        super(BaseModelScorer, self).__init__(params, p_norm, norm_flag, quantization)
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, use_gpu: bool = False, **kwargs) -> 'BaseModelScorer':
+        """
+        :param arrays: {name: float32 numpy array} model weights, shared with the tensors on cpu
+        :param kwargs: p_norm, norm_flag, quantization
+        """
+        tensors = {}
+        for name, array in arrays.items():
+            tensors[name] = torch.from_numpy(array).cuda() if use_gpu else torch.from_numpy(array)
+        return cls(tensors, **kwargs)
+
+    def as_ids(self, ids) -> torch.LongTensor:
+        return torch.LongTensor(ids).to(self.device)
+
+    def as_numpy(self, t: torch.Tensor) -> np.ndarray:
+        return t.cpu().data.numpy()
+
+    def mask(self, scores: torch.Tensor, rows: np.ndarray, cols: np.ndarray) -> None:
+        if len(rows) > 0:
+            scores[torch.from_numpy(rows).to(scores.device), torch.from_numpy(cols).to(scores.device)] = float('inf')
+
+    @staticmethod
+    def array_nbytes(t: torch.Tensor) -> int:
+        return t.element_size() * t.nelement()
+
+    @staticmethod
+    def array_address(t: torch.Tensor) -> int:
+        return t.data_ptr()
+
+    def _contiguous(self, t: torch.Tensor) -> torch.Tensor:
+        return t.contiguous()
+
+    def _l2_normalize(self, e: torch.Tensor) -> torch.Tensor:
+        return F.normalize(e, 2, -1)
+
+    def _norm(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.norm(x, self.p_norm, -1)
+
+    def _row_sums(self, x: torch.Tensor) -> torch.Tensor:
+        return torch.sum(x, -1, True)
+
+    def _empty(self, q: torch.Tensor, cols: int) -> torch.Tensor:
+        return q.new_empty((q.shape[0], cols))
+
+    def _unique(self, ids: torch.LongTensor) -> list:
+        return ids.unique().tolist()
+
+    def _nonzero(self, mask: torch.Tensor) -> torch.LongTensor:
+        return mask.nonzero().reshape(-1)
+
+    def _resize(self, e: torch.Tensor, size: int) -> torch.Tensor:
+        osize = e.shape[-1]
+        if osize == size:
+            return e
+        if osize > size:
+            return torch.narrow(e, -1, 0, size)
+        return F.pad(e, [0, size - osize], mode='constant', value=0)
+
+    def _concat(self, tensors: list) -> torch.Tensor:
+        return torch.cat(tensors)
+
+    def _squared_norms(self, m: torch.Tensor) -> torch.Tensor:
+        return squared_norms(m)
+
+    def _pairwise_distance(self, q: torch.Tensor, m: torch.Tensor, m_sq_norms: torch.Tensor = None) -> torch.Tensor:
+        return pairwise_distance(q, m, self.p_norm, m_sq_norms, self.block_size)
+
+
+class TranseScorer(BaseModelScorer, BaseTranseScorer):
+    pass
+
+
+class TranshScorer(BaseModelScorer, BaseTranshScorer):
+    pass
+
+
+class TransdScorer(BaseModelScorer, BaseTransdScorer):
+    pass
+
+
+model_scorers = {
+    'transe': TranseScorer,
+    'transh': TranshScorer,
+    'transd': TransdScorer,
+}
+
+
+def scorer_constructor(model_name: str) -> BaseModelScorer:
+    if model_name in model_scorers:
+        return model_scorers[model_name]
+    else:
+        raise NotImplementedError
@@ -0,0 +1,203 @@
+import numpy as np
+
+from sh.BaseScorers import BaseScorer, BaseTransdScorer, BaseTranseScorer, BaseTranshScorer, QuantizedMatrix
+
+
+class QuantizedArray(QuantizedMatrix):
+    """
+    NumPy QuantizedMatrix.
+    """
+
+    def __init__(self, a: np.ndarray, dtype: str):
+        """
+        :param a: float32 matrix, shape (N, d)
+        :param dtype: float16 or int8
+        """
+        if dtype == 'float16':
+            super(QuantizedArray, self).__init__(a.shape, np.ascontiguousarray(a, dtype=np.float16), None)
+        elif dtype == 'int8':
+            scale = np.abs(a).max(-1, keepdims=True) / 127
+            scale[scale == 0] = 1
+            super(QuantizedArray, self).__init__(a.shape, np.ascontiguousarray(np.round(a / scale), dtype=np.int8),
+                                                 np.ascontiguousarray(scale, dtype=np.float32))
+        else:
+            raise ValueError('unknown quantization %s' % dtype)
+
+    def _to_float(self, a: np.ndarray) -> np.ndarray:
+        return a.astype(np.float32)
+
+
+class NumpyModelScorer(BaseScorer):
+    """
+    NumPy operations of the scorers, running directly on the arrays of the parameter file (memory-mapped where
+    possible). Ids are int64 arrays, scores are float32 arrays.
+    A serving process using it never imports torch, so it starts faster and holds less memory.
+    """
+
+    array_type = np.ndarray
+    quantized_type = QuantizedArray
+
+    @classmethod
+    def from_arrays(cls, arrays: dict, use_gpu: bool = False, **kwargs) -> 'NumpyModelScorer':
+        if use_gpu:
+            raise ValueError('the numpy scoring backend runs on cpu only')
+        return cls(arrays, **kwargs)
+
+    def as_ids(self, ids) -> np.ndarray:
+        return np.asarray(ids, dtype=np.int64)
+
+    def as_numpy(self, a: np.ndarray) -> np.ndarray:
+        return a
+
+    def mask(self, scores: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> None:
+        scores[rows, cols] = np.inf
+
+    @staticmethod
+    def array_nbytes(a: np.ndarray) -> int:
+        return a.nbytes
+
+    @staticmethod
+    def array_address(a: np.ndarray) -> int:
+        return a.__array_interface__['data'][0]
+
+    def _contiguous(self, a: np.ndarray) -> np.ndarray:
+        return np.ascontiguousarray(a, dtype=np.float32)
+
+    def _l2_normalize(self, e: np.ndarray) -> np.ndarray:
+        return _l2_normalize(e)
+
+    def _norm(self, x: np.ndarray) -> np.ndarray:
+        return _p_norm(x, self.p_norm)
+
+    def _row_sums(self, x: np.ndarray) -> np.ndarray:
+        return np.sum(x, -1, keepdims=True, dtype=np.float32)
+
+    def _empty(self, q: np.ndarray, cols: int) -> np.ndarray:
+        return np.empty((q.shape[0], cols), dtype=np.float32)
+
+    def _unique(self, ids: np.ndarray) -> list:
+        return np.unique(ids).tolist()
+
+    def _nonzero(self, mask: np.ndarray) -> np.ndarray:
+        return np.nonzero(mask)[0]
+
+    def _resize(self, e: np.ndarray, size: int) -> np.ndarray:
+        osize = e.shape[-1]
+        if osize == size:
+            return e
+        if osize > size:
+            return e[:, :size]
+        return np.pad(e, [(0, 0), (0, size - osize)], mode='constant')
+
+    def _concat(self, arrays: list) -> np.ndarray:
+        return np.concatenate(arrays)
+
+    def _squared_norms(self, m: np.ndarray) -> np.ndarray:
+        return squared_norms(m)
+
+    def _pairwise_distance(self, q: np.ndarray, m: np.ndarray, m_sq_norms: np.ndarray = None) -> np.ndarray:
+        return pairwise_distance(q, m, self.p_norm, m_sq_norms, self.block_size)
+
+
+class NumpyTranseScorer(NumpyModelScorer, BaseTranseScorer):
+    pass
+
+
+class NumpyTranshScorer(NumpyModelScorer, BaseTranshScorer):
+    pass
+
+
+class NumpyTransdScorer(NumpyModelScorer, BaseTransdScorer):
+    pass
+
+
+# tile of the p_norm = 1 distances, 32 x 4096 float32 accumulators fit in the l2 cache
+_TILE_QUERIES = 32
+_TILE_ROWS = 4096
+
+
+def squared_norms(m: np.ndarray) -> np.ndarray:
+    """
+    NumPy counterpart of openke.module.Distance.squared_norms.
+    """
+    return np.einsum('ij,ij->i', m, m)
+
+
+def pairwise_distance(q: np.ndarray, m: np.ndarray, p_norm: int = 1, m_sq_norms: np.ndarray = None,
+                      block_size: int = 1 << 21) -> np.ndarray:
+    """
+    NumPy counterpart of openke.module.Distance.pairwise_distance: p_norm = 2 is one matrix product per block
+    of rows against the squared norms, p_norm = 1 accumulates |q_k - e_k| one dimension at a time over
+    (_TILE_QUERIES, _TILE_ROWS) tiles that stay in cache, the (B, N, d) differences are never materialized.
+    :return: distance of every (query, row) pair, shape (B, N)
+    """
+    scores = np.empty((q.shape[0], m.shape[0]), dtype=np.float32)
+    dim = m.shape[-1]
+    if p_norm == 2:
+        if m_sq_norms is None:
+            m_sq_norms = squared_norms(m)
+        q_sq_norms = squared_norms(q)[:, None]
+        rows = max(1, block_size // max(1, q.shape[0]))
+        for j in range(0, m.shape[0], rows):
+            block = q @ m[j:j + rows].T
+            block *= -2
+            block += q_sq_norms
+            block += m_sq_norms[j:j + rows]
+            # rounding may take the squared distance of close vectors below 0
+            np.maximum(block, 0, out=block)
+            np.sqrt(block, out=scores[:, j:j + rows])
+        return scores
+    if q.shape[0] * m.shape[0] * dim <= _TILE_QUERIES * _TILE_ROWS:
+        return _p_norm(q[:, None] - m[None], p_norm)
+    if p_norm != 1:
+        rows = max(1, block_size // dim)
+        for i in range(q.shape[0]):
+            for j in range(0, m.shape[0], rows):
+                scores[i, j:j + rows] = _p_norm(q[i] - m[j:j + rows], p_norm)
+        return scores
+    for j in range(0, m.shape[0], _TILE_ROWS):
+        # one contiguous row per dimension
+        tile = np.ascontiguousarray(m[j:j + _TILE_ROWS].T)
+        for i in range(0, q.shape[0], _TILE_QUERIES):
+            qs = q[i:i + _TILE_QUERIES, :, None]
+            acc = np.zeros((qs.shape[0], tile.shape[1]), dtype=np.float32)
+            diff = np.empty_like(acc)
+            for k in range(dim):
+                np.subtract(qs[:, k], tile[k], out=diff)
+                np.abs(diff, out=diff)
+                acc += diff
+            scores[i:i + _TILE_QUERIES, j:j + _TILE_ROWS] = acc
+    return scores
+
+
+def _p_norm(x: np.ndarray, p_norm: int) -> np.ndarray:
+    """
+    :return: p-norm over the last axis
+    """
+    if p_norm == 1:
+        return np.abs(x).sum(-1)
+    if p_norm == 2:
+        return np.sqrt(np.einsum('...i,...i->...', x, x))
+    return np.linalg.norm(x, p_norm, -1).astype(np.float32)
+
+
+def _l2_normalize(e: np.ndarray) -> np.ndarray:
+    """
+    Same as torch.nn.functional.normalize(e, 2, -1).
+    """
+    norm = np.sqrt(np.einsum('...i,...i->...', e, e))[..., None]
+    return (e / np.maximum(norm, 1e-12)).astype(np.float32, copy=False)
+
+
+model_scorers = {
+    'transe': NumpyTranseScorer,
+    'transh': NumpyTranshScorer,
+    'transd': NumpyTransdScorer,
+}
+
+
+def scorer_constructor(model_name: str) -> NumpyModelScorer:
+    if model_name in model_scorers:
+        return model_scorers[model_name]
+    else:
+        raise NotImplementedError
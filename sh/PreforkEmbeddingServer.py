@@ -0,0 +1,159 @@
+from concurrent import futures
+import grpc
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+
+from protos import embedding_pb2_grpc as embedding_pb2_grpc
+from config.config_loader import config_loader
+from sh.EmbeddingServer import make_cache, make_interceptor, make_servicer, make_slow_log
+from sh.Metrics import start_metrics
+from sh.ModelLoader import ModelLoader
+
+
+class PreforkServer:
+    """
+    Pre-fork embedding server.
+    The master process loads every model (models.lazy is turned off) and forks the workers afterwards, so the
+    embedding tables and the scorer matrices of every model are shared copy-on-write by all workers (binary
+    parameter files are additionally memory-mapped from the page cache). Every worker runs its own grpc server on the same
+    port with SO_REUSEPORT, and the kernel spreads the connections between them.
+    The master alone checks for updates: after ModelLoader.reload() it forks a new generation of workers
+    from the reloaded models, waits until all of them accept, then stops the previous generation, so the
+    workers move to a new version together instead of one by one.
+    With metrics enabled, the master serves its metrics (reloads, loaded models) on metrics.port and the
+    worker of slot i on metrics.port + 1 + i.
+    """
+
+    def __init__(self, model_loader: ModelLoader, workers: int = 0, threads: int = 0, grace: float = 10,
+                 ready_timeout: float = 60):
+        """
+        :param workers: number of worker processes, 0 means one per cpu
+        :param threads: torch threads of every worker, 0 means cpu count / workers, unused by the numpy backend
+        :param grace: seconds an old worker keeps serving in-flight requests after it is stopped
+        :param ready_timeout: seconds to wait for a new generation to start accepting
+        """
+        if model_loader.use_gpu:
+            raise ValueError('pre-fork serving needs "gpu": false, CUDA cannot be used in forked workers')
+        if model_loader.lazy:
+            # a model loaded lazily after the fork is private to its worker, every worker would hold a copy
+            print('[%s] models.lazy is not supported by pre-fork serving, loading every model before forking' % time.time())
+            model_loader.preload()
+        self.model_loader = model_loader
+        self.workers = workers or os.cpu_count()
+        self.threads = threads or max(1, os.cpu_count() // self.workers)
+        self.grace = grace
+        self.ready_timeout = ready_timeout
+        self.context = multiprocessing.get_context('fork')
+        self.generation = 0
+        self.processes = []  # workers of the current generation
+        self.stopping = []  # workers of previous generations finishing their requests
+
+    def run(self) -> None:
+        self._start_generation()
+        try:
+            while True:
+                time.sleep(config_loader.get_config()['update_interval'])
+                self._reap()
+                if self.model_loader.check_update():
+                    print('[%s] updating model...' % time.time())
+                    self.model_loader.reload()
+                    self._start_generation()
+        except KeyboardInterrupt:
+            print('stop serve...')
+            self._stop(self.processes + self.stopping)
+
+    def _start_generation(self) -> None:
+        """
+        Forks the workers of a new generation and stops the previous one once all new workers accept.
+        If the new generation does not become ready, it is stopped and the previous one keeps serving.
+        """
+        self.generation += 1
+        ready = self.context.Queue()
+        processes = [self._fork(ready, slot) for slot in range(self.workers)]
+        try:
+            for _ in processes:
+                ready.get(timeout=self.ready_timeout)
+        except queue.Empty:
+            print('[%s] generation %d not ready after %ss, keep generation %d' % (
+                time.time(), self.generation, self.ready_timeout, self.generation - 1))
+            self._stop(processes)
+            return
+        print('[%s] generation %d ready, pids=%s' % (time.time(), self.generation, [p.pid for p in processes]))
+        old, self.processes = self.processes, processes
+        self._stop(old)
+
+    def _fork(self, ready, slot: int) -> multiprocessing.Process:
+        """
+        :param slot: index of the worker in its generation, the worker serves its metrics on metrics.port + 1 + slot
+        """
+        process = self.context.Process(target=_worker_main,
+                                       args=(self.model_loader, self.generation, slot, self.threads, self.grace, ready),
+                                       daemon=True)
+        process.start()
+        return process
+
+    def _stop(self, processes: list) -> None:
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+        self.stopping.extend(processes)
+
+    def _reap(self) -> None:
+        """
+        Joins finished old workers and replaces crashed workers of the current generation.
+        """
+        for process in [p for p in self.stopping if not p.is_alive()]:
+            process.join()
+            self.stopping.remove(process)
+        for i, process in enumerate(self.processes):
+            if not process.is_alive():
+                print('[%s] worker %d exited with %s, restarting' % (time.time(), process.pid, process.exitcode))
+                process.join()
+                self.processes[i] = self._fork(self.context.Queue(), i)
+
+
+def _worker_main(model_loader: ModelLoader, generation: int, slot: int, threads: int, grace: float, ready) -> None:
+    if model_loader.backend == 'torch':
+        # imported here, workers of the numpy backend never load torch
+        import torch
+        torch.set_num_threads(threads)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    grpc_config = config_loader.get_config()['grpc']
+    slow_log = make_slow_log()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=grpc_config.get('max_workers', 10)),
+                         interceptors=[make_interceptor(slow_log)],
+                         maximum_concurrent_rpcs=grpc_config.get('max_concurrent_rpcs') or None,
+                         options=[('grpc.so_reuseport', 1)])
+    servicer = make_servicer(model_loader, make_cache(), slow_log)
+    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(servicer, server)
+    server.add_insecure_port('[::]:%d' % grpc_config['port'])
+    server.start()
+    # the worker of the same slot in the previous generation keeps the port until it exits
+    metrics_server = start_metrics(1 + slot, reuse_port=True)
+    ready.put(os.getpid())
+    print('[%s] worker %d of generation %d serving on [::]:%d' % (time.time(), os.getpid(), generation, grpc_config['port']))
+    stopped.wait()
+    server.stop(grace).wait()
+    servicer.shutdown()
+    if metrics_server is not None:
+        metrics_server.shutdown()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    prefork_config = config_loader.get_config().get('prefork', {})
+    model_loader = ModelLoader(config_loader.get_config()['gpu'])
+    start_metrics()
+    PreforkServer(model_loader,
+                  prefork_config.get('workers', 0),
+                  prefork_config.get('threads', 0),
+                  prefork_config.get('grace', 10),
+                  prefork_config.get('ready_timeout', 60)).run()
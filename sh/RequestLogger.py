@@ -0,0 +1,53 @@
+import json
+import logging
+import threading
+import time
+
+from google.protobuf import json_format
+
+
+class RequestLogger:
+    """
+    Logs one json line per request, rate-limited by a token bucket so a burst of requests
+    cannot flood the log. Requests dropped by the limit are counted and reported with the next line.
+    """
+
+    def __init__(self, rate: float = 10, burst: int = 20, logger: logging.Logger = None):
+        """
+        :param rate: average number of lines per second, 0 disables the limit
+        :param burst: max number of lines logged at once after an idle period
+        :param logger: defaults to the 'sh.requests' logger
+        """
+        self.rate = rate
+        self.burst = burst
+        self.logger = logger or logging.getLogger('sh.requests')
+        self.tokens = burst
+        self.last = time.time()
+        self.suppressed = 0
+        self.lock = threading.Lock()
+
+    def log(self, rpc: str, request=None, **fields) -> None:
+        """
+        :param rpc: method name
+        :param request: protobuf request whose fields are logged, None to log only fields
+        :param fields: extra fields, e.g. the size of a batch request
+        """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        with self.lock:
+            if self.rate > 0:
+                now = time.time()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens < 1:
+                    self.suppressed += 1
+                    return
+                self.tokens -= 1
+            suppressed, self.suppressed = self.suppressed, 0
+        record = {'ts': time.time(), 'rpc': rpc}
+        if request is not None:
+            record.update(json_format.MessageToDict(request, preserving_proto_field_name=True))
+        record.update(fields)
+        if suppressed > 0:
+            record['suppressed'] = suppressed
+        self.logger.info(json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,123 @@
+import collections
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from google.protobuf import json_format
+
+from sh.Metrics import Histogram
+
+_current = contextvars.ContextVar('request_trace', default=None)
+
+
+class RequestTrace:
+    """
+    Time spent by one request in every stage (get_model, lookup, score, topk, response, ...).
+    Stages report to the trace of the current context, so the code being timed does not pass it around.
+    """
+
+    def __init__(self, rpc: str):
+        self.rpc = rpc
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.stages = collections.OrderedDict()  # stage -> seconds
+
+    @contextmanager
+    def activate(self):
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            self.end = time.perf_counter()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def total(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def breakdown(self) -> list:
+        """
+        :return: [(stage, milliseconds), ...] in the order the stages ran, then other (time outside any stage) and total
+        """
+        res = [(stage, seconds * 1000) for stage, seconds in self.stages.items()]
+        total = self.total()
+        res.append(('other', max(0, total - sum(self.stages.values())) * 1000))
+        res.append(('total', total * 1000))
+        return res
+
+    def format(self) -> str:
+        """
+        :return: "get_model=0.012,lookup=0.004,...,total=1.250", in milliseconds
+        """
+        return ','.join('%s=%.3f' % (stage, ms) for stage, ms in self.breakdown())
+
+
+def current() -> RequestTrace:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str, histogram: Histogram = None):
+    """
+    Times a stage for the trace of the current request, if any, and for the histogram (labelled by stage).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if histogram is not None:
+            histogram.observe(seconds, stage=name)
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, seconds)
+
+
+class SlowRequestLog:
+    """
+    Ring buffer of the slowest recent traced requests, the oldest ones are dropped first.
+    """
+
+    def __init__(self, slow_ms: float = 100, size: int = 100, max_request_bytes: int = 4096):
+        """
+        :param slow_ms: traced requests taking at least this long are kept
+        :param size: max number of kept requests
+        :param max_request_bytes: larger requests are kept as their size only
+        """
+        self.slow_ms = slow_ms
+        self.max_request_bytes = max_request_bytes
+        self.entries = collections.deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, trace: RequestTrace, request=None) -> bool:
+        """
+        :return: whether the request was slow and kept
+        """
+        if trace.total() * 1000 < self.slow_ms:
+            return False
+        entry = {'rpc': trace.rpc, 'timestamp': trace.timestamp, 'stages': trace.breakdown()}
+        if request is not None:
+            size = request.ByteSize()
+            if size <= self.max_request_bytes:
+                entry['request'] = json_format.MessageToJson(request, preserving_proto_field_name=True, indent=None)
+            else:
+                entry['request'] = '{"bytes": %d}' % size
+        with self.lock:
+            self.entries.append(entry)
+        return True
+
+    def dump(self, limit: int = 0, clear: bool = False) -> list:
+        """
+        :param limit: number of most recent entries to return, 0 returns all
+        :param clear: empty the buffer afterwards
+        :return: entries from the oldest to the newest
+        """
+        with self.lock:
+            entries = list(self.entries)
+            if clear:
+                self.entries.clear()
+        return entries[-limit:] if limit > 0 else entries
@@ -0,0 +1,111 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class ResultCache:
+    """
+    Bounded LRU / TTL cache of prediction results.
+    Keys start with (gid, model_name, version), so results of a replaced model version are never hit
+    and are dropped by retain() once the new version is loaded.
+    Concurrent misses of the same key are coalesced into one computation (single-flight).
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, ttl: float = 600, sizeof=None):
+        """
+        :param max_bytes: max estimated size of the cached results, least recently used results are evicted first
+        :param ttl: seconds a result stays valid, 0 means no expiry
+        :param sizeof: sizeof(key, value) returns the size of an entry, defaults to the size of the python objects
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda key, value: _sizeof(key) + _sizeof(value))
+        self.entries = OrderedDict()  # key -> (value, size, expire_at)
+        self.in_flight = {}  # key -> Future
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.lock = threading.Lock()
+
+    def get_or_compute(self, key: tuple, compute):
+        """
+        :param key: (gid, model_name, version, ...query)
+        :param compute: called without arguments to compute the result on a miss
+        :return: cached or computed result
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (entry[2] is None or entry[2] > time.time()):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                future = self.in_flight[key] = Future()
+                owner = True
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except Exception as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            del self.in_flight[key]
+            self._put(key, value)
+        future.set_result(value)
+        return value
+
+    def retain(self, versions: set) -> None:
+        """
+        Drops the results of every model version not in versions.
+        :param versions: {(gid, model_name, version), ...} currently loaded
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[:3] not in versions]:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'entries': len(self.entries),
+                'bytes': self.nbytes,
+            }
+
+    def _put(self, key: tuple, value) -> None:
+        size = self.sizeof(key, value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        expire_at = time.time() + self.ttl if self.ttl > 0 else None
+        self.entries[key] = (value, size, expire_at)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def _remove(self, key: tuple) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.nbytes -= size
+
+
+def _sizeof(value) -> int:
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        size += sum(_sizeof(item) for item in value)
+    return size
@@ -2,12 +2,27 @@ import os
 import numpy as np
 import shutil
 import json
+import time
 
+from openke.data import is_param_file, load_param_file, save_param_file
+from sh.KnownTriples import KnownTriples
+from sh.Metrics import registry
 from sh.ModelControllers import model_constructor
+from sh.TypeConstraints import TypeConstraints
 from Utils import mysql_utils
 from config.config_loader import config_loader
 
 curr_dir = os.path.split(os.path.abspath(__file__))[0]
+_JOB_BUCKETS = (1, 10, 30, 60, 300, 600, 1800, 3600, 7200, 14400, 43200, 86400)
+TRAIN_JOBS = registry.counter('train_jobs_total', 'Finished training jobs by model and status (ok, error, empty)',
+                              ('model_name', 'status'))
+TRAIN_JOB_SECONDS = registry.histogram('train_job_seconds', 'Duration of training jobs by model', ('model_name',), _JOB_BUCKETS)
+TRAIN_STAGE_SECONDS = registry.histogram('train_job_stage_seconds',
+                                         'Duration of the stages of training jobs: prepare, train, test, upload',
+                                         ('stage',), _JOB_BUCKETS)
+TRAIN_JOBS_RUNNING = registry.gauge('train_jobs_running', 'Training jobs running in this process')
+TRAIN_JOBS_QUEUED = registry.gauge('train_jobs_queued',
+                                   'Training jobs waiting to run, in the executor of TrainingServer or in the rabbitmq queue')
 
 
 class TrainJob:
@@ -28,6 +43,7 @@ class TrainJob:
         self.TRAIN2ID_PATH = '%s/train2id.txt' % self.BENCHMARK_DIRPATH
         self.VALID2ID_PATH = '%s/valid2id.txt' % self.BENCHMARK_DIRPATH
         self.TEST2ID_PATH = '%s/test2id.txt' % self.BENCHMARK_DIRPATH
+        self.TYPE_CONSTRAIN_PATH = '%s/type_constrain.txt' % self.BENCHMARK_DIRPATH
         self.CHECKPOINT_DIRPATH = '%s/../%s/gspace/%s' % (curr_dir, checkpoint, gspace_id)
         
         self.model_constructor = model_constructor(model_name)
@@ -57,20 +73,73 @@ class TrainJob:
         print('in train job')
         if len(self.triples) == 0:
             print('no training data')
+            TRAIN_JOBS.inc(model_name=self.model_name, status='empty')
             return
-        self._prepare_data(self.triples, self.gspace_id)
-        model = self.model_constructor(self.BENCHMARK_DIRPATH, self.CHECKPOINT_DIRPATH, self.use_gpu)
-        model.train()
-        model.test()
-        self._upload_param(model.parameters_path)
+        start_time = time.time()
+        status = 'error'
+        TRAIN_JOBS_RUNNING.inc()
+        try:
+            with TRAIN_STAGE_SECONDS.time(stage='prepare'):
+                self._prepare_data(self.triples, self.gspace_id)
+            model = self.model_constructor(self.BENCHMARK_DIRPATH, self.CHECKPOINT_DIRPATH, self.use_gpu)
+            with TRAIN_STAGE_SECONDS.time(stage='train'):
+                model.train()
+            with TRAIN_STAGE_SECONDS.time(stage='test'):
+                model.test()
+            with TRAIN_STAGE_SECONDS.time(stage='upload'):
+                self._add_serving_arrays(model.parameters_path, model.p_norm, model.relation_thresholds)
+                self._upload_param(model.parameters_path)
+            status = 'ok'
+        finally:
+            TRAIN_JOBS_RUNNING.dec()
+            TRAIN_JOBS.inc(model_name=self.model_name, status=status)
+            TRAIN_JOB_SECONDS.observe(time.time() - start_time, model_name=self.model_name)
         print('finish trian job')
         return
 
+    def _add_serving_arrays(self, param_path: str, p_norm: int, relation_thresholds: np.ndarray = None) -> None:
+        """
+        将部署端用到的数据写入参数文件：
+        训练时的距离范数（model.p_norm），部署端按模型自身的范数打分，不受之后修改 models.p_norm 的影响
+        以下以 CSR 形式写入：
+        训练集、验证集中已知的 (h, r) -> t 和 (r, t) -> h，部署端据此过滤已知三元组
+        type_constrain.txt 中每个关系的头、尾实体集合，部署端据此限定候选实体
+        以及在验证集上得到的每个关系的三元组分类阈值（classify.thresholds），没有验证集时不写入
+        只支持二进制参数文件
+        """
+        if not is_param_file(param_path):
+            print('skip p_norm, known triples, type constraints and thresholds, param_format is not binary')
+            return
+        arrays = load_param_file(param_path, mmap=False)
+        rel_tot = arrays['rel_embeddings.weight'].shape[0]
+        triples = np.concatenate([self._read_triples(self.TRAIN2ID_PATH), self._read_triples(self.VALID2ID_PATH)])
+        arrays.update(KnownTriples.build(triples, rel_tot))
+        arrays.update(TypeConstraints.build(self.TYPE_CONSTRAIN_PATH, rel_tot))
+        arrays['model.p_norm'] = np.array([p_norm], dtype=np.int32)
+        if relation_thresholds is not None:
+            arrays['classify.thresholds'] = np.asarray(relation_thresholds, dtype=np.float32)
+        save_param_file(param_path, arrays)
+        print('add p_norm = %d' % p_norm)
+        print('add known triples, num = %d' % len(triples))
+        print('add type constraints, relations = %d' % rel_tot)
+        if relation_thresholds is not None:
+            print('add relation thresholds, relations = %d' % len(relation_thresholds))
+
+    @staticmethod
+    def _read_triples(path: str) -> np.ndarray:
+        """
+        :return: (h, t, r) ids, shape (M, 3)
+        """
+        with open(path, 'r') as f:
+            tot = int(f.readline())
+            return np.array([f.readline().split() for _ in range(tot)], dtype=np.int64).reshape(-1, 3)
+
     def _upload_param(self, param_path: str) -> None:
         # TODO 使用上传文件方式，传入mysql 的param 文件不能过大
 
         print('prepare upload param...')
-        with open(param_path, 'r') as f:
+        # 二进制参数文件需要 params 列为 BLOB 类型
+        with open(param_path, 'rb' if is_param_file(param_path) else 'r') as f:
             params = f.read()
         with open(self.ENTITY2ID_PATH, 'r') as f:
             entity2id = f.read()
@@ -140,14 +209,13 @@ class TrainJob:
                 entity = entities[idx]
                 entity2idmap[entity] = idx
                 f.write('%s\t%d\n' % (entity, idx))
-        del entities
         with open(self.RELATION2ID_PATH, 'w') as f:
             f.write('%d\n' % len(rels))
             for idx in range(len(rels)):
                 rel = rels[idx]
                 rel2idmap[rel] = idx
                 f.write('%s\t%d\n' % (rel, idx))
-        del rels
+        del entities, rels
 
         for idx in range(len(triples)):
             [head, tail, rel] = triples[idx]
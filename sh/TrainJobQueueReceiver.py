@@ -2,7 +2,8 @@ import pika
 import json
 from pika.adapters.blocking_connection import BlockingChannel, BlockingConnection
 
-from sh.TrainJob import TrainJob
+from sh.Metrics import start_metrics
+from sh.TrainJob import TrainJob, TRAIN_JOBS_QUEUED
 from config.config_loader import config_loader
 
 
@@ -12,6 +13,8 @@ class TrainJobQueueReceiver:
 
     def __init__(self, host: str, port: str, username: str, password: str,
                  queue_name: str, durable: bool, auto_ack: bool, prefetch_count: int):
+        self.queue_name = queue_name
+        self.durable = durable
         self.connection, self.channel = self.create_connection(
             host, port, username, password, queue_name, durable, auto_ack, prefetch_count)
         self.channel.start_consuming()
@@ -69,8 +72,11 @@ class TrainJobQueueReceiver:
             print(e)
             ch.basic_nack(delivery_tag=method.delivery_tag)
             print('nack %s %d' % (model_name, gspace_id))
+        # 队列中等待的消息数
+        TRAIN_JOBS_QUEUED.set(ch.queue_declare(queue=self.queue_name, durable=self.durable, passive=True).method.message_count)
 
 if __name__ == '__main__':
+    start_metrics()
     rabbitmq_config = config_loader.get_config()['rabbitmq']
     receiver = TrainJobQueueReceiver(rabbitmq_config['host'],
                                      rabbitmq_config['port'],
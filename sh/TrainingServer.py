@@ -3,8 +3,9 @@ from config.config_loader import config_loader
 import json
 import time
 from concurrent import futures
-from flask import Flask, request
-from sh.TrainJob import TrainJob
+from flask import Flask, Response, request
+from sh.Metrics import registry
+from sh.TrainJob import TrainJob, TRAIN_JOBS_QUEUED
 from sh.ServiceReporter import ServiceReporter
 
 app = Flask(__name__)
@@ -47,6 +48,7 @@ tjr = TrainJobRegister(host=config['zkhost'])
 @app.route("/train", methods=['POST'])
 def train_job_run():
     def run(args: dict):
+        TRAIN_JOBS_QUEUED.dec()
         train_triples = args['trainTriples']
         model_name = args['modelName']
         gspace_id = args['gid']
@@ -77,10 +79,16 @@ def train_job_run():
         'gid': args['gid'],
         'trainTriplesLen': len(args['trainTriples'])
     })
+    TRAIN_JOBS_QUEUED.inc()
     executor.submit(run, args)
     return json.dumps({'succ': True})
 
 
+@app.route("/metrics", methods=['GET'])
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
     tjr.register()
     app.run('0.0.0.0', config['port'])
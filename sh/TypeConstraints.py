@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class TypeConstraints:
+    """
+    Heads and tails observed with every relation (type_constrain.txt), as two CSR indexes shipped in the
+    binary parameter file:
+        constrain.head.offsets / ids  r -> heads
+        constrain.tail.offsets / ids  r -> tails
+    offsets has rel_tot + 1 entries, the sorted unique ids of relation r are ids[offsets[r]:offsets[r + 1]].
+    """
+
+    def __init__(self, arrays: dict):
+        self.index = {}
+        for mode in ['head', 'tail']:
+            self.index[mode] = tuple(arrays['constrain.%s.%s' % (mode, name)] for name in ['offsets', 'ids'])
+
+    @classmethod
+    def from_params(cls, params: dict) -> 'TypeConstraints':
+        """
+        :return: None if the parameter file carries no type constraints
+        """
+        if 'constrain.head.offsets' not in params:
+            return None
+        return cls(params)
+
+    @staticmethod
+    def build(path: str, rel_tot: int) -> dict:
+        """
+        :param path: type_constrain.txt, a count line then a heads line and a tails line for every relation,
+            each "<relation id>\t<count>\t<entity id>..."
+        :return: arrays to store in the parameter file
+        """
+        constraints = {'head': [[] for _ in range(rel_tot)], 'tail': [[] for _ in range(rel_tot)]}
+        with open(path, 'r') as f:
+            tot = int(f.readline())
+            for _ in range(tot):
+                for mode in ['head', 'tail']:
+                    items = f.readline().split()
+                    constraints[mode][int(items[0])].extend(int(e) for e in items[2:])
+        arrays = {}
+        for mode in ['head', 'tail']:
+            ids = [np.unique(np.asarray(e, dtype=np.int64)) for e in constraints[mode]]
+            offsets = np.zeros(rel_tot + 1, dtype=np.int64)
+            np.cumsum([len(e) for e in ids], out=offsets[1:])
+            arrays['constrain.%s.offsets' % mode] = offsets
+            arrays['constrain.%s.ids' % mode] = np.concatenate(ids) if rel_tot > 0 else np.zeros(0, dtype=np.int64)
+        return arrays
+
+    def candidates(self, mode: str, r: int) -> np.ndarray:
+        """
+        :param mode: head or tail
+        :param r: relation id
+        :return: sorted entity ids allowed as the head / tail of relation r
+        """
+        offsets, ids = self.index[mode]
+        return ids[offsets[r]:offsets[r + 1]]
+
+    def nbytes(self) -> int:
+        return sum(array.nbytes for arrays in self.index.values() for array in arrays)
@@ -0,0 +1,150 @@
+import zlib
+import numpy as np
+
+from openke.data import save_param_file, load_param_file
+
+
+class Vocabulary:
+    """
+    Entity or relation names in one utf-8 buffer, looked up in both directions without a python object per name.
+        buffer   uint8, the encoded names one after another
+        offsets  int64 (n + 1,), name of row i is buffer[offsets[i]:offsets[i + 1]]
+        ids      int64 (n,), id of row i
+        rows     int64 (max id + 1,), row of every id, -1 for unused ids
+        table    int64, open addressing hash table (crc32, linear probing) of rows, -1 for empty slots
+    The arrays can be saved in a binary parameter file and memory-mapped, so loading is O(1).
+    Like the dicts it replaces, vocab[name] returns the id and vocab.names[id] returns the name,
+    both raise KeyError for unknown keys.
+    """
+
+    def __init__(self, arrays: dict):
+        self.buffer = arrays['buffer']
+        self.offsets = arrays['offsets']
+        self.ids = arrays['ids']
+        self.rows = arrays['rows']
+        self.table = arrays['table']
+        self.mask = len(self.table) - 1
+        self.names = _Names(self)
+
+    @classmethod
+    def from_names(cls, names: list, ids: list = None) -> 'Vocabulary':
+        """
+        :param names: names, unique
+        :param ids: id of every name, defaults to its position
+        """
+        encoded = [str(name).encode('utf-8') for name in names]
+        ids = np.arange(len(encoded), dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        rows = np.full(int(ids.max()) + 1 if len(ids) > 0 else 0, -1, dtype=np.int64)
+        rows[ids] = np.arange(len(ids))
+        # load factor <= 0.5
+        table = np.full(1 << max(1, (2 * len(encoded)).bit_length()), -1, dtype=np.int64)
+        mask = len(table) - 1
+        for row, name in enumerate(encoded):
+            slot = zlib.crc32(name) & mask
+            while table[slot] != -1:
+                slot = (slot + 1) & mask
+            table[slot] = row
+        return cls({
+            'buffer': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'offsets': offsets,
+            'ids': ids,
+            'rows': rows,
+            'table': table,
+        })
+
+    @classmethod
+    def from_text(cls, path: str) -> 'Vocabulary':
+        """
+        :param path: entity2id.txt / relation2id.txt, a count line then "<name>\t<id>" lines
+        """
+        names = []
+        ids = []
+        with open(path, 'r') as f:
+            f.readline()
+            for row in f:
+                items = row.rstrip('\n').split('\t')
+                if len(items) != 2:
+                    continue
+                names.append(items[0])
+                ids.append(int(items[1]))
+        return cls.from_names(names, ids)
+
+    def arrays(self) -> dict:
+        return {
+            'buffer': self.buffer,
+            'offsets': self.offsets,
+            'ids': self.ids,
+            'rows': self.rows,
+            'table': self.table,
+        }
+
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, name) -> bool:
+        return self._find(name) >= 0
+
+    def __getitem__(self, name: str) -> int:
+        row = self._find(name)
+        if row < 0:
+            raise KeyError(name)
+        return int(self.ids[row])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._name(row)
+
+    def _find(self, name) -> int:
+        key = str(name).encode('utf-8')
+        slot = zlib.crc32(key) & self.mask
+        while True:
+            row = int(self.table[slot])
+            if row < 0 or self.buffer[self.offsets[row]:self.offsets[row + 1]].tobytes() == key:
+                return row
+            slot = (slot + 1) & self.mask
+
+    def _name(self, row: int) -> str:
+        return self.buffer[self.offsets[row]:self.offsets[row + 1]].tobytes().decode('utf-8')
+
+
+class _Names:
+    """
+    id -> name view of a Vocabulary.
+    """
+
+    def __init__(self, vocab: Vocabulary):
+        self.vocab = vocab
+
+    def __len__(self) -> int:
+        return len(self.vocab)
+
+    def __getitem__(self, id: int) -> str:
+        id = int(id)
+        if id < 0 or id >= len(self.vocab.rows) or self.vocab.rows[id] < 0:
+            raise KeyError(id)
+        return self.vocab._name(int(self.vocab.rows[id]))
+
+
+def save_vocabularies(path: str, entities: Vocabulary, relations: Vocabulary) -> None:
+    arrays = {}
+    for prefix, vocab in [('entity', entities), ('relation', relations)]:
+        for name, array in vocab.arrays().items():
+            arrays['%s.%s' % (prefix, name)] = array
+    save_param_file(path, arrays)
+
+
+def load_vocabularies(path: str, mmap: bool = True) -> (Vocabulary, Vocabulary):
+    """
+    :return: entity vocabulary, relation vocabulary
+    """
+    arrays = load_param_file(path, mmap)
+    res = []
+    for prefix in ['entity', 'relation']:
+        res.append(Vocabulary(dict((name.split('.', 1)[1], array) for name, array in arrays.items()
+                                   if name.split('.', 1)[0] == prefix)))
+    return res[0], res[1]
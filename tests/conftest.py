@@ -0,0 +1,12 @@
+import os
+import sys
+import types
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+# the tests do not depend on the local config/config-<env>.json
+os.environ.setdefault('EMBEDDING_CONFIG', os.path.join(ROOT, 'config', 'config-example.json'))
+# Utils connects to MySQL on import, tests of the servers hand them their models directly
+utils = types.ModuleType('Utils')
+utils.mysql_utils = None
+sys.modules.setdefault('Utils', utils)
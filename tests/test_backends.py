@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+import torch
+
+from openke.module.model import TransD, TransE, TransH
+from sh import ModelScorers, NumpyScorers
+from sh.ResultCache import ResultCache
+
+ENT_TOT = 300
+REL_TOT = 4
+DIM = 32
+QUERIES = 8
+# float32 scores of normalized embeddings, the p_norm = 2 expansion loses precision near 0
+TOLERANCE = {'rtol': 1e-4, 'atol': 1e-4}
+
+
+def build_model(model_name: str, p_norm: int):
+    torch.manual_seed(0)
+    if model_name == 'transe':
+        return TransE(ENT_TOT, REL_TOT, DIM, p_norm)
+    if model_name == 'transh':
+        return TransH(ENT_TOT, REL_TOT, DIM, p_norm)
+    # entity and relation spaces of different sizes, entities are resized
+    return TransD(ENT_TOT, REL_TOT, DIM, DIM // 2, p_norm)
+
+
+def build_scorers(model, p_norm: int, quantization: str = 'float32') -> tuple:
+    arrays = dict((name, value.detach().numpy().copy()) for name, value in model.state_dict().items()
+                  if name.endswith('.weight'))
+    model_name = type(model).__name__.lower()
+    return (ModelScorers.scorer_constructor(model_name).from_arrays(arrays, p_norm=p_norm, quantization=quantization),
+            NumpyScorers.scorer_constructor(model_name).from_arrays(arrays, p_norm=p_norm, quantization=quantization))
+
+
+def model_scores(model, h: np.ndarray, t: np.ndarray, r: np.ndarray) -> np.ndarray:
+    return model.predict({
+        'batch_h': torch.from_numpy(h),
+        'batch_t': torch.from_numpy(t),
+        'batch_r': torch.from_numpy(r),
+        'mode': 'normal',
+    })
+
+
+def queries() -> tuple:
+    rng = np.random.RandomState(1)
+    return (rng.randint(ENT_TOT, size=QUERIES).astype(np.int64), rng.randint(ENT_TOT, size=QUERIES).astype(np.int64),
+            rng.randint(REL_TOT, size=QUERIES).astype(np.int64))
+
+
+def all_scores(scorer, h: np.ndarray, t: np.ndarray, r: np.ndarray) -> tuple:
+    return tuple(scorer.as_numpy(scores) for scores in [
+        scorer.score_head(scorer.as_ids(t), scorer.as_ids(r)),
+        scorer.score_tail(scorer.as_ids(h), scorer.as_ids(r)),
+        scorer.score_triple(scorer.as_ids(h), scorer.as_ids(t), scorer.as_ids(r)),
+        scorer.score_relation(scorer.as_ids(h), scorer.as_ids(t)),
+    ])
+
+
+@pytest.mark.parametrize('p_norm', [1, 2])
+@pytest.mark.parametrize('model_name', ['transe', 'transh', 'transd'])
+def test_scores_match_model_predict(model_name, p_norm):
+    model = build_model(model_name, p_norm)
+    h, t, r = queries()
+    entities = np.arange(ENT_TOT, dtype=np.int64)
+    expected_head = np.stack([model_scores(model, entities, np.full(ENT_TOT, t[i]), np.full(ENT_TOT, r[i]))
+                              for i in range(QUERIES)])
+    expected_tail = np.stack([model_scores(model, np.full(ENT_TOT, h[i]), entities, np.full(ENT_TOT, r[i]))
+                              for i in range(QUERIES)])
+    relations = np.arange(REL_TOT, dtype=np.int64)
+    expected_relation = np.stack([model_scores(model, np.full(REL_TOT, h[i]), np.full(REL_TOT, t[i]), relations)
+                                  for i in range(QUERIES)])
+    expected = (expected_head, expected_tail, model_scores(model, h, t, r), expected_relation)
+    for scorer in build_scorers(model, p_norm):
+        for scores, expected_scores in zip(all_scores(scorer, h, t, r), expected):
+            np.testing.assert_allclose(scores, expected_scores, **TOLERANCE)
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+@pytest.mark.parametrize('p_norm', [1, 2])
+@pytest.mark.parametrize('model_name', ['transe', 'transh', 'transd'])
+def test_quantized_scores_match_torch(model_name, p_norm, quantization):
+    torch_scorer, numpy_scorer = build_scorers(build_model(model_name, p_norm), p_norm, quantization)
+    assert isinstance(numpy_scorer.ent, NumpyScorers.QuantizedArray)
+    h, t, r = queries()
+    for scores, expected_scores in zip(all_scores(numpy_scorer, h, t, r), all_scores(torch_scorer, h, t, r)):
+        np.testing.assert_allclose(scores, expected_scores, **TOLERANCE)
+
+
+@pytest.mark.parametrize('model_name', ['transh', 'transd'])
+def test_cached_projections_match(model_name):
+    torch_scorer, numpy_scorer = build_scorers(build_model(model_name, 1), 1, 'int8')
+    h, t, r = queries()
+    expected = all_scores(numpy_scorer, h, t, r)
+    for scorer in [torch_scorer, numpy_scorer]:
+        scorer.projections = ResultCache(64 * 1024 * 1024, 0, lambda key, value: scorer.array_nbytes(value))
+        # the second pass reads the projections cached by the first one
+        for _ in range(2):
+            for scores, expected_scores in zip(all_scores(scorer, h, t, r), expected):
+                np.testing.assert_allclose(scores, expected_scores, **TOLERANCE)
+        assert len(scorer.projections.entries) == len(np.unique(r))
@@ -0,0 +1,151 @@
+import gzip
+import os
+import queue
+import zlib
+
+import pymysql
+import pytest
+
+from sh import ModelLoader as model_loader_module
+from sh.ModelLoader import ModelLoader
+
+GID = '1'
+MODEL_NAME = 'transe'
+UPDATED = '1600000000'
+
+PARAMS = b'\x93NUMPY' + bytes(range(256)) * 4000
+ENTITY2ID = '3\n实体0\t0\ne1\t1\ne2\t2\n'
+RELATION2ID = '1\nr0\t0\n'
+
+
+class _Cursor:
+
+    def __init__(self, table: dict, queries: list, cursor_class):
+        self.table = table
+        self.queries = queries
+        self.cursor_class = cursor_class
+        self.row = None
+
+    def __enter__(self) -> '_Cursor':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def execute(self, sql: str, args: list) -> None:
+        self.queries.append((self.cursor_class, sql, args))
+        column = sql.split()[1]
+        # gid, modelname and the updated range are the arguments of every query
+        if args[:2] == [GID, MODEL_NAME] and self.table['updated'] == args[2].timestamp():
+            self.row = {'value': self.table[column]}
+
+    def fetchone(self) -> dict:
+        return self.row
+
+
+class _Connection:
+    """
+    One row of gspacemodelparam, answers select <column> as value queries.
+    """
+
+    def __init__(self, table: dict, queries: list):
+        self.table = table
+        self.queries = queries
+
+    def ping(self, reconnect: bool = False) -> None:
+        pass
+
+    def cursor(self, cursor_class=None) -> _Cursor:
+        return _Cursor(self.table, self.queries, cursor_class)
+
+    def commit(self) -> None:
+        pass
+
+
+class _MysqlUtils:
+
+    def __init__(self, table: dict, lengths: dict = None):
+        self.table = table
+        self.lengths = lengths
+        self.queries = []
+
+    def query(self, sql: str, args: list) -> list:
+        if self.lengths is not None:
+            return [self.lengths]
+        return [dict((column, len(self.table[column])) for column in ['params', 'entity2id', 'relation2id'])]
+
+    def connect(self) -> _Connection:
+        return _Connection(self.table, self.queries)
+
+
+def make_loader(models_dir) -> ModelLoader:
+    # only the download path, without loading models from the database
+    loader = ModelLoader.__new__(ModelLoader)
+    loader.models_dir = str(models_dir)
+    loader.connections = queue.Queue()
+    return loader
+
+
+def make_table(params: bytes = PARAMS, entity2id: str = ENTITY2ID) -> dict:
+    return {'params': params, 'entity2id': entity2id, 'relation2id': RELATION2ID, 'updated': int(UPDATED)}
+
+
+def files(loader: ModelLoader) -> list:
+    return [loader._make_param_file_name(GID, MODEL_NAME, UPDATED),
+            loader._make_entity2id_file_name(GID, MODEL_NAME, UPDATED),
+            loader._make_relation2id_file_name(GID, MODEL_NAME, UPDATED)]
+
+
+@pytest.mark.parametrize('compress', [None, zlib.compress, gzip.compress])
+def test_download_writes_every_column(tmp_path, monkeypatch, compress):
+    params = PARAMS if compress is None else compress(PARAMS)
+    mysql_utils = _MysqlUtils(make_table(params, ENTITY2ID if compress is None else compress(ENTITY2ID.encode('utf-8'))))
+    monkeypatch.setattr(model_loader_module, 'mysql_utils', mysql_utils)
+    loader = make_loader(tmp_path)
+    loader._download_embed([(GID, MODEL_NAME, UPDATED)])
+
+    param_file, entity2id_file, relation2id_file = files(loader)
+    with open(tmp_path / param_file, 'rb') as f:
+        assert f.read() == PARAMS
+    with open(tmp_path / entity2id_file, encoding='utf-8') as f:
+        assert f.read() == ENTITY2ID
+    with open(tmp_path / relation2id_file, encoding='utf-8') as f:
+        assert f.read() == RELATION2ID
+    # no temporary file is left behind
+    assert sorted(os.listdir(tmp_path)) == sorted(files(loader))
+    # one unbuffered query for every column, on connections returned to the pool
+    assert len(mysql_utils.queries) == 3
+    assert all(cursor_class is pymysql.cursors.SSDictCursor for cursor_class, _, _ in mysql_utils.queries)
+    assert loader.connections.qsize() > 0
+
+
+def test_download_in_small_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_loader_module, 'mysql_utils', _MysqlUtils(make_table(zlib.compress(PARAMS))))
+    loader = make_loader(tmp_path)
+    for column, file_name in zip(['params', 'entity2id', 'relation2id'], files(loader)):
+        value = make_table(zlib.compress(PARAMS))[column]
+        loader._download_column(GID, MODEL_NAME, UPDATED, column, len(value), file_name, 7)
+    with open(tmp_path / ('.%s.part' % files(loader)[0]), 'rb') as f:
+        assert f.read() == PARAMS
+
+
+def test_new_version_during_download_is_not_kept(tmp_path, monkeypatch):
+    table = make_table()
+    mysql_utils = _MysqlUtils(table, dict((column, len(table[column])) for column in ['params', 'entity2id', 'relation2id']))
+    # the model was uploaded again after char_length was read
+    table['updated'] += 60
+    monkeypatch.setattr(model_loader_module, 'mysql_utils', mysql_utils)
+    loader = make_loader(tmp_path)
+    loader._download_embed([(GID, MODEL_NAME, UPDATED)])
+    assert os.listdir(tmp_path) == []
+
+
+def test_length_mismatch_is_not_kept(tmp_path, monkeypatch):
+    table = make_table()
+    lengths = {'params': len(PARAMS), 'entity2id': len(ENTITY2ID) + 1, 'relation2id': len(RELATION2ID)}
+    monkeypatch.setattr(model_loader_module, 'mysql_utils', _MysqlUtils(table, lengths))
+    loader = make_loader(tmp_path)
+    loader._download_embed([(GID, MODEL_NAME, UPDATED)])
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(RuntimeError):
+        loader._download_column(GID, MODEL_NAME, UPDATED, 'entity2id', lengths['entity2id'], files(loader)[1], 1024)
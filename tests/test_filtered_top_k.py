@@ -0,0 +1,153 @@
+from concurrent import futures
+
+import grpc
+import numpy as np
+import pytest
+
+from openke.data import save_param_file
+from protos import embedding_pb2, embedding_pb2_grpc
+from sh.EmbeddingServer import EmbeddingServicer
+from sh.KnownTriples import KnownTriples
+from sh.ModelPredictors import ModelPredictor
+from sh.TypeConstraints import TypeConstraints
+
+ENT_TOT = 60
+REL_TOT = 4
+DIM = 16
+TRIPLES = 400
+
+
+def write_model(dirpath, model_name: str, with_arrays: bool) -> tuple:
+    """
+    :return: parameter file, entity2id and relation2id paths, the known triples and the allowed heads / tails
+    """
+    rng = np.random.RandomState(0)
+    params = {
+        'ent_embeddings.weight': rng.randn(ENT_TOT, DIM).astype(np.float32),
+        'rel_embeddings.weight': rng.randn(REL_TOT, DIM).astype(np.float32),
+    }
+    if model_name == 'transh':
+        params['norm_vector.weight'] = rng.randn(REL_TOT, DIM).astype(np.float32)
+    # relation r allows few heads and tails for r = 0, most entities for r = 3
+    allowed = dict((mode, [np.unique(rng.randint(ENT_TOT, size=5 + 15 * r)) for r in range(REL_TOT)])
+                   for mode in ['head', 'tail'])
+    r = rng.randint(REL_TOT, size=TRIPLES)
+    triples = np.stack([[rng.choice(allowed['head'][rel]) for rel in r],
+                        [rng.choice(allowed['tail'][rel]) for rel in r], r], 1)
+    if with_arrays:
+        constrain_path = '%s/type_constrain.txt' % dirpath
+        with open(constrain_path, 'w') as f:
+            f.write('%d\n' % REL_TOT)
+            for rel in range(REL_TOT):
+                for mode in ['head', 'tail']:
+                    f.write('%d\t%d\t%s\n' % (rel, len(allowed[mode][rel]), '\t'.join(map(str, allowed[mode][rel]))))
+        params.update(KnownTriples.build(triples, REL_TOT))
+        params.update(TypeConstraints.build(constrain_path, REL_TOT))
+    paths = tuple('%s/%s.%s' % (dirpath, model_name, suffix) for suffix in ['param', 'entity2id.txt', 'relation2id.txt'])
+    save_param_file(paths[0], params)
+    for path, prefix, tot in [(paths[1], 'e', ENT_TOT), (paths[2], 'r', REL_TOT)]:
+        with open(path, 'w') as f:
+            f.write('%d\n' % tot)
+            f.writelines('%s%d\t%d\n' % (prefix, i, i) for i in range(tot))
+    return paths, triples, allowed
+
+
+def brute_force(model: ModelPredictor, mode: str, e: int, r: int, k: int, exclude_known: bool,
+                type_constrain: bool, triples: np.ndarray, allowed: dict) -> list:
+    """
+    Full scores of every entity, masked, sorted by (score, id).
+    """
+    score = model.scorer.score_head if mode == 'head' else model.scorer.score_tail
+    scores = model._to_numpy(score(model._to_ids([e]), model._to_ids([r])))[0].astype(np.float64)
+    keep = np.ones(ENT_TOT, dtype=bool)
+    if type_constrain:
+        keep[:] = False
+        keep[allowed[mode][r]] = True
+    if exclude_known:
+        # (h, t, r) rows, head mode looks up (r, t), tail mode (h, r)
+        query, answer = (1, 0) if mode == 'head' else (0, 1)
+        keep[triples[(triples[:, query] == e) & (triples[:, 2] == r), answer]] = False
+    ids = np.nonzero(keep)[0]
+    ids = ids[np.lexsort((ids, scores[ids]))][:k]
+    return ['e%d' % i for i in ids]
+
+
+@pytest.fixture(scope='module', params=['transe', 'transh'])
+def model_data(request, tmp_path_factory) -> tuple:
+    paths, triples, allowed = write_model(tmp_path_factory.mktemp('model'), request.param, True)
+    return paths, triples, allowed
+
+
+@pytest.mark.parametrize('backend', ['torch', 'numpy'])
+@pytest.mark.parametrize('mode', ['head', 'tail'])
+@pytest.mark.parametrize('exclude_known, type_constrain', [(True, False), (False, True), (True, True)])
+@pytest.mark.parametrize('k', [5, ENT_TOT + 10])
+def test_matches_brute_force(model_data, backend, mode, exclude_known, type_constrain, k):
+    paths, triples, allowed = model_data
+    model = ModelPredictor(paths[0].rsplit('/', 1)[1].split('.')[0], paths[0], paths[1], paths[2], False,
+                           backend=backend)
+    # queries of known triples, so there are known answers to drop
+    rows = triples[::20]
+    e = rows[:, 1] if mode == 'head' else rows[:, 0]
+    r = rows[:, 2]
+    predict = model.predict_head_entity_batch if mode == 'head' else model.predict_tail_entity_batch
+    res = predict(['e%d' % i for i in e], ['r%d' % i for i in r], k, exclude_known, type_constrain)
+    expected = [brute_force(model, mode, e[i], r[i], k, exclude_known, type_constrain, triples, allowed)
+                for i in range(len(rows))]
+    assert res == expected
+    if k > ENT_TOT:
+        # fewer than k entities remain, every remaining one is returned
+        assert all(len(row) < k for row in res)
+
+
+def test_missing_arrays_raise_value_error(tmp_path):
+    paths, _, _ = write_model(tmp_path, 'transe', False)
+    model = ModelPredictor('transe', paths[0], paths[1], paths[2], False)
+    for exclude_known, type_constrain in [(True, False), (False, True)]:
+        with pytest.raises(ValueError):
+            model.predict_tail_entity('e0', 'r0', 5, exclude_known, type_constrain)
+        with pytest.raises(ValueError):
+            model.predict_head_entity_batch(['e0'], ['r0'], 5, exclude_known, type_constrain)
+
+
+class _ModelLoader:
+
+    def __init__(self, model: ModelPredictor):
+        self.model = model
+
+    def get_model(self, gid: int, model_name: str) -> ModelPredictor:
+        return self.model
+
+
+def test_missing_arrays_abort_with_failed_precondition(tmp_path):
+    paths, _, _ = write_model(tmp_path, 'transe', False)
+    model = ModelPredictor('transe', paths[0], paths[1], paths[2], False)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(EmbeddingServicer(_ModelLoader(model)), server)
+    port = server.add_insecure_port('127.0.0.1:%d' % 0)
+    server.start()
+    try:
+        with grpc.insecure_channel('127.0.0.1:%d' % port) as channel:
+            stub = embedding_pb2_grpc.GraphEmbeddingServiceStub(channel)
+            calls = [
+                lambda: stub.predictHead(embedding_pb2.PredictHeadRequest(
+                    gid=1, modelName='transe', tail='e0', relation='r0', k=5, exclude_known=True)),
+                lambda: stub.predictTail(embedding_pb2.PredictTailRequest(
+                    gid=1, modelName='transe', head='e0', relation='r0', k=5, type_constrain=True)),
+                lambda: stub.predictHeadBatch(embedding_pb2.PredictHeadBatchRequest(
+                    gid=1, modelName='transe', tail=['e0'], relation=['r0'], k=5, type_constrain=True)),
+                lambda: stub.predictTailBatch(embedding_pb2.PredictTailBatchRequest(
+                    gid=1, modelName='transe', head=['e0'], relation=['r0'], k=5, exclude_known=True)),
+                lambda: list(stub.predictTailStream(iter([embedding_pb2.PredictTailRequest(
+                    gid=1, modelName='transe', head='e0', relation='r0', k=5, exclude_known=True)]))),
+            ]
+            for call in calls:
+                with pytest.raises(grpc.RpcError) as error:
+                    call()
+                assert error.value.code() == grpc.StatusCode.FAILED_PRECONDITION
+            # the same model still answers unfiltered predictions
+            res = stub.predictTail(embedding_pb2.PredictTailRequest(gid=1, modelName='transe', head='e0',
+                                                                    relation='r0', k=5))
+            assert len(res.val) == 5
+    finally:
+        server.stop(0)
@@ -0,0 +1,69 @@
+import urllib.request
+from concurrent import futures
+
+import grpc
+import numpy as np
+import pytest
+
+from openke.data import save_param_file
+from protos import embedding_pb2, embedding_pb2_grpc
+from sh.EmbeddingServer import EmbeddingServicer, MetricsInterceptor
+from sh.Metrics import serve_metrics
+from sh.ModelPredictors import ModelPredictor
+
+ENT_TOT = 100
+REL_TOT = 3
+DIM = 16
+
+
+class _ModelLoader:
+
+    def __init__(self, model: ModelPredictor):
+        self.model = model
+
+    def get_model(self, gid: int, model_name: str) -> ModelPredictor:
+        return self.model
+
+
+@pytest.fixture(scope='module')
+def model(tmp_path_factory) -> ModelPredictor:
+    dirpath = tmp_path_factory.mktemp('model')
+    rng = np.random.RandomState(0)
+    params = {
+        'ent_embeddings.weight': rng.randn(ENT_TOT, DIM).astype(np.float32),
+        'rel_embeddings.weight': rng.randn(REL_TOT, DIM).astype(np.float32),
+    }
+    paths = tuple('%s/transe.%s' % (dirpath, suffix) for suffix in ['param', 'entity2id.txt', 'relation2id.txt'])
+    save_param_file(paths[0], params)
+    for path, prefix, tot in [(paths[1], 'e', ENT_TOT), (paths[2], 'r', REL_TOT)]:
+        with open(path, 'w') as f:
+            f.write('%d\n' % tot)
+            f.writelines('%s%d\t%d\n' % (prefix, i, i) for i in range(tot))
+    return ModelPredictor('transe', paths[0], paths[1], paths[2], False)
+
+
+def test_scrape_after_prediction(model):
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2), interceptors=[MetricsInterceptor()])
+    embedding_pb2_grpc.add_GraphEmbeddingServiceServicer_to_server(EmbeddingServicer(_ModelLoader(model)), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    metrics_server = serve_metrics(0)
+    try:
+        with grpc.insecure_channel('127.0.0.1:%d' % port) as channel:
+            stub = embedding_pb2_grpc.GraphEmbeddingServiceStub(channel)
+            res = stub.predictTail(embedding_pb2.PredictTailRequest(gid=1, modelName='transe', head='e1', relation='r1',
+                                                                    k=5))
+        assert len(res.val) == 5
+        with urllib.request.urlopen('http://127.0.0.1:%d/metrics' % metrics_server.server_address[1]) as response:
+            assert response.status == 200
+            body = response.read().decode('utf-8')
+    finally:
+        metrics_server.shutdown()
+        server.stop(0)
+    lines = body.splitlines()
+    assert '# TYPE embedding_rpc_requests_total counter' in lines
+    assert any(line.startswith('embedding_rpc_requests_total{rpc="predictTail",status="ok"} ') for line in lines)
+    assert '# TYPE embedding_rpc_latency_seconds histogram' in lines
+    for suffix in ['_bucket{rpc="predictTail",le="+Inf"} ', '_count{rpc="predictTail"} ', '_sum{rpc="predictTail"} ']:
+        assert any(line.startswith('embedding_rpc_latency_seconds' + suffix) for line in lines)
+    assert any(line.startswith('embedding_predict_stage_seconds_count{stage="score"} ') for line in lines)
@@ -0,0 +1,136 @@
+import threading
+import time
+
+import pytest
+
+from sh.MicroBatcher import MicroBatcher
+
+
+class _Model:
+    """
+    Answers e-r-0, e-r-1, ... for every query and records the batches it scores.
+    """
+
+    def __init__(self, delay: float = 0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def predict_head_entity_batch(self, ts: list, rs: list, k: int, exclude_known: bool = False,
+                                  type_constrain: bool = False) -> list:
+        return self._predict('head', ts, rs, k)
+
+    def predict_tail_entity_batch(self, hs: list, rs: list, k: int, exclude_known: bool = False,
+                                  type_constrain: bool = False) -> list:
+        return self._predict('tail', hs, rs, k)
+
+    def _predict(self, mode: str, es: list, rs: list, k: int) -> list:
+        with self.lock:
+            self.batches.append((mode, list(es)))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if 'bad' in es:
+            raise KeyError('bad')
+        return [['%s-%s-%s-%d' % (mode, e, r, i) for i in range(k)] for e, r in zip(es, rs)]
+
+
+def submit_all(batcher: MicroBatcher, model: _Model, queries: list) -> list:
+    """
+    :param queries: [(mode, entity, relation, k), ...] submitted at the same time
+    :return: result or exception of every query, in order
+    """
+    res = [None] * len(queries)
+    barrier = threading.Barrier(len(queries))
+
+    def submit(i: int) -> None:
+        mode, e, r, k = queries[i]
+        predict = batcher.predict_head_entity if mode == 'head' else batcher.predict_tail_entity
+        barrier.wait()
+        try:
+            res[i] = predict(model, e, r, k)
+        except Exception as error:
+            res[i] = error
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(queries))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return res
+
+
+@pytest.fixture
+def batcher():
+    batcher = MicroBatcher(window_ms=200, max_batch_size=4)
+    yield batcher
+    batcher.shutdown(5)
+
+
+def test_concurrent_queries_are_batched_up_to_max_batch_size(batcher):
+    model = _Model()
+    res = submit_all(batcher, model, [('tail', 'e%d' % i, 'r', 2) for i in range(10)])
+    assert res == [['tail-e%d-r-0' % i, 'tail-e%d-r-1' % i] for i in range(10)]
+    sizes = [len(es) for _, es in model.batches]
+    assert sum(sizes) == 10
+    assert max(sizes) == 4
+    assert len(sizes) < 10
+
+
+def test_lone_query_waits_at_most_the_window():
+    batcher = MicroBatcher(window_ms=100, max_batch_size=4)
+    try:
+        start = time.time()
+        assert batcher.predict_tail_entity(_Model(), 'e', 'r', 1) == ['tail-e-r-0']
+        assert 0.09 <= time.time() - start < 1
+    finally:
+        batcher.shutdown(5)
+
+
+def test_every_caller_gets_its_own_row(batcher):
+    model = _Model()
+    queries = [('head', 'e1', 'r1', 3), ('tail', 'e2', 'r2', 1), ('head', 'e3', 'r3', 0), ('tail', 'e4', 'r4', 5)]
+    res = submit_all(batcher, model, queries)
+    assert res == [['%s-%s-%s-%d' % (mode, e, r, i) for i in range(k)] for mode, e, r, k in queries]
+    # head and tail queries are scored separately, with the largest k of each batch
+    assert sorted((mode, sorted(es)) for mode, es in model.batches) == [('head', ['e1', 'e3']), ('tail', ['e2', 'e4'])]
+
+
+def test_batch_error_reaches_every_caller(batcher):
+    model = _Model(error=RuntimeError('model failed'))
+    res = submit_all(batcher, model, [('tail', 'e%d' % i, 'r', 1) for i in range(4)])
+    assert all(isinstance(e, RuntimeError) and str(e) == 'model failed' for e in res)
+
+
+def test_bad_query_only_fails_its_caller(batcher):
+    model = _Model()
+    res = submit_all(batcher, model, [('tail', 'e0', 'r', 1), ('tail', 'bad', 'r', 1), ('tail', 'e2', 'r', 1)])
+    assert res[0] == ['tail-e0-r-0'] and res[2] == ['tail-e2-r-0']
+    assert isinstance(res[1], KeyError)
+
+
+def test_shutdown_scores_pending_queries_and_stops():
+    batcher = MicroBatcher(window_ms=200, max_batch_size=64)
+    model = _Model(delay=0.1)
+    res = []
+    thread = threading.Thread(target=lambda: res.append(batcher.predict_tail_entity(model, 'e', 'r', 1)))
+    thread.start()
+    while batcher.requests.qsize() == 0 and not model.batches:
+        time.sleep(0.001)
+    start = time.time()
+    batcher.shutdown(5)
+    assert time.time() - start < 5
+    assert not batcher.dispatcher.is_alive()
+    thread.join(5)
+    assert res == [['tail-e-r-0']]
+    with pytest.raises(RuntimeError):
+        batcher.predict_tail_entity(model, 'e', 'r', 1)
+    # a second shutdown returns at once
+    batcher.shutdown(5)
+
+
+def test_shutdown_of_idle_batcher_does_not_hang():
+    batcher = MicroBatcher()
+    batcher.shutdown(5)
+    assert not batcher.dispatcher.is_alive()
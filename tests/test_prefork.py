@@ -0,0 +1,41 @@
+import threading
+from collections import OrderedDict
+
+from sh.ModelLoader import ModelLoader
+from sh.PreforkEmbeddingServer import PreforkServer
+
+
+class _Model:
+
+    def __init__(self, version: str):
+        self.version = version
+
+
+def make_loader(monkeypatch, lazy: bool) -> ModelLoader:
+    # three known models, only the pinned one loaded in lazy mode
+    loader = ModelLoader.__new__(ModelLoader)
+    loader.use_gpu = False
+    loader.lazy = lazy
+    loader.lock = threading.Lock()
+    loader.version_map = {('1', 'transe'): '10', ('1', 'transh'): '11', ('2', 'transe'): '12'}
+    loader.model_map = OrderedDict([(('1', 'transe'), _Model('10'))])
+    monkeypatch.setattr(loader, '_make_predictor', lambda gid, modelname, updated: _Model(updated))
+    return loader
+
+
+def test_lazy_models_are_loaded_before_forking(monkeypatch):
+    loader = make_loader(monkeypatch, True)
+    pinned = loader.model_map[('1', 'transe')]
+    PreforkServer(loader, workers=2)
+    assert not loader.lazy
+    assert dict((key, model.version) for key, model in loader.model_map.items()) == loader.version_map
+    # loaded models are kept, not built again
+    assert loader.model_map[('1', 'transe')] is pinned
+
+
+def test_eager_loader_is_not_preloaded(monkeypatch):
+    loader = make_loader(monkeypatch, False)
+    calls = []
+    monkeypatch.setattr(loader, 'preload', lambda: calls.append(1))
+    PreforkServer(loader, workers=2)
+    assert calls == []
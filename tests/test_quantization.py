@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from openke.data import save_param_file
+from sh.ModelPredictors import ModelPredictor
+
+ENT_TOT = 5000
+REL_TOT = 5
+DIM = 64
+K = 10
+QUERIES = 50
+# min mean top k overlap with float32
+MIN_OVERLAP = {'float16': 0.99, 'int8': 0.95}
+# max nbytes relative to float32
+MAX_NBYTES_RATIO = {'float16': 0.6, 'int8': 0.35}
+
+
+@pytest.fixture(scope='module')
+def model_paths(tmp_path_factory) -> tuple:
+    """
+    A TransE parameter file with clustered entity embeddings, closer to trained embeddings than uniform noise.
+    """
+    dirpath = tmp_path_factory.mktemp('model')
+    rng = np.random.RandomState(0)
+    centers = rng.randn(ENT_TOT // 50, DIM)
+    params = {
+        'ent_embeddings.weight': (centers[rng.randint(len(centers), size=ENT_TOT)] +
+                                  0.3 * rng.randn(ENT_TOT, DIM)).astype(np.float32),
+        'rel_embeddings.weight': (0.1 * rng.randn(REL_TOT, DIM)).astype(np.float32),
+    }
+    paths = tuple('%s/transe.%s' % (dirpath, suffix) for suffix in ['param', 'entity2id.txt', 'relation2id.txt'])
+    save_param_file(paths[0], params)
+    for path, prefix, tot in [(paths[1], 'e', ENT_TOT), (paths[2], 'r', REL_TOT)]:
+        with open(path, 'w') as f:
+            f.write('%d\n' % tot)
+            f.writelines('%s%d\t%d\n' % (prefix, i, i) for i in range(tot))
+    return paths
+
+
+def predict(paths: tuple, quantization: str, backend: str) -> tuple:
+    model = ModelPredictor('transe', paths[0], paths[1], paths[2], False, quantization=quantization,
+                           projection_cache_bytes=0, backend=backend)
+    rng = np.random.RandomState(1)
+    h = ['e%d' % i for i in rng.randint(ENT_TOT, size=QUERIES)]
+    r = ['r%d' % i for i in rng.randint(REL_TOT, size=QUERIES)]
+    return model, model.predict_tail_entity_batch(h, r, K)
+
+
+@pytest.mark.parametrize('backend', ['torch', 'numpy'])
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_top_k_overlap(model_paths, quantization, backend):
+    exact_model, exact = predict(model_paths, 'float32', backend)
+    model, res = predict(model_paths, quantization, backend)
+    overlap = np.mean([len(set(a) & set(e)) / K for a, e in zip(res, exact)])
+    assert overlap >= MIN_OVERLAP[quantization]
+    assert model.nbytes() <= MAX_NBYTES_RATIO[quantization] * exact_model.nbytes()
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_served_embeddings_are_quantized(model_paths, quantization):
+    exact_model, _ = predict(model_paths, 'float32', 'numpy')
+    model, _ = predict(model_paths, quantization, 'numpy')
+    ents = ['e0', 'e17', 'e4999']
+    exact = exact_model.get_ent_embedding_array(ents)
+    assert not isinstance(model.ent_embeddings, np.ndarray)
+    np.testing.assert_allclose(model.get_ent_embedding_array(ents), exact, atol=0.05 * np.abs(exact).max())
+    table, _ = model.get_embedding_table('entity')
+    np.testing.assert_allclose(table[:3], exact_model.get_embedding_table('entity')[0][:3],
+                               atol=0.05 * np.abs(exact).max())
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from sh import ResultCache as result_cache_module
+from sh.ResultCache import ResultCache
+
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def make_cache(max_bytes: int = 100, ttl: float = 0) -> ResultCache:
+    # every entry counts 10 bytes
+    return ResultCache(max_bytes, ttl, lambda key, value: 10)
+
+
+def key(i: int, version: str = 'v1') -> tuple:
+    return (1, 'transe', version, 'tail', i)
+
+
+def test_hit_after_miss():
+    cache = make_cache()
+    assert cache.get_or_compute(key(0), lambda: 'a') == 'a'
+    assert cache.get_or_compute(key(0), lambda: 'b') == 'a'
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'coalesced': 0, 'entries': 1, 'bytes': 10}
+
+
+def test_least_recently_used_is_evicted():
+    cache = make_cache(max_bytes=30)
+    for i in range(3):
+        cache.get_or_compute(key(i), lambda: i)
+    # key 0 becomes the most recently used, key 1 is evicted by key 3
+    cache.get_or_compute(key(0), lambda: 'recomputed')
+    cache.get_or_compute(key(3), lambda: 3)
+    assert list(cache.entries) == [key(2), key(0), key(3)]
+    assert cache.nbytes == 30
+    assert cache.get_or_compute(key(1), lambda: 'recomputed') == 'recomputed'
+
+
+def test_entry_larger_than_the_cache_is_not_kept():
+    cache = ResultCache(5, 0, lambda key, value: 10)
+    assert cache.get_or_compute(key(0), lambda: 'a') == 'a'
+    assert cache.stats()['entries'] == 0
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(result_cache_module, 'time', clock)
+    cache = make_cache(ttl=60)
+    cache.get_or_compute(key(0), lambda: 'a')
+    clock.now += 59
+    assert cache.get_or_compute(key(0), lambda: 'b') == 'a'
+    clock.now += 2
+    assert cache.get_or_compute(key(0), lambda: 'b') == 'b'
+    assert cache.stats()['misses'] == 2
+    assert cache.nbytes == 10
+
+
+def test_concurrent_misses_compute_once():
+    cache = make_cache()
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return 'a'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute(key(0), compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # every thread is either computing or waiting on the computation
+    deadline = time.time() + 5
+    while cache.stats()['misses'] + cache.stats()['coalesced'] < 8 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1
+    assert results == ['a'] * 8
+    assert cache.stats()['coalesced'] == 7
+
+
+def test_exception_reaches_every_waiter():
+    cache = make_cache()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise RuntimeError('scoring failed')
+
+    errors = []
+
+    def get():
+        try:
+            cache.get_or_compute(key(0), compute)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=get) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while cache.stats()['misses'] + cache.stats()['coalesced'] < 4 and time.time() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ['scoring failed'] * 4
+    # the failure is not cached, the next lookup computes again
+    assert cache.stats()['entries'] == 0
+    assert not cache.in_flight
+    assert cache.get_or_compute(key(0), lambda: 'a') == 'a'
+
+
+def test_retain_drops_replaced_versions():
+    cache = make_cache()
+    cache.get_or_compute(key(0, 'v1'), lambda: 'old')
+    cache.get_or_compute(key(1, 'v1'), lambda: 'old')
+    cache.get_or_compute((1, 'transh', 'v1', 'tail', 0), lambda: 'other model')
+    # the reload replaced transe v1 by v2
+    cache.retain({(1, 'transe', 'v2'), (1, 'transh', 'v1')})
+    assert list(cache.entries) == [(1, 'transh', 'v1', 'tail', 0)]
+    assert cache.nbytes == 10
+    assert cache.get_or_compute(key(0, 'v2'), lambda: 'new') == 'new'
+
+
+@pytest.mark.parametrize('max_bytes', [0, 10])
+def test_stats_bytes_stay_consistent(max_bytes):
+    cache = make_cache(max_bytes=max_bytes)
+    for i in range(5):
+        cache.get_or_compute(key(i), lambda: i)
+    assert cache.nbytes == sum(entry[1] for entry in cache.entries.values()) <= max_bytes
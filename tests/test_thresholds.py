@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from openke.config import Tester
+
+REL_TOT = 6
+
+
+def loop_best_threshlod(score: np.ndarray, ans: np.ndarray) -> tuple:
+    """
+    Tester.get_best_threshlod before it was vectorized, on a stable sort so tied scores keep a fixed order.
+    """
+    res = np.concatenate([ans.reshape(-1, 1), score.reshape(-1, 1)], axis=-1)
+    order = np.argsort(score, kind='stable')
+    res = res[order]
+
+    total_all = float(len(score))
+    total_current = 0.0
+    total_true = np.sum(ans)
+    total_false = total_all - total_true
+
+    res_mx = 0.0
+    threshlod = None
+    for index, [label, value] in enumerate(res):
+        if label == 1:
+            total_current += 1.0
+        res_current = (2 * total_current + total_false - index - 1) / total_all
+        if res_current > res_mx:
+            res_mx = res_current
+            threshlod = value
+    return threshlod, res_mx
+
+
+def loop_accuracy(score: np.ndarray, ans: np.ndarray, threshlod: float) -> float:
+    """
+    Accuracy of Tester.run_triple_classification before it was vectorized.
+    """
+    res = np.concatenate([ans.reshape(-1, 1), score.reshape(-1, 1)], axis=-1)
+    res = res[np.argsort(score, kind='stable')]
+    total_all = float(len(score))
+    total_current = 0.0
+    total_false = total_all - np.sum(ans)
+    for index, [label, value] in enumerate(res):
+        if value > threshlod:
+            return (2 * total_current + total_false - index) / total_all
+        elif label == 1:
+            total_current += 1.0
+    return (2 * total_current + total_false - len(res)) / total_all
+
+
+def samples(seed: int, n: int, ties: bool) -> tuple:
+    """
+    :return: score, ans, rel of n triples, positives score lower on average,
+        relation 3 has only positives, relation 4 only negatives, relation 5 none
+    """
+    rng = np.random.RandomState(seed)
+    ans = rng.randint(2, size=n)
+    rel = rng.randint(3, size=n)
+    rel[:5], ans[:5] = 3, 1
+    rel[5:10], ans[5:10] = 4, 0
+    score = rng.randn(n) + 1.5 * (1 - ans)
+    if ties:
+        # few distinct values, many positives and negatives share a score
+        score = np.round(score * 2) / 2
+    return score.astype(np.float32), ans.astype(np.int64), rel.astype(np.int64)
+
+
+@pytest.fixture
+def tester() -> Tester:
+    # the threshold helpers do not use the Base.so library loaded by __init__
+    return Tester.__new__(Tester)
+
+
+@pytest.mark.parametrize('ties', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_best_threshlod_matches_loop(tester, seed, ties):
+    score, ans, _ = samples(seed, 200, ties)
+    threshlod, acc = tester.get_best_threshlod(score, ans)
+    expected_threshlod, expected_acc = loop_best_threshlod(score, ans)
+    assert threshlod == expected_threshlod
+    assert acc == pytest.approx(expected_acc)
+    assert tester.get_accuracy(score, ans, threshlod) == pytest.approx(loop_accuracy(score, ans, threshlod))
+
+
+@pytest.mark.parametrize('score, ans', [
+    ([0.5], [0]),
+    ([0.5, 0.5], [1, 0]),
+    ([1.0, 1.0, 1.0], [0, 0, 0]),
+    ([1.0, 2.0, 3.0], [1, 1, 1]),
+    ([], []),
+])
+def test_best_threshlod_edge_cases(tester, score, ans):
+    score, ans = np.asarray(score, dtype=np.float32), np.asarray(ans, dtype=np.int64)
+    threshlod, acc = tester.get_best_threshlod(score, ans)
+    expected_threshlod, expected_acc = loop_best_threshlod(score, ans) if len(score) > 0 else (None, 0.0)
+    assert threshlod == expected_threshlod
+    assert acc == pytest.approx(expected_acc)
+
+
+@pytest.mark.parametrize('ties', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_relation_thresholds_match_loop(tester, seed, ties):
+    score, ans, rel = samples(seed, 300, ties)
+    thresholds = tester.get_relation_thresholds(score, ans, rel, REL_TOT)
+    global_threshlod, _ = loop_best_threshlod(score, ans)
+    for r in range(REL_TOT):
+        rows = rel == r
+        threshlod = loop_best_threshlod(score[rows], ans[rows])[0] if rows.any() else None
+        # relations without triples or without a split of positive accuracy keep the global threshold
+        expected = global_threshlod if threshlod is None else threshlod
+        assert thresholds[r] == np.float32(expected), r
+        if rows.any():
+            assert tester.get_accuracy(score[rows], ans[rows], thresholds[r]) == \
+                pytest.approx(loop_accuracy(score[rows], ans[rows], thresholds[r]))
+    # a relation of positives only accepts all of them
+    assert thresholds[3] == score[rel == 3].max()
+    assert tester.get_accuracy(score, ans, thresholds[rel]) == pytest.approx(
+        np.mean([(s <= thresholds[r]) == (a == 1) for s, a, r in zip(score, ans, rel)]))